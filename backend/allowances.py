@@ -0,0 +1,147 @@
+"""Paying weekly allowances in bulk.
+
+``pay_due_allowances`` pays every schedule that is due in one database
+transaction, with a fixed number of set-based statements however many
+children there are:
+
+1. an UPDATE claims the due schedules for this run (``last_run_id``) and
+   works out how much of each payment goes into the child's goal;
+2. INSERT ... SELECT writes the ``earn`` transactions, and the ``save``
+   transactions for the goal share;
+3. a single UPDATE of ``child_profiles`` adds what is left to each balance,
+   and one of ``goals`` adds the goal shares;
+4. the rows are folded into ``daily_ledger_summary``.
+
+A schedule is due when its weekday has come round since it was last paid, so
+a run that was missed is caught up by the next one (once, not per missed
+week). Claiming sets ``last_paid_on`` to the run's day, which makes reruns on
+the same day no-ops; the transaction ids are derived from the schedule and
+day, so a second payment could not be inserted anyway.
+"""
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import DateTime, and_, case, literal, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import AllowanceSchedule, ChildProfile, Goal, Transaction
+from rollups import record_ledger_entries
+
+
+def _due(today: date):
+    """Schedules whose weekday fell on or before ``today`` since they were last paid."""
+    schedule = AllowanceSchedule
+    occurrences = []
+    for weekday in range(7):
+        occurrence = today - timedelta(days=(today.weekday() - weekday) % 7)
+        occurrences.append(and_(
+            schedule.weekday == weekday,
+            schedule.starts_on <= occurrence,
+            or_(schedule.last_paid_on.is_(None), schedule.last_paid_on < occurrence),
+        ))
+    return and_(
+        schedule.is_active,
+        or_(*occurrences),
+        schedule.child_id.in_(select(ChildProfile.user_id)),
+    )
+
+
+async def pay_due_allowances(session: AsyncSession, today: Optional[date] = None) -> int:
+    """Pay every due allowance and commit. Returns the number of schedules paid."""
+    now = datetime.now(timezone.utc)
+    today = today or now.date()
+    run_id = str(uuid.uuid4())
+    schedule = AllowanceSchedule
+
+    goal_open = (
+        select(Goal.id)
+        .where(Goal.id == schedule.goal_id, Goal.user_id == schedule.child_id, Goal.is_completed.is_not(True))
+        .exists()
+    )
+    claimed = await session.execute(
+        update(schedule)
+        .where(_due(today))
+        .values(
+            last_paid_on=today,
+            last_run_id=run_id,
+            last_saved_amount=case((goal_open, schedule.amount * schedule.goal_percent // 100), else_=0),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount == 0:
+        await session.rollback()
+        return 0
+
+    paid = schedule.last_run_id == run_id
+    saved = and_(paid, schedule.last_saved_amount > 0)
+    suffix = literal(f":{today.isoformat()}")
+    created_at = literal(now, DateTime)
+    columns = [
+        "id", "user_id", "type", "amount", "description", "category",
+        "source", "reference_id", "reference_type", "created_at",
+    ]
+    await session.execute(Transaction.__table__.insert().from_select(columns, select(
+        literal("allowance:") + schedule.id + suffix,
+        schedule.child_id,
+        literal("earn"),
+        schedule.amount,
+        literal("Weekly allowance"),
+        literal("allowance"),
+        literal("allowance_schedule"),
+        schedule.id,
+        literal("allowance"),
+        created_at,
+    ).where(paid)))
+    await session.execute(Transaction.__table__.insert().from_select(columns, select(
+        literal("allowance-saving:") + schedule.id + suffix,
+        schedule.child_id,
+        literal("save"),
+        schedule.last_saved_amount,
+        literal("Allowance saved towards goal"),
+        literal("goal"),
+        literal("allowance_schedule"),
+        schedule.goal_id,
+        literal("goal"),
+        created_at,
+    ).where(saved)))
+
+    # What is left after the goal share goes to the balance
+    spendable = (
+        select(schedule.amount - schedule.last_saved_amount)
+        .where(paid, schedule.child_id == ChildProfile.user_id)
+        .scalar_subquery()
+    )
+    await session.execute(
+        update(ChildProfile)
+        .where(ChildProfile.user_id.in_(select(schedule.child_id).where(paid)))
+        .values(coins=ChildProfile.coins + spendable)
+        .execution_options(synchronize_session=False)
+    )
+    goal_share = (
+        select(schedule.last_saved_amount)
+        .where(saved, schedule.goal_id == Goal.id)
+        .scalar_subquery()
+    )
+    await session.execute(
+        update(Goal)
+        .where(Goal.id.in_(select(schedule.goal_id).where(saved)))
+        .values(
+            current_amount=Goal.current_amount + goal_share,
+            is_completed=Goal.current_amount + goal_share >= Goal.target_amount,
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    day = literal(now.date())
+    await record_ledger_entries(session, select(
+        schedule.child_id, day, literal("earn"), literal("allowance"), schedule.amount, literal(1)
+    ).where(paid))
+    await record_ledger_entries(session, select(
+        schedule.child_id, day, literal("save"), literal("goal"), schedule.last_saved_amount, literal(1)
+    ).where(saved))
+
+    await session.commit()
+    return claimed.rowcount
@@ -0,0 +1,107 @@
+"""Moving old transactions out of the hot ``transactions`` table.
+
+``archive_transactions`` copies every transaction from before a month
+boundary into ``transactions_archive`` (tagged with its month) and deletes it
+from the hot table, a batch per database transaction, so the hot table and its
+indexes only hold recent history. ``compact_ledger_summary`` then folds the
+archived days of ``daily_ledger_summary`` into one ``monthly_ledger_summary``
+row per user, month, type and category, so all-time totals stay correct while
+the daily rollup stays small too. History reads that run past the hot rows
+continue into the archive (see ``routers/transactions.py``).
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Date, cast, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import dialect_insert
+from models import DailyLedgerSummary, MonthlyLedgerSummary, Transaction, TransactionArchive
+
+# Transactions older than this are archived by default
+DEFAULT_HORIZON_DAYS = 730
+
+# Analytics windows read up to a year back from daily_ledger_summary, so those
+# days must never be compacted
+MIN_HORIZON_DAYS = 400
+
+# Rows moved per database transaction
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def archive_cutoff(horizon_days: int = DEFAULT_HORIZON_DAYS, today: Optional[date] = None) -> date:
+    """First day of the month that contains ``today - horizon_days``.
+
+    Everything before it is archived, so months are always archived whole.
+    """
+    if horizon_days < MIN_HORIZON_DAYS:
+        raise ValueError(f"The archive horizon must be at least {MIN_HORIZON_DAYS} days")
+    today = today or datetime.now(timezone.utc).date()
+    return (today - timedelta(days=horizon_days)).replace(day=1)
+
+
+def _month_start(session: AsyncSession, column):
+    """SQL expression for the first day of ``column``'s month."""
+    if session.bind.dialect.name == "postgresql":
+        return cast(func.date_trunc("month", column), Date)
+    return func.date(column, "start of month")
+
+
+async def archive_transactions(
+    session: AsyncSession, cutoff: date, batch_size: int = ARCHIVE_BATCH_SIZE
+) -> int:
+    """Move transactions created before ``cutoff`` into the archive.
+
+    Commits after every batch, so the job can be stopped and rerun at any
+    point. Returns the number of rows moved.
+    """
+    before = datetime.combine(cutoff, time.min)
+    hot = Transaction.__table__
+    columns = [column.name for column in hot.columns]
+    moved = 0
+    while True:
+        ids = (await session.execute(
+            select(Transaction.id).where(Transaction.created_at < before).limit(batch_size)
+        )).scalars().all()
+        if not ids:
+            break
+        await session.execute(
+            insert(TransactionArchive).from_select(
+                columns + ["month"],
+                select(*hot.columns, _month_start(session, Transaction.created_at)).where(Transaction.id.in_(ids)),
+            )
+        )
+        await session.execute(delete(Transaction).where(Transaction.id.in_(ids)))
+        await session.commit()
+        moved += len(ids)
+    return moved
+
+
+async def compact_ledger_summary(session: AsyncSession, cutoff: date) -> int:
+    """Fold daily_ledger_summary rows before ``cutoff`` into monthly_ledger_summary.
+
+    Adds onto existing monthly rows, so days written after a month was
+    compacted (e.g. imported history) are picked up by the next run. Runs in
+    the caller's transaction. Returns the number of daily rows compacted.
+    """
+    daily = DailyLedgerSummary
+    monthly = MonthlyLedgerSummary.__table__
+    month = _month_start(session, daily.day)
+    insert_stmt = dialect_insert(session)
+    stmt = insert_stmt(monthly).from_select(
+        ["user_id", "month", "type", "category", "amount_sum", "count"],
+        select(daily.user_id, month, daily.type, daily.category, func.sum(daily.amount_sum), func.sum(daily.count))
+        .where(daily.day < cutoff)
+        .group_by(daily.user_id, month, daily.type, daily.category),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[monthly.c.user_id, monthly.c.month, monthly.c.type, monthly.c.category],
+        set_={
+            "amount_sum": monthly.c.amount_sum + stmt.excluded.amount_sum,
+            "count": monthly.c.count + stmt.excluded.count,
+        },
+    )
+    await session.execute(stmt)
+    result = await session.execute(delete(daily).where(daily.day < cutoff))
+    return result.rowcount
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Archive transactions older than the horizon into transactions_archive and
+compact their days of daily_ledger_summary into monthly_ledger_summary.
+Schedule it (e.g. nightly from cron); whole months are archived once they fall
+behind the horizon, in batches that each commit, so it is safe to interrupt
+and rerun.
+"""
+
+import argparse
+import asyncio
+
+from archive import (
+    ARCHIVE_BATCH_SIZE, DEFAULT_HORIZON_DAYS, MIN_HORIZON_DAYS,
+    archive_cutoff, archive_transactions, compact_ledger_summary,
+)
+from database import create_db_and_tables, async_session_maker
+
+
+async def main(days: int, batch_size: int):
+    await create_db_and_tables()
+    cutoff = archive_cutoff(days)
+    async with async_session_maker() as session:
+        moved = await archive_transactions(session, cutoff, batch_size)
+        compacted = await compact_ledger_summary(session, cutoff)
+        await session.commit()
+    print(f"✅ Archived {moved} transactions and compacted {compacted} summary rows before {cutoff.isoformat()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--days", type=int, default=DEFAULT_HORIZON_DAYS,
+        help=f"keep this many days of history in the hot table (at least {MIN_HORIZON_DAYS})",
+    )
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE, help="rows moved per commit")
+    args = parser.parse_args()
+    if args.days < MIN_HORIZON_DAYS:
+        parser.error(f"--days must be at least {MIN_HORIZON_DAYS}")
+    asyncio.run(main(args.days, args.batch_size))
@@ -3,20 +3,33 @@
 import os
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from models import Base
+from query_stats import instrument_engine
 
 # Database URL - using SQLite for development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./coincraft.db")
 
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+
+# Databases created by create_all before migrations were tracked match this revision
+LEGACY_BASELINE_REVISION = "0001"
+
 # Create async engine
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,  # Disable verbose SQL logging
     future=True,
 )
+instrument_engine(engine)
 
 # Create async session factory
 async_session_maker = async_sessionmaker(
@@ -26,10 +39,60 @@ async_session_maker = async_sessionmaker(
 )
 
 
-async def create_db_and_tables():
-    """Create database tables."""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+def dialect_insert(session: AsyncSession):
+    """Return the INSERT construct for the session's dialect.
+
+    The SQLite and PostgreSQL variants both support ``on_conflict_do_update``
+    and ``on_conflict_do_nothing``, which the generic ``insert`` does not.
+    """
+    if session.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def alembic_config() -> Config:
+    """Return the Alembic configuration for this backend."""
+    return Config(ALEMBIC_INI)
+
+
+def _upgrade_to_head(connection: Connection) -> None:
+    config = alembic_config()
+    config.attributes["connection"] = connection
+
+    current = MigrationContext.configure(connection).get_current_revision()
+    if current is None and inspect(connection).has_table("users"):
+        print(f"[DATABASE] Untracked schema found, stamping revision {LEGACY_BASELINE_REVISION}")
+        command.stamp(config, LEGACY_BASELINE_REVISION)
+    # Alembic manages its own (per-revision) transactions from here on
+    connection.commit()
+
+    command.upgrade(config, "head")
+
+
+async def create_db_and_tables(bind: AsyncEngine = engine):
+    """Create or upgrade the database schema by running migrations to head.
+
+    Run once per deploy (``python migrate.py``), never from the app workers.
+    """
+    async with bind.connect() as conn:
+        await conn.run_sync(_upgrade_to_head)
+        await conn.commit()
+
+
+async def verify_schema_revision(bind: AsyncEngine = engine):
+    """Raise if the database is not at the latest migration revision."""
+    expected = set(ScriptDirectory.from_config(alembic_config()).get_heads())
+    async with bind.connect() as conn:
+        current = await conn.run_sync(
+            lambda sync_conn: set(MigrationContext.configure(sync_conn).get_current_heads())
+        )
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at revision {sorted(current) or 'none'}, "
+            f"expected {sorted(expected)}. Run `python migrate.py` before starting the server."
+        )
 
 
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
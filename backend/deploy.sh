@@ -66,6 +66,10 @@ uv pip install -r requirements.txt
 # Fix permissions for the virtual environment
 sudo chown -R www-data:www-data .venv
 
+# Run database migrations before the workers start (they only verify the schema revision)
+echo "🗄️ Running database migrations..."
+sudo -u www-data .venv/bin/python migrate.py
+
 # Setup systemd service
 echo "⚙️ Setting up systemd service..."
 sudo cp coincraft.service /etc/systemd/system/
@@ -90,7 +94,7 @@ sudo systemctl reload nginx
 # sudo ufw allow 'Nginx Full'
 # sudo ufw --force enable
 
-# Run database migrations
+# Seed the database
 echo "🗄️ Running database setup..."
 cd $APP_DIR
 # Run database setup with proper permissions
@@ -1,4 +1,11 @@
 # Gunicorn configuration for CoinCraft Backend
+import os
+import shutil
+
+# Workers write their Prometheus metrics here so /metrics can merge them;
+# set before the workers fork so prometheus_client sees it on import
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/coincraft-metrics")
+
 bind = "127.0.0.1:8000"
 workers = 4
 worker_class = "uvicorn.workers.UvicornWorker"
@@ -21,3 +28,16 @@ proc_name = "coincraft-api"
 limit_request_line = 4096
 limit_request_fields = 100
 limit_request_field_size = 8190
+
+
+def on_starting(server):
+    # Files left by a previous master would be merged into the new counts
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,274 @@
+"""``Idempotency-Key`` support for POST endpoints that move coins.
+
+A client that retries a POST sends the same ``Idempotency-Key`` header each
+time. The ``idempotency_key`` dependency claims the key for the user by
+inserting a row into ``idempotency_keys`` and committing it before the route
+runs. ``IdempotencyMiddleware`` then stores the response on that row. A retry
+finds the stored response and gets it back unchanged, without the route
+running again. A duplicate that arrives while the first request is still
+running waits for it to finish and replays its response.
+
+Responses with a 5xx status are not kept: the claim is released so the client
+can retry. A claim still waiting for its response only holds the key for
+``IN_PROGRESS_LEASE``, so a key whose request died with its worker is free
+again soon after. Stored responses expire after ``IDEMPOTENCY_TTL``. Expired
+keys are deleted by ``purge_expired_keys``.
+"""
+
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.responses import Response
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth import current_active_user
+from database import async_session_maker, dialect_insert, get_async_session
+from models import IdempotencyKey, User
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAY_HEADER = "Idempotent-Replayed"
+
+# How long a stored response is replayed for
+IDEMPOTENCY_TTL = timedelta(hours=24)
+
+# How long a claim holds the key before its response is stored; longer than
+# any request should run, so only a request lost with its worker runs over
+IN_PROGRESS_LEASE = timedelta(minutes=2)
+
+# How long a duplicate waits for the first request before giving up, and how often it checks
+IN_PROGRESS_WAIT_SECONDS = 10.0
+IN_PROGRESS_POLL_SECONDS = 0.05
+
+# How often the cleanup task deletes expired keys
+PURGE_INTERVAL_SECONDS = 3600
+
+MAX_KEY_LENGTH = 255
+
+
+@dataclass
+class Claim:
+    """A key this request owns; the middleware stores the response on it."""
+
+    session: AsyncSession
+    user_id: str
+    key: str
+    created_at: datetime
+
+
+class IdempotentReplay(Exception):
+    """Raised by the dependency to answer with a stored response."""
+
+    def __init__(self, record: IdempotencyKey):
+        self.record = record
+
+
+async def replay_response(request: Request, exc: IdempotentReplay) -> Response:
+    """Exception handler that sends the stored response back."""
+    record = exc.record
+    return Response(
+        content=record.response_body,
+        status_code=record.response_status,
+        media_type=record.content_type,
+        headers={REPLAY_HEADER: "true"},
+    )
+
+
+def request_fingerprint(method: str, path: str, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), body):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+async def _load(session: AsyncSession, user_id: str, key: str) -> Optional[IdempotencyKey]:
+    result = await session.execute(
+        select(IdempotencyKey)
+        .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _claim(session: AsyncSession, user_id: str, key: str, fingerprint: str) -> Optional[datetime]:
+    """Insert the key unless a live row already holds it. Commits.
+
+    Returns the claim's ``created_at``, or None when the key is taken.
+    """
+    now = datetime.now(timezone.utc)
+    # An expired key, or a claim whose lease ran out, is free to reuse
+    await session.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.expires_at <= now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    insert = dialect_insert(session)
+    result = await session.execute(
+        insert(IdempotencyKey.__table__)
+        .values(
+            user_id=user_id,
+            key=key,
+            fingerprint=fingerprint,
+            status="in_progress",
+            created_at=now,
+            expires_at=now + IN_PROGRESS_LEASE,
+        )
+        .on_conflict_do_nothing(index_elements=["user_id", "key"])
+    )
+    await session.commit()
+    return now if result.rowcount == 1 else None
+
+
+async def idempotency_key(
+    request: Request,
+    key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER),
+    current_user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+) -> Optional[str]:
+    """Make the route run at most once per ``Idempotency-Key``.
+
+    Without the header the route runs as usual. A key reused with a different
+    request is rejected with 422.
+    """
+    if key is None:
+        return None
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters",
+        )
+
+    user_id = current_user.id
+    fingerprint = request_fingerprint(request.method, request.url.path, await request.body())
+    waited = 0.0
+    while True:
+        claimed_at = await _claim(session, user_id, key, fingerprint)
+        if claimed_at is not None:
+            break
+        record = await _load(session, user_id, key)
+        if record is None:
+            # Released after a failure in the meantime; try to claim it again
+            continue
+        if record.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"{IDEMPOTENCY_HEADER} was already used for a different request",
+            )
+        if record.status == "completed":
+            raise IdempotentReplay(record)
+        if waited >= IN_PROGRESS_WAIT_SECONDS:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"A request with this {IDEMPOTENCY_HEADER} is still being processed",
+            )
+        # The first request is still running; wait for its response
+        await asyncio.sleep(IN_PROGRESS_POLL_SECONDS)
+        waited += IN_PROGRESS_POLL_SECONDS
+
+    request.state.idempotency = Claim(session, user_id, key, claimed_at)
+    return key
+
+
+async def _finish(claim: Claim, status_code: int, content_type: Optional[str], body: bytes):
+    """Store the response on the claimed key, or release the key after a 5xx.
+
+    Leaves the key alone if the lease ran out and another request claimed it.
+    """
+    session = claim.session
+    await session.rollback()
+    match = (
+        (IdempotencyKey.user_id == claim.user_id)
+        & (IdempotencyKey.key == claim.key)
+        & (IdempotencyKey.created_at == claim.created_at)
+    )
+    if status_code >= 500:
+        await session.execute(delete(IdempotencyKey).where(match).execution_options(synchronize_session=False))
+    else:
+        await session.execute(
+            update(IdempotencyKey)
+            .where(match)
+            .values(
+                status="completed",
+                response_status=status_code,
+                response_body=body.decode("utf-8"),
+                content_type=content_type,
+                expires_at=datetime.now(timezone.utc) + IDEMPOTENCY_TTL,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    await session.commit()
+
+
+class IdempotencyMiddleware:
+    """Store the response of requests whose ``Idempotency-Key`` was claimed.
+
+    The response is saved before its last body chunk goes out, so a retry
+    that arrives once the client has the answer always finds it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        state = scope.setdefault("state", {})
+        status_code = 500
+        content_type = None
+        chunks = []
+
+        async def send_wrapper(message):
+            nonlocal status_code, content_type
+            claim = state.get("idempotency")
+            if claim is not None:
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    for name, value in message.get("headers", []):
+                        if name.lower() == b"content-type":
+                            content_type = value.decode("latin-1")
+                elif message["type"] == "http.response.body":
+                    chunks.append(message.get("body", b""))
+                    if not message.get("more_body", False):
+                        state.pop("idempotency")
+                        await _finish(claim, status_code, content_type, b"".join(chunks))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The route failed before a response was sent; let the client retry
+            claim = state.pop("idempotency", None)
+            if claim is not None:
+                await _finish(claim, 500, None, b"")
+
+
+async def purge_expired_keys(session: AsyncSession) -> int:
+    """Delete keys past their TTL and return how many were removed."""
+    result = await session.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now(timezone.utc))
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def purge_expired_keys_periodically(interval: float = PURGE_INTERVAL_SECONDS):
+    """Run ``purge_expired_keys`` every ``interval`` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with async_session_maker() as session:
+                removed = await purge_expired_keys(session)
+            if removed:
+                print(f"[BACKEND] Purged {removed} expired idempotency keys")
+        except Exception as e:
+            print(f"[BACKEND] Idempotency key purge failed: {e}")
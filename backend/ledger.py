@@ -0,0 +1,128 @@
+"""Coin balance changes applied together with their ledger rows.
+
+Every change to ``ChildProfile.coins`` goes through ``credit`` or ``debit``.
+The balance is moved by a single conditional UPDATE, so two requests spending
+from the same balance can't both read the old value and overwrite each other,
+and a debit only succeeds while the balance covers it. The Transaction row is
+added in the same database transaction, together with its share of the
+``daily_ledger_summary`` rollup, so the caller's commit writes all of it or
+none. Every ``earn`` or ``refund`` (``CREDIT_TYPES``) credits the balance and
+every ``spend`` or ``save`` debits it, which is what ``reconcile`` checks
+balances against; ``record`` alone is for users without a child profile (and
+for seeding history). A refund gives back coins a spend held, so it is not
+counted as earnings.
+"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models import ChildProfile, Transaction
+from rollups import record_ledger_entry
+
+# Transaction types that add to the balance; every other type takes from it
+CREDIT_TYPES = ("earn", "refund")
+
+
+class InsufficientCoins(Exception):
+    """The balance can't cover a debit (or the user has no child profile)."""
+
+
+async def _move_balance(session: AsyncSession, user_id: str, delta: int, minimum: int = None):
+    """Add ``delta`` to the user's balance and return the new balance.
+
+    With ``minimum`` the row is only updated while ``coins >= minimum``.
+    Returns None when no row matched.
+    """
+    stmt = (
+        update(ChildProfile)
+        .where(ChildProfile.user_id == user_id)
+        .values(coins=ChildProfile.coins + delta)
+        .returning(ChildProfile.coins)
+        .execution_options(synchronize_session=False)
+    )
+    if minimum is not None:
+        stmt = stmt.where(ChildProfile.coins >= minimum)
+    balance = (await session.execute(stmt)).scalar_one_or_none()
+
+    if balance is not None:
+        # Keep an already loaded profile in step without another SELECT
+        for obj in session.identity_map.values():
+            if isinstance(obj, ChildProfile) and obj.user_id == user_id:
+                set_committed_value(obj, "coins", balance)
+    return balance
+
+
+def _check_amount(transaction: Transaction):
+    # A negative amount would turn a debit into a credit (and the reverse)
+    if transaction.amount is None or transaction.amount <= 0:
+        raise ValueError(f"Ledger amounts must be positive, got {transaction.amount!r}")
+
+
+async def record(session: AsyncSession, transaction: Transaction):
+    """Add the ledger row and fold it into the daily ledger summary."""
+    if transaction.created_at is None:
+        transaction.created_at = datetime.now(timezone.utc)
+    session.add(transaction)
+    await record_ledger_entry(
+        session,
+        transaction.user_id,
+        transaction.type,
+        transaction.category,
+        transaction.amount,
+        transaction.created_at.date(),
+    )
+
+
+async def credit(session: AsyncSession, transaction: Transaction) -> int:
+    """Add ``transaction.amount`` to the user's balance and record it.
+
+    Returns the new balance. Raises ValueError unless the amount is positive.
+    Runs in the caller's transaction.
+    """
+    _check_amount(transaction)
+    balance = await _move_balance(session, transaction.user_id, transaction.amount)
+    if balance is None:
+        raise LookupError(f"No child profile for user {transaction.user_id}")
+    await record(session, transaction)
+    return balance
+
+
+async def debit(session: AsyncSession, transaction: Transaction) -> int:
+    """Take ``transaction.amount`` from the user's balance and record it.
+
+    Raises InsufficientCoins when the UPDATE matched no row, i.e. the balance
+    was below the amount at the moment of the write, and ValueError unless the
+    amount is positive. Returns the new balance. Runs in the caller's
+    transaction.
+    """
+    _check_amount(transaction)
+    amount = transaction.amount
+    balance = await _move_balance(session, transaction.user_id, -amount, minimum=amount)
+    if balance is None:
+        raise InsufficientCoins(f"Balance of user {transaction.user_id} is below {amount}")
+    await record(session, transaction)
+    return balance
+
+
+async def transition(session: AsyncSession, obj, from_status: str, **values) -> bool:
+    """Move ``obj`` out of ``from_status`` only if nobody else did first.
+
+    Issues ``UPDATE ... WHERE id = :id AND status = :from_status`` and returns
+    False when the row had already moved on, so a concurrent second approval
+    can't pay out twice. On success the new values are applied to ``obj``.
+    """
+    model = type(obj)
+    result = await session.execute(
+        update(model)
+        .where(model.id == obj.id, model.status == from_status)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return False
+    for key, value in values.items():
+        set_committed_value(obj, key, value)
+    return True
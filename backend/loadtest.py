@@ -0,0 +1,421 @@
+"""Replay the frontend's per-role traffic against the API and report latency.
+
+Each virtual user logs in once and then repeats a scripted session that
+issues the same requests as the Vue page it stands for: the child dashboard
+with goals and activities, the parent dashboard with task approvals, the
+teacher dashboard with class analytics. Latency is reported per route
+template as p50/p95/p99, along with throughput, and a run can be saved as a
+JSON baseline and diffed against a later one.
+
+Usage:
+    python loadtest.py                                    # in-process, throwaway database
+    python loadtest.py --base-url http://127.0.0.1:8000   # a running server
+    python loadtest.py --save loadtest_baselines/inprocess.json
+    python loadtest.py --compare loadtest_baselines/inprocess.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+PASSWORD = "loadtest-password"
+ROLES = ("child", "parent", "teacher")
+
+# A route's latency may grow by this fraction over the baseline before --compare fails
+DEFAULT_TOLERANCE = 0.25
+
+
+class Recorder:
+    """Latency samples per route template, split by role."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.role_samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def add(self, role: str, name: str, elapsed: float, ok: bool):
+        self.samples[name].append(elapsed)
+        self.role_samples[role].append(elapsed)
+        if not ok:
+            self.errors[name] += 1
+
+
+class VirtualUser:
+    """One logged-in frontend user issuing timed requests."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, role: str, user: dict):
+        self.client = client
+        self.recorder = recorder
+        self.role = role
+        self.user = user
+        self.headers = {"Authorization": f"Bearer {user['token']}"}
+
+    async def call(self, method: str, name: str, url: Optional[str] = None, **kwargs) -> httpx.Response:
+        """Issue ``method url`` and record it under the route template ``name``."""
+        started = time.perf_counter()
+        response = await self.client.request(method, url or name, headers=self.headers, **kwargs)
+        self.recorder.add(self.role, f"{method} {name}", time.perf_counter() - started, response.is_success)
+        return response
+
+
+async def child_session(user: VirtualUser, rng: random.Random):
+    """ChildDashboard.vue, then the goals and activities pages."""
+    user_id = user.user["id"]
+    await user.call("GET", "/api/users/me")
+    await user.call("GET", "/api/child/dashboard")
+    await user.call("GET", "/api/users/{user_id}/coins", f"/api/users/{user_id}/coins")
+    await user.call("GET", "/api/users/{user_id}/goals", f"/api/users/{user_id}/goals")
+    await user.call("GET", "/api/users/{user_id}/transactions", f"/api/users/{user_id}/transactions")
+    await user.call("GET", "/api/activities")
+    response = await user.call("GET", "/api/child/assigned-modules")
+    modules = response.json() if response.is_success else []
+    if modules:
+        # Starting a module moves it out of the assigned list
+        module_id = rng.choice(modules)["id"]
+        await user.call(
+            "PUT",
+            "/api/child/modules/{module_id}/progress",
+            f"/api/child/modules/{module_id}/progress",
+            json={"status": "in_progress", "score": rng.randint(50, 100)},
+        )
+
+
+async def parent_session(user: VirtualUser, rng: random.Random):
+    """ParentDashboard.vue, then the approvals queue."""
+    await user.call("GET", "/api/users/me")
+    await user.call("GET", "/api/parent/dashboard")
+    await user.call("GET", "/api/parent/children/goals")
+    await user.call("GET", "/api/parent/redemptions")
+    response = await user.call("GET", "/api/parent/tasks", params={"status": "completed"})
+    completed = response.json() if response.is_success else []
+    if completed:
+        task_id = rng.choice(completed)["id"]
+        await user.call("PUT", "/api/parent/tasks/{task_id}/approve", f"/api/parent/tasks/{task_id}/approve")
+    child_id = rng.choice(user.user["children"])
+    await user.call(
+        "GET", "/api/parent/children/{child_id}/progress", f"/api/parent/children/{child_id}/progress"
+    )
+
+
+async def teacher_session(user: VirtualUser, rng: random.Random):
+    """TeacherDashboard.vue, then a class page and the analytics tab."""
+    await user.call("GET", "/api/users/me")
+    await user.call("GET", "/api/teacher/dashboard")
+    await user.call("GET", "/api/teacher/classes")
+    class_id = rng.choice(user.user["classes"])
+    await user.call("GET", "/api/teacher/classes/{class_id}", f"/api/teacher/classes/{class_id}")
+    await user.call(
+        "GET", "/api/teacher/classes/{class_id}/students", f"/api/teacher/classes/{class_id}/students"
+    )
+    await user.call(
+        "GET",
+        "/api/teacher/classes/{class_id}/assigned-modules",
+        f"/api/teacher/classes/{class_id}/assigned-modules",
+    )
+    await user.call("GET", "/api/teacher/modules")
+    await user.call("GET", "/api/teacher/analytics/performance")
+
+
+SESSIONS = {"child": child_session, "parent": parent_session, "teacher": teacher_session}
+
+
+async def _post(client: httpx.AsyncClient, url: str, token: Optional[str] = None, **kwargs) -> dict:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    response = await client.post(url, headers=headers, **kwargs)
+    if not response.is_success:
+        raise RuntimeError(f"Seeding failed: POST {url} -> {response.status_code} {response.text}")
+    return response.json()
+
+
+async def _register(client: httpx.AsyncClient, email: str, name: str, role: str) -> dict:
+    data = await _post(
+        client, "/api/auth/register", json={"email": email, "password": PASSWORD, "name": name, "role": role}
+    )
+    return {"id": data["user"]["id"], "email": email, "token": data["access_token"]}
+
+
+async def seed_population(
+    client: httpx.AsyncClient,
+    run_id: str,
+    families: int,
+    children_per_family: int,
+    teachers: int,
+    tasks_per_child: int,
+    rng: random.Random,
+) -> Dict[str, List[dict]]:
+    """Create the users the sessions log in as, through the public API.
+
+    Every child gets goals and ``tasks_per_child`` completed tasks for the
+    parent sessions to approve; the children are spread over one class per
+    teacher, each with a published module assigned.
+    """
+    population: Dict[str, List[dict]] = {role: [] for role in ROLES}
+    for family in range(families):
+        parent = await _register(
+            client, f"load-{run_id}-parent{family}@loadtest.coincraft.app", f"Load Parent {family}", "parent"
+        )
+        parent["children"] = []
+        for index in range(children_per_family):
+            name = f"Load Child {family} {index}"
+            email = f"load-{run_id}-child{family}-{index}@loadtest.coincraft.app"
+            created = await _post(
+                client,
+                "/api/parent/children",
+                parent["token"],
+                json={"name": name, "age": rng.randint(6, 15), "email": email, "password": PASSWORD},
+            )
+            login = await _post(client, "/api/auth/jwt/login", data={"username": email, "password": PASSWORD})
+            child = {"id": created["child"]["id"], "email": email, "token": login["access_token"]}
+            parent["children"].append(child["id"])
+            population["child"].append(child)
+
+            for goal in range(rng.randint(1, 3)):
+                await _post(
+                    client,
+                    f"/api/users/{child['id']}/goals",
+                    child["token"],
+                    json={
+                        "title": f"Goal {goal}",
+                        "target_amount": rng.choice([50, 100, 250, 500]),
+                        "deadline": (datetime.now(timezone.utc) + timedelta(days=30)).isoformat(),
+                    },
+                )
+            for task in range(tasks_per_child):
+                created_task = await _post(
+                    client,
+                    "/api/parent/tasks",
+                    parent["token"],
+                    json={"title": f"Chore {task}", "assigned_to": child["id"], "coins_reward": rng.randint(5, 25)},
+                )
+                response = await client.put(
+                    f"/api/tasks/{created_task['task']['id']}",
+                    headers={"Authorization": f"Bearer {child['token']}"},
+                    json={"status": "completed"},
+                )
+                if not response.is_success:
+                    raise RuntimeError(f"Seeding failed: completing task -> {response.status_code}")
+        population["parent"].append(parent)
+
+    children = [child["id"] for child in population["child"]]
+    for index in range(teachers):
+        teacher = await _register(
+            client, f"load-{run_id}-teacher{index}@loadtest.coincraft.app", f"Load Teacher {index}", "teacher"
+        )
+        class_data = await _post(
+            client,
+            "/api/teacher/classes",
+            teacher["token"],
+            json={"name": f"Load Class {index}", "student_ids": children[index::teachers]},
+        )
+        class_id = class_data["class"]["id"]
+        module = await _post(
+            client,
+            "/api/teacher/modules",
+            teacher["token"],
+            json={"title": f"Budgeting {index}", "description": "Load test module", "published": True},
+        )
+        module_id = module.get("module", module).get("id")
+        await _post(client, f"/api/teacher/modules/{module_id}/assign", teacher["token"], json={"class_ids": [class_id]})
+        teacher["classes"] = [class_id]
+        population["teacher"].append(teacher)
+    return population
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _latency_summary(values: List[float]) -> dict:
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "mean_ms": round(sum(values) / len(values) * 1000, 2),
+    }
+
+
+def summarize(recorder: Recorder, elapsed: float, config: dict) -> dict:
+    """Turn the recorded samples into the report (and baseline) structure."""
+    total = sum(len(values) for values in recorder.samples.values())
+    return {
+        "config": config,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "duration_s": round(elapsed, 3),
+        "requests": total,
+        "errors": sum(recorder.errors.values()),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "roles": {role: _latency_summary(values) for role, values in sorted(recorder.role_samples.items())},
+        "routes": {
+            name: {**_latency_summary(values), "errors": recorder.errors.get(name, 0)}
+            for name, values in sorted(recorder.samples.items())
+        },
+    }
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    population: Dict[str, List[dict]],
+    users_per_role: int,
+    iterations: int,
+    seed: int,
+    recorder: Optional[Recorder] = None,
+) -> Recorder:
+    """Run ``users_per_role`` concurrent virtual users per role, ``iterations`` sessions each."""
+    recorder = recorder or Recorder()
+
+    async def virtual_user(role: str, index: int):
+        actors = population[role]
+        user = VirtualUser(client, recorder, role, actors[index % len(actors)])
+        rng = random.Random(f"{seed}-{role}-{index}")
+        for _ in range(iterations):
+            await SESSIONS[role](user, rng)
+
+    await asyncio.gather(*(
+        virtual_user(role, index)
+        for role in ROLES
+        if population[role]
+        for index in range(users_per_role)
+    ))
+    return recorder
+
+
+def compare(current: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE, metric: str = "p50") -> List[str]:
+    """Print per-route deltas and return the routes whose ``metric`` regressed.
+
+    p50 is the default gate because the tail of a short local run is noisy;
+    p95 is always printed alongside.
+    """
+    key = f"{metric}_ms"
+    regressions = []
+    print(f"{'route':<60} {'base p50':>9} {'p50':>9} {'base p95':>9} {'p95':>9} {metric:>6}")
+    for name, stats in current["routes"].items():
+        base = baseline["routes"].get(name)
+        if base is None:
+            print(f"{name:<60} {'-':>9} {stats['p50_ms']:>9.2f} {'-':>9} {stats['p95_ms']:>9.2f} {'new':>6}")
+            continue
+        change = (stats[key] - base[key]) / base[key] if base[key] else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  <-- regression"
+        print(
+            f"{name:<60} {base['p50_ms']:>9.2f} {stats['p50_ms']:>9.2f} "
+            f"{base['p95_ms']:>9.2f} {stats['p95_ms']:>9.2f} {change:>+6.0%}{flag}"
+        )
+    print(f"throughput: {baseline['throughput_rps']} -> {current['throughput_rps']} req/s")
+    return regressions
+
+
+def print_report(report: dict):
+    print(f"{'route':<60} {'n':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}")
+    for name, stats in report["routes"].items():
+        print(
+            f"{name:<60} {stats['count']:>6} {stats['p50_ms']:>8.2f} "
+            f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['errors']:>5}"
+        )
+    for role, stats in report["roles"].items():
+        print(f"{role:<10} p50 {stats['p50_ms']:.2f}ms  p95 {stats['p95_ms']:.2f}ms  p99 {stats['p99_ms']:.2f}ms")
+    print(
+        f"{report['requests']} requests, {report['errors']} errors in {report['duration_s']}s "
+        f"({report['throughput_rps']} req/s)"
+    )
+
+
+@contextlib.asynccontextmanager
+async def open_client(base_url: Optional[str]):
+    """A client for a running server, or for the app in-process on a throwaway database."""
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30.0) as client:
+            yield client
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # database.py reads DATABASE_URL on import
+        os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(tmp, 'loadtest.db')}"
+        from database import create_db_and_tables, engine
+        from main import app
+
+        await create_db_and_tables()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30.0) as client:
+            yield client
+        await engine.dispose()
+
+
+async def main(args) -> int:
+    rng = random.Random(args.seed)
+    run_id = args.run_id or (str(args.seed) if not args.base_url else str(int(time.time())))
+    config = {
+        "target": args.base_url or "in-process",
+        "seed": args.seed,
+        "families": args.families,
+        "children_per_family": args.children,
+        "teachers": args.teachers,
+        "users_per_role": args.users,
+        "iterations": args.iterations,
+    }
+
+    # The routers print on every request; keep the report readable
+    quiet = contextlib.redirect_stdout(io.StringIO()) if not args.verbose else contextlib.nullcontext()
+    async with open_client(args.base_url) as client:
+        with quiet:
+            population = await seed_population(
+                client, run_id, args.families, args.children, args.teachers, args.iterations, rng
+            )
+            started = time.perf_counter()
+            recorder = await run_load(client, population, args.users, args.iterations, args.seed)
+            elapsed = time.perf_counter() - started
+
+    report = summarize(recorder, elapsed, config)
+    print_report(report)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance, args.metric)
+        if regressions:
+            print(f"{len(regressions)} route(s) regressed beyond {args.tolerance:.0%}")
+            return 1
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Target a running server instead of the app in-process")
+    parser.add_argument("--families", type=int, default=4)
+    parser.add_argument("--children", type=int, default=2, help="Children per family")
+    parser.add_argument("--teachers", type=int, default=2)
+    parser.add_argument("--users", type=int, default=4, help="Concurrent virtual users per role")
+    parser.add_argument("--iterations", type=int, default=25, help="Sessions per virtual user")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--run-id", help="Suffix for seeded emails (defaults to the seed, or a timestamp with --base-url)")
+    parser.add_argument("--save", help="Write the report to this JSON file")
+    parser.add_argument("--compare", help="Diff latency per route against this JSON baseline")
+    parser.add_argument("--metric", choices=["p50", "p95", "p99"], default="p50", help="Percentile --compare gates on")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--verbose", action="store_true", help="Show the server's own output")
+    sys.exit(asyncio.run(main(parser.parse_args())))
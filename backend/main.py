@@ -1,5 +1,6 @@
 """CoinCraft FastAPI Backend Application."""
 
+import asyncio
 import os
 import traceback
 from contextlib import asynccontextmanager
@@ -7,13 +8,17 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from fastapi import FastAPI, status, Request, HTTPException
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from fastapi import Depends, FastAPI, status, Request, HTTPException
+from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-from database import create_db_and_tables
-from auth import auth_backend, fastapi_users
+from database import engine, verify_schema_revision
+import idempotency
+import metrics
+import query_stats
+from auth import auth_backend, current_superuser, fastapi_users
+from pagination import NEXT_CURSOR_HEADER
 from schemas import UserCreate, UserRead, UserUpdate
 from routers.auth import router as auth_router
 from routers.users import router as users_router
@@ -39,11 +44,15 @@ class HealthCheck(BaseModel):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
-    # Startup
-    await create_db_and_tables()
+    # Startup: migrations run once per deploy (migrate.py), not in every worker
+    await verify_schema_revision()
+    metrics.instrument_pool(engine)
+    loop_lag_probe = asyncio.create_task(metrics.watch_event_loop_lag())
+    idempotency_purge = asyncio.create_task(idempotency.purge_expired_keys_periodically())
     yield
     # Shutdown
-    pass
+    loop_lag_probe.cancel()
+    idempotency_purge.cancel()
 
 
 # Create FastAPI app
@@ -81,6 +90,12 @@ origins.extend(
     )
 
 
+# Stores responses for requests sent with an Idempotency-Key (innermost, so it
+# sees the route's own status code) and replays them on retries
+app.add_middleware(idempotency.IdempotencyMiddleware)
+app.add_exception_handler(idempotency.IdempotentReplay, idempotency.replay_response)
+
+
 # Exception handling middleware
 @app.middleware("http")
 async def catch_exceptions_middleware(request: Request, call_next):
@@ -88,6 +103,7 @@ async def catch_exceptions_middleware(request: Request, call_next):
         response = await call_next(request)
         return response
     except Exception as e:
+        metrics.UNHANDLED_EXCEPTIONS.labels(type(e).__name__).inc()
         print(f"❌ Exception caught: {str(e)}")
         print(f"❌ Traceback: {traceback.format_exc()}")
         return JSONResponse(
@@ -100,14 +116,30 @@ async def catch_exceptions_middleware(request: Request, call_next):
         )
 
 
+# SQL statement count and DB time per request, reported as Server-Timing
+@app.middleware("http")
+async def query_stats_middleware(request: Request, call_next):
+    stats = query_stats.start_request()
+    response = await call_next(request)
+    response.headers["Server-Timing"] = stats.server_timing()
+    route = query_stats.route_template(request)
+    if route is not None:
+        query_stats.record_route(route, stats)
+    return response
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,  # Use specific origins list for proper CORS headers
     allow_credentials=True,  # Can be True with specific origins
     allow_methods=["*","GET","POST","PUT","DELETE","OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", idempotency.REPLAY_HEADER, NEXT_CURSOR_HEADER],
 )
 
+# Latency, in-flight and error metrics for /metrics
+app.add_middleware(metrics.PrometheusMiddleware)
+
 
 # Health check endpoint
 @app.get(
@@ -149,6 +181,18 @@ def get_status():
     }
 
 
+@app.get("/api/status/queries", tags=["test"], dependencies=[Depends(current_superuser)])
+def get_query_stats():
+    """Per-route SQL statement counts and DB time collected by this worker (superusers only)."""
+    return query_stats.route_query_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus metrics, merged across gunicorn workers."""
+    return Response(metrics.render_metrics(), media_type=metrics.CONTENT_TYPE_LATEST)
+
+
 @app.get("/openapi.yaml", include_in_schema=False)
 async def get_openapi_yaml():
     return FileResponse("swagger.yaml", media_type="application/x-yaml")
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Create the upcoming tasks of every recurring chore template.
+Schedule it daily (e.g. from cron shortly after midnight UTC); each run tops
+up the window of tasks for the next few days, and overlapping or repeated
+runs never create an occurrence twice.
+"""
+
+import argparse
+import asyncio
+
+from database import create_db_and_tables, async_session_maker
+from recurring import DEFAULT_WINDOW_DAYS, MATERIALIZE_BATCH_SIZE, materialize_recurring_tasks
+
+
+async def main(window_days: int, batch_size: int):
+    await create_db_and_tables()
+    async with async_session_maker() as session:
+        created = await materialize_recurring_tasks(
+            session, window_days=window_days, batch_size=batch_size
+        )
+    print(f"✅ Created {created} tasks from recurring templates")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--window-days", type=int, default=DEFAULT_WINDOW_DAYS, help="days ahead to create tasks for")
+    parser.add_argument("--batch-size", type=int, default=MATERIALIZE_BATCH_SIZE, help="templates per INSERT")
+    args = parser.parse_args()
+    asyncio.run(main(args.window_days, args.batch_size))
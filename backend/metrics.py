@@ -0,0 +1,161 @@
+"""Prometheus metrics for the API.
+
+Request latency per route template, requests in flight, error counts, DB pool
+checkout wait and event-loop lag, exposed at ``/metrics`` in the text format.
+
+Under gunicorn every worker has its own memory, so ``gunicorn.conf.py`` points
+``PROMETHEUS_MULTIPROC_DIR`` at a shared directory before the workers fork.
+prometheus_client then keeps the values in per-process files and ``/metrics``
+merges them, whichever worker answers the scrape.
+
+The metrics live on a registry owned by this module rather than the global
+one, so importing the module under a second name (``metrics`` and
+``backend.metrics``) can't register the same series twice.
+"""
+
+import asyncio
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    GC_COLLECTOR,
+    PLATFORM_COLLECTOR,
+    PROCESS_COLLECTOR,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from query_stats import route_path
+
+# Label for requests that matched no route, so 404 scans can't blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+# How often the event-loop lag probe wakes up, in seconds
+LOOP_LAG_INTERVAL = 1.0
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+REGISTRY = CollectorRegistry()
+for collector in (PROCESS_COLLECTOR, PLATFORM_COLLECTOR, GC_COLLECTOR):
+    REGISTRY.register(collector)
+
+REQUEST_LATENCY = Histogram(
+    "coincraft_http_request_duration_seconds",
+    "Time spent handling a request, by route template",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "coincraft_http_requests_in_progress",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+    registry=REGISTRY,
+)
+REQUEST_ERRORS = Counter(
+    "coincraft_http_request_errors_total",
+    "Requests answered with a 5xx status",
+    ["method", "route", "status"],
+    registry=REGISTRY,
+)
+UNHANDLED_EXCEPTIONS = Counter(
+    "coincraft_unhandled_exceptions_total",
+    "Exceptions that reached the catch-all middleware",
+    ["exception"],
+    registry=REGISTRY,
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "coincraft_db_pool_checkout_seconds",
+    "Time spent waiting for a database connection from the pool",
+    buckets=POOL_WAIT_BUCKETS,
+    registry=REGISTRY,
+)
+EVENT_LOOP_LAG = Gauge(
+    "coincraft_event_loop_lag_seconds",
+    "How late the event loop last ran a timer scheduled by the lag probe",
+    multiprocess_mode="livemax",
+    registry=REGISTRY,
+)
+
+
+class PrometheusMiddleware:
+    """Time each HTTP request and count 5xx responses.
+
+    A plain ASGI middleware rather than ``@app.middleware`` so it adds no
+    extra task or body streaming to the request path.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            REQUESTS_IN_PROGRESS.dec()
+            # The router fills in scope["route"] while dispatching
+            route = route_path(scope) or UNMATCHED_ROUTE
+            method = scope["method"]
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            if status_code >= 500:
+                REQUEST_ERRORS.labels(method, route, str(status_code)).inc()
+
+
+def instrument_pool(engine: AsyncEngine):
+    """Record how long ``engine`` waits to check a connection out of its pool."""
+    pool = engine.sync_engine.pool
+    if getattr(pool, "_checkout_timed", False):
+        return
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+    pool._checkout_timed = True
+
+
+async def watch_event_loop_lag(interval: float = LOOP_LAG_INTERVAL):
+    """Sleep for ``interval`` in a loop and record how late each wake-up is."""
+    loop = asyncio.get_running_loop()
+    while True:
+        scheduled = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.set(max(0.0, loop.time() - scheduled))
+
+
+def render_metrics() -> bytes:
+    """All metrics in the Prometheus text format, merged across workers."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Bring the database schema up to date by running the Alembic migrations.
+Run this once per deploy, before (re)starting the app workers. Databases
+created before migrations were tracked are adopted automatically.
+"""
+
+import asyncio
+
+from database import create_db_and_tables, verify_schema_revision
+
+
+async def main():
+    await create_db_and_tables()
+    await verify_schema_revision()
+    print("✅ Database schema is up to date")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
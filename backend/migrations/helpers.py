@@ -0,0 +1,118 @@
+"""Helpers shared by the revision scripts."""
+
+from typing import Optional
+
+import sqlalchemy as sa
+from alembic import op
+
+# Rows copied per statement by rebuild_table_online; each chunk commits on its own
+REBUILD_CHUNK_SIZE = 5000
+
+
+def has_table(table_name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(table_name)
+
+
+def has_column(table_name: str, column_name: str) -> bool:
+    columns = sa.inspect(op.get_bind()).get_columns(table_name)
+    return any(column["name"] == column_name for column in columns)
+
+
+def has_index(table_name: str, index_name: str) -> bool:
+    indexes = sa.inspect(op.get_bind()).get_indexes(table_name)
+    return any(index["name"] == index_name for index in indexes)
+
+
+def rebuild_table_online(table: sa.Table, chunk_size: Optional[int] = None) -> int:
+    """Rebuild a SQLite table to match ``table`` without a long write lock.
+
+    SQLite can only change constraints by recreating the table, and
+    ``batch_alter_table`` copies every row in one INSERT ... SELECT. Here the
+    new definition is created as a shadow table, writes to the live table are
+    mirrored into it by triggers, existing rows are copied in ``chunk_size``
+    (default ``REBUILD_CHUNK_SIZE``) rowid ranges that each commit on their own, and
+    the indexes are built on the shadow table before the final swap, a single
+    short transaction that only drops the live table and renames the shadow.
+    Columns missing from the live table take their server defaults; the rebuild
+    must not add constraints that existing rows violate.
+
+    Returns the number of rows copied.
+    """
+    chunk_size = chunk_size or REBUILD_CHUNK_SIZE
+    bind = op.get_bind()
+    quote = bind.dialect.identifier_preparer.quote
+    live = quote(table.name)
+    metadata = sa.MetaData()
+    # Stub out referenced tables so the foreign keys compile
+    for foreign_key in table.foreign_keys:
+        target_table, target_column = foreign_key.target_fullname.rsplit(".", 1)
+        if target_table not in metadata.tables:
+            sa.Table(target_table, metadata, sa.Column(target_column, sa.String()))
+    shadow_table = table.to_metadata(metadata, name=f"_{table.name}_rebuild")
+    shadow = quote(shadow_table.name)
+    triggers = [quote(f"{shadow_table.name}_{suffix}") for suffix in ("ins", "upd", "del")]
+
+    copied = 0
+    with op.get_context().autocommit_block():
+        live_columns = {column["name"] for column in sa.inspect(bind).get_columns(table.name)}
+        names = [column.name for column in table.columns if column.name in live_columns]
+        column_list = ", ".join(quote(name) for name in names)
+        new_values = ", ".join(f"NEW.{quote(name)}" for name in names)
+
+        for trigger in triggers:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute(f"DROP TABLE IF EXISTS {shadow}")
+        op.execute(sa.schema.CreateTable(shadow_table))
+
+        # Mirror concurrent writes; the rowid is kept so chunks and triggers agree.
+        # A write the new definition rejects fails rather than replacing a shadow row.
+        op.execute(
+            f"CREATE TRIGGER {triggers[0]} AFTER INSERT ON {live} BEGIN "
+            f"INSERT INTO {shadow} (rowid, {column_list}) VALUES (NEW.rowid, {new_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {triggers[1]} AFTER UPDATE ON {live} BEGIN "
+            f"DELETE FROM {shadow} WHERE rowid = OLD.rowid; "
+            f"INSERT INTO {shadow} (rowid, {column_list}) VALUES (NEW.rowid, {new_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {triggers[2]} AFTER DELETE ON {live} BEGIN "
+            f"DELETE FROM {shadow} WHERE rowid = OLD.rowid; END"
+        )
+
+        last_rowid = 0
+        while True:
+            upper = bind.exec_driver_sql(
+                f"SELECT max(rowid) FROM (SELECT rowid FROM {live} WHERE rowid > ? ORDER BY rowid LIMIT ?)",
+                (last_rowid, chunk_size),
+            ).scalar()
+            if upper is None:
+                break
+            # Rows already mirrored by a trigger are newer than the copy; keep them
+            result = bind.exec_driver_sql(
+                f"INSERT OR IGNORE INTO {shadow} (rowid, {column_list}) "
+                f"SELECT rowid, {column_list} FROM {live} WHERE rowid > ? AND rowid <= ?",
+                (last_rowid, upper),
+            )
+            copied += result.rowcount
+            last_rowid = upper
+
+        # SQLite can't rename an index, so each one is built on the shadow under
+        # its final name, replacing the live index of that name. The triggers keep
+        # enforcing a unique one on live writes until the swap.
+        for index in shadow_table.indexes:
+            op.execute(f"DROP INDEX IF EXISTS {quote(index.name)}")
+            op.execute(sa.schema.CreateIndex(index))
+
+        bind.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            for trigger in triggers:
+                bind.exec_driver_sql(f"DROP TRIGGER {trigger}")
+            bind.exec_driver_sql(f"DROP TABLE {live}")
+            bind.exec_driver_sql(f"ALTER TABLE {shadow} RENAME TO {live}")
+            bind.exec_driver_sql("COMMIT")
+        except Exception:
+            bind.exec_driver_sql("ROLLBACK")
+            raise
+
+    return copied
@@ -0,0 +1,374 @@
+"""initial schema
+
+The schema as it stood before migrations were tracked: user_module_progress
+without the assignment columns and a unique classes.class_code. The two
+follow-up revisions replay what the old migrate_*.py scripts did.
+
+Databases created by ``create_all`` before Alembic was introduced are stamped
+at this revision by ``database.create_db_and_tables`` and then upgraded; every
+later revision checks for objects that ``create_all`` may already have made.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-17 20:49:52.337845
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('achievements',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('icon', sa.String(length=100), nullable=True),
+    sa.Column('rarity', sa.String(length=50), nullable=True),
+    sa.Column('points_reward', sa.Integer(), nullable=True),
+    sa.Column('criteria', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('activities',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('emoji', sa.String(length=10), nullable=True),
+    sa.Column('difficulty', sa.String(length=10), nullable=False),
+    sa.Column('coins', sa.Integer(), nullable=False),
+    sa.Column('color_scheme', sa.String(length=20), nullable=True),
+    sa.Column('button_text', sa.String(length=50), nullable=True),
+    sa.Column('path', sa.String(length=100), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('shop_items',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('price', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('emoji', sa.String(length=10), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('teen_shop_items',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('price', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('emoji', sa.String(length=10), nullable=True),
+    sa.Column('bg_color', sa.String(length=40), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('email', sa.String(length=320), nullable=False),
+    sa.Column('hashed_password', sa.String(length=1024), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('is_superuser', sa.Boolean(), nullable=False),
+    sa.Column('is_verified', sa.Boolean(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('avatar_url', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+
+    op.create_table('budget_categories',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('budget_amount', sa.Integer(), nullable=False),
+    sa.Column('spent_amount', sa.Integer(), nullable=True),
+    sa.Column('icon', sa.String(length=100), nullable=True),
+    sa.Column('color', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('child_profiles',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('age', sa.Integer(), nullable=False),
+    sa.Column('coins', sa.Integer(), nullable=True),
+    sa.Column('level', sa.Integer(), nullable=True),
+    sa.Column('streak_days', sa.Integer(), nullable=True),
+    sa.Column('last_activity_date', sa.DateTime(), nullable=True),
+    sa.Column('parent_id', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['parent_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('goals',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('target_amount', sa.Integer(), nullable=False),
+    sa.Column('current_amount', sa.Integer(), nullable=True),
+    sa.Column('icon', sa.String(length=100), nullable=True),
+    sa.Column('color', sa.String(length=50), nullable=True),
+    sa.Column('deadline', sa.DateTime(), nullable=True),
+    sa.Column('is_completed', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('modules',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('difficulty', sa.String(length=20), nullable=True),
+    sa.Column('estimated_duration', sa.Integer(), nullable=True),
+    sa.Column('points_reward', sa.Integer(), nullable=True),
+    sa.Column('created_by', sa.String(), nullable=True),
+    sa.Column('is_published', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('parent_profiles',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('exchange_rate', sa.Float(), nullable=True),
+    sa.Column('auto_approval_limit', sa.Integer(), nullable=True),
+    sa.Column('require_approval', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('purchase_requests',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('shop_item_id', sa.String(), nullable=False),
+    sa.Column('price', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('approved_by', sa.String(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['approved_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['shop_item_id'], ['shop_items.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('redemption_requests',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('coins_amount', sa.Integer(), nullable=False),
+    sa.Column('cash_amount', sa.Float(), nullable=False),
+    sa.Column('description', sa.String(length=500), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('approved_by', sa.String(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['approved_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('tasks',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('assigned_by', sa.String(), nullable=True),
+    sa.Column('assigned_to', sa.String(), nullable=True),
+    sa.Column('coins_reward', sa.Integer(), nullable=False),
+    sa.Column('due_date', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('requires_approval', sa.Boolean(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['assigned_to'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('teacher_profiles',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('school_name', sa.String(length=200), nullable=True),
+    sa.Column('grade_level', sa.String(length=50), nullable=True),
+    sa.Column('subject', sa.String(length=100), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id')
+    )
+    op.create_table('teen_owned_items',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('shop_item_id', sa.String(), nullable=False),
+    sa.Column('acquired_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['shop_item_id'], ['teen_shop_items.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('transactions',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('type', sa.String(length=20), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('description', sa.String(length=500), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('source', sa.String(length=200), nullable=True),
+    sa.Column('reference_id', sa.String(), nullable=True),
+    sa.Column('reference_type', sa.String(length=50), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('user_achievements',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('achievement_id', sa.String(), nullable=True),
+    sa.Column('earned_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['achievement_id'], ['achievements.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('user_activities',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('activity_id', sa.Integer(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['activity_id'], ['activities.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('user_owned_items',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('shop_item_id', sa.String(), nullable=False),
+    sa.Column('acquired_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['shop_item_id'], ['shop_items.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('classes',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(length=200), nullable=False),
+    sa.Column('teacher_id', sa.String(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('class_code', sa.String(length=20), nullable=True, unique=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['teacher_id'], ['teacher_profiles.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('module_sections',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('module_id', sa.String(), nullable=True),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('content', sa.Text(), nullable=True),
+    sa.Column('order_index', sa.Integer(), nullable=False),
+    sa.Column('points_reward', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['module_id'], ['modules.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('user_module_progress',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('user_id', sa.String(), nullable=True),
+    sa.Column('module_id', sa.String(), nullable=True),
+    sa.Column('progress_percentage', sa.Float(), nullable=True),
+    sa.Column('is_completed', sa.Boolean(), nullable=True),
+    sa.Column('score', sa.Float(), nullable=True),
+    sa.Column('time_spent', sa.Integer(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['module_id'], ['modules.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('class_students',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('class_id', sa.String(), nullable=True),
+    sa.Column('student_id', sa.String(), nullable=True),
+    sa.Column('enrolled_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('module_class_assignments',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('module_id', sa.String(), nullable=True),
+    sa.Column('class_id', sa.String(), nullable=True),
+    sa.Column('assigned_by', sa.String(), nullable=True),
+    sa.Column('assigned_at', sa.DateTime(), nullable=True),
+    sa.Column('due_date', sa.DateTime(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['assigned_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ),
+    sa.ForeignKeyConstraint(['module_id'], ['modules.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('quiz_questions',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('section_id', sa.String(), nullable=True),
+    sa.Column('question_text', sa.Text(), nullable=False),
+    sa.Column('explanation', sa.Text(), nullable=True),
+    sa.Column('points', sa.Integer(), nullable=True),
+    sa.Column('order_index', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['section_id'], ['module_sections.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('quiz_options',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('question_id', sa.String(), nullable=True),
+    sa.Column('option_text', sa.String(length=500), nullable=False),
+    sa.Column('is_correct', sa.Boolean(), nullable=True),
+    sa.Column('order_index', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['quiz_questions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('quiz_options')
+    op.drop_table('quiz_questions')
+    op.drop_table('module_class_assignments')
+    op.drop_table('class_students')
+    op.drop_table('user_module_progress')
+    op.drop_table('module_sections')
+    op.drop_table('classes')
+    op.drop_table('user_owned_items')
+    op.drop_table('user_activities')
+    op.drop_table('user_achievements')
+    op.drop_table('transactions')
+    op.drop_table('teen_owned_items')
+    op.drop_table('teacher_profiles')
+    op.drop_table('tasks')
+    op.drop_table('redemption_requests')
+    op.drop_table('purchase_requests')
+    op.drop_table('parent_profiles')
+    op.drop_table('modules')
+    op.drop_table('goals')
+    op.drop_table('child_profiles')
+    op.drop_table('budget_categories')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
+    op.drop_table('teen_shop_items')
+    op.drop_table('shop_items')
+    op.drop_table('activities')
+    op.drop_table('achievements')
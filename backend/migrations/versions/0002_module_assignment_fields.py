@@ -0,0 +1,50 @@
+"""add module assignment fields to user_module_progress
+
+Replaces migrate_add_module_assignment_fields.py. ADD COLUMN does not rebuild
+the table on SQLite, so this is a plain online change. Alembic refuses to add
+the assigned_by foreign key on SQLite, but SQLite itself accepts REFERENCES on
+ADD COLUMN, so that one column is added with raw DDL there.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 21:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_column
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NEW_COLUMNS = [
+    ('assigned_by', lambda: sa.Column('assigned_by', sa.String(), sa.ForeignKey('users.id'), nullable=True)),
+    ('assigned_at', lambda: sa.Column('assigned_at', sa.DateTime(), nullable=True)),
+    ('due_date', lambda: sa.Column('due_date', sa.DateTime(), nullable=True)),
+    ('status', lambda: sa.Column('status', sa.String(length=20), nullable=True, server_default='assigned')),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, column in NEW_COLUMNS:
+        if has_column('user_module_progress', name):
+            continue
+        if name == 'assigned_by' and op.get_bind().dialect.name == 'sqlite':
+            op.execute("ALTER TABLE user_module_progress ADD COLUMN assigned_by VARCHAR REFERENCES users (id)")
+        else:
+            op.add_column('user_module_progress', column())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('user_module_progress', schema=None) as batch_op:
+        for name, _ in reversed(NEW_COLUMNS):
+            batch_op.drop_column(name)
@@ -0,0 +1,63 @@
+"""drop the unique constraint on classes.class_code
+
+Replaces migrate_remove_class_code_unique.py. SQLite cannot drop a
+constraint in place, so the table is rebuilt online in chunks.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import rebuild_table_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def classes_table(class_code_unique: bool) -> sa.Table:
+    return sa.Table(
+        'classes',
+        sa.MetaData(),
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('teacher_id', sa.String(), sa.ForeignKey('teacher_profiles.id'), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('class_code', sa.String(length=20), nullable=True, unique=class_code_unique),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def class_code_is_unique() -> bool:
+    inspector = sa.inspect(op.get_bind())
+    unique_columns = [c['column_names'] for c in inspector.get_unique_constraints('classes')]
+    unique_columns += [i['column_names'] for i in inspector.get_indexes('classes') if i['unique']]
+    return ['class_code'] in unique_columns
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not class_code_is_unique():
+        return
+    if op.get_bind().dialect.name == 'sqlite':
+        rebuild_table_online(classes_table(class_code_unique=False))
+    else:
+        op.drop_constraint('classes_class_code_key', 'classes', type_='unique')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        rebuild_table_online(classes_table(class_code_unique=True))
+    else:
+        op.create_unique_constraint('classes_class_code_key', 'classes', ['class_code'])
@@ -0,0 +1,42 @@
+"""add student_performance_stats rollup
+
+Run ``python rebuild_performance_stats.py`` afterwards to backfill it.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 21:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if has_table('student_performance_stats'):
+        return
+    op.create_table('student_performance_stats',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('completed_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('last_completed_at', sa.DateTime(), nullable=True),
+    sa.Column('needs_support', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('student_performance_stats')
@@ -0,0 +1,53 @@
+"""unique (user_id, module_id) on user_module_progress
+
+Replaces migrate_add_user_module_progress_unique.py. Duplicate progress rows
+are collapsed first, keeping the completed / most recent row per pair.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 21:25:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'uq_user_module_progress_user_module'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if has_index('user_module_progress', INDEX_NAME):
+        return
+    op.execute("""
+        DELETE FROM user_module_progress
+        WHERE id NOT IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY user_id, module_id
+                    -- NULLs last on every backend (PostgreSQL puts them first under DESC)
+                    ORDER BY is_completed IS NULL, is_completed DESC,
+                             completed_at IS NULL, completed_at DESC,
+                             started_at IS NULL, started_at DESC
+                ) AS row_num
+                FROM user_module_progress
+            ) ranked
+            WHERE row_num = 1
+        )
+    """)
+    op.create_index(INDEX_NAME, 'user_module_progress', ['user_id', 'module_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(INDEX_NAME, table_name='user_module_progress')
@@ -0,0 +1,46 @@
+"""composite indexes for the hot per-user lookups
+
+Replaces migrate_add_hot_path_indexes.py.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 21:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_transactions_user_id_created_at', 'transactions', ['user_id', 'created_at']),
+    ('ix_goals_user_id_is_completed', 'goals', ['user_id', 'is_completed']),
+    ('ix_tasks_assigned_to_status', 'tasks', ['assigned_to', 'status']),
+    ('ix_child_profiles_parent_id', 'child_profiles', ['parent_id']),
+    ('ix_class_students_class_id_student_id', 'class_students', ['class_id', 'student_id']),
+    ('ix_class_students_student_id', 'class_students', ['student_id']),
+    ('ix_redemption_requests_user_id_status', 'redemption_requests', ['user_id', 'status']),
+    ('ix_purchase_requests_user_id_status', 'purchase_requests', ['user_id', 'status']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        if not has_index(table, name):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,53 @@
+"""add user_daily_earnings rollup and keyset index on transactions
+
+The rollup is backfilled from the transactions table here.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 22:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_index, has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, Sequence[str], None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not has_table('user_daily_earnings'):
+        op.create_table('user_daily_earnings',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day')
+        )
+        op.execute(
+            "INSERT INTO user_daily_earnings (user_id, day, amount) "
+            "SELECT user_id, date(created_at), SUM(amount) FROM transactions "
+            "WHERE type = 'earn' AND user_id IS NOT NULL "
+            "GROUP BY user_id, date(created_at)"
+        )
+
+    # (user_id, created_at, id) covers everything the old index did
+    if not has_index('transactions', 'ix_transactions_user_id_created_at_id'):
+        op.create_index('ix_transactions_user_id_created_at_id', 'transactions', ['user_id', 'created_at', 'id'])
+    if has_index('transactions', 'ix_transactions_user_id_created_at'):
+        op.drop_index('ix_transactions_user_id_created_at', table_name='transactions')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_transactions_user_id_created_at', 'transactions', ['user_id', 'created_at'])
+    op.drop_index('ix_transactions_user_id_created_at_id', table_name='transactions')
+    op.drop_table('user_daily_earnings')
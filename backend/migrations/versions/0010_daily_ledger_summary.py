@@ -0,0 +1,64 @@
+"""replace user_daily_earnings with daily_ledger_summary
+
+The summary is backfilled from the transactions table here; run
+``python rebuild_ledger_summary.py --check`` to reconcile it later.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-17 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, Sequence[str], None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not has_table('daily_ledger_summary'):
+        op.create_table('daily_ledger_summary',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('category', sa.String(length=100), nullable=False),
+        sa.Column('amount_sum', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'day', 'type', 'category')
+        )
+        op.execute(
+            "INSERT INTO daily_ledger_summary (user_id, day, type, category, amount_sum, count) "
+            "SELECT user_id, date(created_at), type, COALESCE(category, ''), SUM(amount), COUNT(*) "
+            "FROM transactions WHERE user_id IS NOT NULL "
+            "GROUP BY user_id, date(created_at), type, COALESCE(category, '')"
+        )
+    # Every earning is in the summary now
+    if has_table('user_daily_earnings'):
+        op.drop_table('user_daily_earnings')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_table('user_daily_earnings',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    op.execute(
+        "INSERT INTO user_daily_earnings (user_id, day, amount) "
+        "SELECT user_id, day, SUM(amount_sum) FROM daily_ledger_summary "
+        "WHERE type = 'earn' GROUP BY user_id, day"
+    )
+    op.drop_table('daily_ledger_summary')
@@ -0,0 +1,80 @@
+"""add transactions_archive and monthly_ledger_summary
+
+Both start empty; ``python archive_transactions.py`` fills them.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, Sequence[str], None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not has_table('transactions_archive'):
+        op.create_table('transactions_archive',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('user_id', sa.String(), nullable=True),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('description', sa.String(length=500), nullable=False),
+        sa.Column('category', sa.String(length=100), nullable=True),
+        sa.Column('source', sa.String(length=200), nullable=True),
+        sa.Column('reference_id', sa.String(), nullable=True),
+        sa.Column('reference_type', sa.String(length=50), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_transactions_archive_user_id_created_at_id', 'transactions_archive', ['user_id', 'created_at', 'id'], unique=False)
+        op.create_index('ix_transactions_archive_month', 'transactions_archive', ['month'], unique=False)
+    if not has_table('monthly_ledger_summary'):
+        op.create_table('monthly_ledger_summary',
+        sa.Column('user_id', sa.String(), nullable=False),
+        sa.Column('month', sa.Date(), nullable=False),
+        sa.Column('type', sa.String(length=20), nullable=False),
+        sa.Column('category', sa.String(length=100), nullable=False),
+        sa.Column('amount_sum', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'month', 'type', 'category')
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema.
+
+    Archived rows go back to the transactions table and daily_ledger_summary
+    is rebuilt from it, which expands the compacted months again.
+    """
+    op.execute(
+        "INSERT INTO transactions (id, user_id, type, amount, description, category, source, "
+        "reference_id, reference_type, created_at) "
+        "SELECT id, user_id, type, amount, description, category, source, "
+        "reference_id, reference_type, created_at FROM transactions_archive"
+    )
+    op.execute("DELETE FROM daily_ledger_summary")
+    op.execute(
+        "INSERT INTO daily_ledger_summary (user_id, day, type, category, amount_sum, count) "
+        "SELECT user_id, date(created_at), type, COALESCE(category, ''), SUM(amount), COUNT(*) "
+        "FROM transactions WHERE user_id IS NOT NULL "
+        "GROUP BY user_id, date(created_at), type, COALESCE(category, '')"
+    )
+    op.drop_table('monthly_ledger_summary')
+    op.drop_index('ix_transactions_archive_month', table_name='transactions_archive')
+    op.drop_index('ix_transactions_archive_user_id_created_at_id', table_name='transactions_archive')
+    op.drop_table('transactions_archive')
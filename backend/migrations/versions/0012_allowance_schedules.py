@@ -0,0 +1,55 @@
+"""add allowance_schedules
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, Sequence[str], None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if has_table('allowance_schedules'):
+        return
+    op.create_table('allowance_schedules',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('child_id', sa.String(), nullable=False),
+    sa.Column('parent_id', sa.String(), nullable=False),
+    sa.Column('amount', sa.Integer(), nullable=False),
+    sa.Column('weekday', sa.Integer(), nullable=False),
+    sa.Column('goal_id', sa.String(), nullable=True),
+    sa.Column('goal_percent', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('starts_on', sa.Date(), nullable=False),
+    sa.Column('last_paid_on', sa.Date(), nullable=True),
+    sa.Column('last_saved_amount', sa.Integer(), nullable=False),
+    sa.Column('last_run_id', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['child_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['parent_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('child_id')
+    )
+    op.create_index('ix_allowance_schedules_weekday_last_paid_on', 'allowance_schedules', ['weekday', 'last_paid_on'], unique=False)
+    op.create_index('ix_allowance_schedules_last_run_id', 'allowance_schedules', ['last_run_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_allowance_schedules_last_run_id', table_name='allowance_schedules')
+    op.drop_index('ix_allowance_schedules_weekday_last_paid_on', table_name='allowance_schedules')
+    op.drop_table('allowance_schedules')
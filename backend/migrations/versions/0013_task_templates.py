@@ -0,0 +1,75 @@
+"""add task_templates, and the template occurrence of materialized tasks
+
+ADD COLUMN does not rebuild the table on SQLite. Alembic refuses to add the
+template_id foreign key there, but SQLite accepts REFERENCES on ADD COLUMN, so
+that column is added with raw DDL. The unique (template_id, occurs_on) index
+is what keeps the materializer from creating an occurrence twice; one-off
+tasks have NULLs there and don't collide.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_column, has_index, has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, Sequence[str], None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_NAME = 'uq_tasks_template_id_occurs_on'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not has_table('task_templates'):
+        op.create_table('task_templates',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('assigned_by', sa.String(), nullable=False),
+        sa.Column('assigned_to', sa.String(), nullable=False),
+        sa.Column('coins_reward', sa.Integer(), nullable=False),
+        sa.Column('requires_approval', sa.Boolean(), nullable=False),
+        sa.Column('frequency', sa.String(length=10), nullable=False),
+        sa.Column('weekdays', sa.String(length=7), nullable=True),
+        sa.Column('starts_on', sa.Date(), nullable=False),
+        sa.Column('ends_on', sa.Date(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('materialized_through', sa.Date(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['assigned_by'], ['users.id'], ),
+        sa.ForeignKeyConstraint(['assigned_to'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_task_templates_is_active_materialized_through', 'task_templates', ['is_active', 'materialized_through'], unique=False)
+        op.create_index('ix_task_templates_assigned_by', 'task_templates', ['assigned_by'], unique=False)
+
+    if not has_column('tasks', 'template_id'):
+        if op.get_bind().dialect.name == 'sqlite':
+            op.execute("ALTER TABLE tasks ADD COLUMN template_id VARCHAR REFERENCES task_templates (id)")
+        else:
+            op.add_column('tasks', sa.Column('template_id', sa.String(), sa.ForeignKey('task_templates.id'), nullable=True))
+    if not has_column('tasks', 'occurs_on'):
+        op.add_column('tasks', sa.Column('occurs_on', sa.Date(), nullable=True))
+    if not has_index('tasks', INDEX_NAME):
+        op.create_index(INDEX_NAME, 'tasks', ['template_id', 'occurs_on'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(INDEX_NAME, table_name='tasks')
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_column('occurs_on')
+        batch_op.drop_column('template_id')
+    op.drop_index('ix_task_templates_assigned_by', table_name='task_templates')
+    op.drop_index('ix_task_templates_is_active_materialized_through', table_name='task_templates')
+    op.drop_table('task_templates')
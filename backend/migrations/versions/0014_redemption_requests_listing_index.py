@@ -0,0 +1,41 @@
+"""(user_id, status, created_at) index for the parent redemption listing
+
+Replaces ix_redemption_requests_user_id_status, which is a prefix of the new
+index. With created_at in the key a child's requests in one status come out
+of the index already in listing order.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0014'
+down_revision: Union[str, Sequence[str], None] = '0013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OLD_INDEX = 'ix_redemption_requests_user_id_status'
+NEW_INDEX = 'ix_redemption_requests_user_id_status_created_at'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not has_index('redemption_requests', NEW_INDEX):
+        op.create_index(NEW_INDEX, 'redemption_requests', ['user_id', 'status', 'created_at'])
+    if has_index('redemption_requests', OLD_INDEX):
+        op.drop_index(OLD_INDEX, table_name='redemption_requests')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(OLD_INDEX, 'redemption_requests', ['user_id', 'status'])
+    op.drop_index(NEW_INDEX, table_name='redemption_requests')
@@ -0,0 +1,42 @@
+"""add teacher_daily_stats rollup
+
+Run ``python refresh_class_analytics.py --full`` afterwards to backfill it.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import has_table
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0015'
+down_revision: Union[str, Sequence[str], None] = '0014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if has_table('teacher_daily_stats'):
+        return
+    op.create_table('teacher_daily_stats',
+    sa.Column('teacher_id', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('completions', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('active_students', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['teacher_id'], ['teacher_profiles.id'], ),
+    sa.PrimaryKeyConstraint('teacher_id', 'day')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('teacher_daily_stats')
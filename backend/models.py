@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from typing import Optional
 from enum import Enum as PyEnum
 
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Float, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, Text, Float, ForeignKey, JSON, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from fastapi_users.db import SQLAlchemyBaseUserTable
@@ -69,6 +69,10 @@ class ChildProfile(Base):
     
     user = relationship("User", back_populates="child_profile", primaryjoin="ChildProfile.user_id == User.id")
     parent = relationship("User", primaryjoin="ChildProfile.parent_id == User.id")
+    
+    __table_args__ = (
+        Index("ix_child_profiles_parent_id", "parent_id"),
+    )
 
 
 class ParentProfile(Base):
@@ -119,25 +123,58 @@ class Goal(Base):
     updated_at = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
     
     user = relationship("User", back_populates="goals")
+    
+    __table_args__ = (
+        Index("ix_goals_user_id_is_completed", "user_id", "is_completed"),
+    )
 
 
 class Transaction(Base):
-    """Financial transactions (earn, spend, save)."""
+    """Financial transactions (earn, spend, save, refund)."""
     
     __tablename__ = "transactions"
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"))
-    type = Column(String(20), nullable=False)  # earn, spend, save
+    type = Column(String(20), nullable=False)  # earn, spend, save, refund
     amount = Column(Integer, nullable=False)
     description = Column(String(500), nullable=False)
     category = Column(String(100), nullable=True)
     source = Column(String(200), nullable=True)
     reference_id = Column(String, nullable=True)  # ID of related goal, task, etc.
     reference_type = Column(String(50), nullable=True)  # goal, task, activity, shop, redemption
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     
     user = relationship("User", back_populates="transactions")
+    
+    __table_args__ = (
+        # Serves per-user history pages in (created_at, id) keyset order
+        Index("ix_transactions_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
+
+class TransactionArchive(Base):
+    """Transactions moved out of the hot table by archive_transactions.py, by month."""
+    
+    __tablename__ = "transactions_archive"
+    
+    id = Column(String, primary_key=True)
+    user_id = Column(String, ForeignKey("users.id"))
+    type = Column(String(20), nullable=False)
+    amount = Column(Integer, nullable=False)
+    description = Column(String(500), nullable=False)
+    category = Column(String(100), nullable=True)
+    source = Column(String(200), nullable=True)
+    reference_id = Column(String, nullable=True)
+    reference_type = Column(String(50), nullable=True)
+    created_at = Column(DateTime)
+    month = Column(Date, nullable=False)  # first day of the created_at month
+    
+    __table_args__ = (
+        # Same keyset order as the hot table, so history pages continue seamlessly
+        Index("ix_transactions_archive_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_transactions_archive_month", "month"),
+    )
 
 
 class Achievement(Base):
@@ -280,6 +317,25 @@ class UserModuleProgress(Base):
     user = relationship("User", foreign_keys=[user_id], back_populates="user_progress")
     module = relationship("Module", back_populates="user_progress")
     assigner = relationship("User", foreign_keys=[assigned_by])
+    
+    __table_args__ = (
+        # One progress row per student and module; bulk assignment relies on it
+        Index("uq_user_module_progress_user_module", "user_id", "module_id", unique=True),
+    )
+
+
+class StudentPerformanceStats(Base):
+    """Per-student rollup of completed module scores (maintained on completion)."""
+    
+    __tablename__ = "student_performance_stats"
+    
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    completed_count = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Float, default=0.0, nullable=False)
+    last_completed_at = Column(DateTime, nullable=True)
+    needs_support = Column(Boolean, default=False, nullable=False)  # average score below 70
+    
+    user = relationship("User")
 
 
 class ModuleClassAssignment(Base):
@@ -317,9 +373,68 @@ class Task(Base):
     completed_at = Column(DateTime, nullable=True)
     approved_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    template_id = Column(String, ForeignKey("task_templates.id"), nullable=True)  # set on tasks materialized from a template
+    occurs_on = Column(Date, nullable=True)  # the template occurrence this task is for
     
     assigner = relationship("User", foreign_keys=[assigned_by], back_populates="tasks_created")
     assignee = relationship("User", foreign_keys=[assigned_to], back_populates="tasks_assigned")
+    
+    __table_args__ = (
+        Index("ix_tasks_assigned_to_status", "assigned_to", "status"),
+        Index("uq_tasks_template_id_occurs_on", "template_id", "occurs_on", unique=True),
+    )
+
+
+class TaskTemplate(Base):
+    """Recurring chore a parent sets for a child, materialized into tasks by materialize_tasks.py."""
+    
+    __tablename__ = "task_templates"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    title = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    assigned_by = Column(String, ForeignKey("users.id"), nullable=False)
+    assigned_to = Column(String, ForeignKey("users.id"), nullable=False)
+    coins_reward = Column(Integer, nullable=False)
+    requires_approval = Column(Boolean, default=True, nullable=False)
+    frequency = Column(String(10), nullable=False)  # daily, weekly
+    weekdays = Column(String(7), nullable=True)  # weekly only: digits 0 = Monday ... 6 = Sunday, e.g. "024"
+    starts_on = Column(Date, nullable=False)
+    ends_on = Column(Date, nullable=True)
+    is_active = Column(Boolean, default=True, nullable=False)
+    materialized_through = Column(Date, nullable=True)  # last day tasks have been generated for
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        Index("ix_task_templates_is_active_materialized_through", "is_active", "materialized_through"),
+        Index("ix_task_templates_assigned_by", "assigned_by"),
+    )
+
+
+class AllowanceSchedule(Base):
+    """Weekly allowance a parent pays a child, applied in bulk by pay_allowances.py."""
+    
+    __tablename__ = "allowance_schedules"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    child_id = Column(String, ForeignKey("users.id"), unique=True, nullable=False)
+    parent_id = Column(String, ForeignKey("users.id"), nullable=False)
+    amount = Column(Integer, nullable=False)
+    weekday = Column(Integer, nullable=False)  # 0 = Monday ... 6 = Sunday
+    goal_id = Column(String, nullable=True)  # goal that gets goal_percent of each payment
+    goal_percent = Column(Integer, default=0, nullable=False)
+    is_active = Column(Boolean, default=True, nullable=False)
+    starts_on = Column(Date, nullable=False)  # first day a payment can fall on
+    last_paid_on = Column(Date, nullable=True)
+    last_saved_amount = Column(Integer, default=0, nullable=False)  # part of the last payment put into the goal
+    last_run_id = Column(String, nullable=True)  # payment run that last paid this schedule
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        Index("ix_allowance_schedules_weekday_last_paid_on", "weekday", "last_paid_on"),
+        Index("ix_allowance_schedules_last_run_id", "last_run_id"),
+    )
 
 
 class Class(Base):
@@ -351,7 +466,68 @@ class ClassStudent(Base):
     
     class_obj = relationship("Class", back_populates="students")
     student = relationship("User")
+    
+    __table_args__ = (
+        Index("ix_class_students_class_id_student_id", "class_id", "student_id"),
+        Index("ix_class_students_student_id", "student_id"),
+    )
+
+
+class ClassDailyStats(Base):
+    """Per-class, per-day rollup of module completions (feeds teacher analytics)."""
+    
+    __tablename__ = "class_daily_stats"
+    
+    class_id = Column(String, ForeignKey("classes.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    completions = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Float, default=0.0, nullable=False)
+    active_students = Column(Integer, default=0, nullable=False)  # distinct students completing that day
+    
+    class_obj = relationship("Class")
+
 
+class TeacherDailyStats(Base):
+    """Per-teacher, per-day rollup of module completions across the teacher's classes.
+
+    A student in several of the teacher's classes is counted once, unlike a
+    sum of their ``class_daily_stats`` rows.
+    """
+    
+    __tablename__ = "teacher_daily_stats"
+    
+    teacher_id = Column(String, ForeignKey("teacher_profiles.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    completions = Column(Integer, default=0, nullable=False)
+    score_sum = Column(Float, default=0.0, nullable=False)
+    active_students = Column(Integer, default=0, nullable=False)  # distinct students completing that day
+
+
+class DailyLedgerSummary(Base):
+    """Per-user, per-day ledger totals by type and category (feeds transaction analytics)."""
+    
+    __tablename__ = "daily_ledger_summary"
+    
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    type = Column(String(20), primary_key=True)  # earn, spend, save
+    category = Column(String(100), primary_key=True, default="")  # "" for uncategorized transactions
+    amount_sum = Column(Integer, default=0, nullable=False)
+    count = Column(Integer, default=0, nullable=False)
+
+
+
+class MonthlyLedgerSummary(Base):
+    """daily_ledger_summary rows for archived months, compacted to one row per month."""
+    
+    __tablename__ = "monthly_ledger_summary"
+    
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    month = Column(Date, primary_key=True)  # first day of the month
+    type = Column(String(20), primary_key=True)
+    category = Column(String(100), primary_key=True, default="")
+    amount_sum = Column(Integer, default=0, nullable=False)
+    count = Column(Integer, default=0, nullable=False)
 
 class RedemptionRequest(Base):
     """Requests to convert coins to real money."""
@@ -370,6 +546,10 @@ class RedemptionRequest(Base):
     
     user = relationship("User", back_populates="redemption_requests", primaryjoin="RedemptionRequest.user_id == User.id")
     approver = relationship("User", primaryjoin="RedemptionRequest.approved_by == User.id")
+    
+    __table_args__ = (
+        Index("ix_redemption_requests_user_id_status_created_at", "user_id", "status", "created_at"),
+    )
 
 
 class PurchaseRequest(Base):
@@ -389,6 +569,11 @@ class PurchaseRequest(Base):
     user = relationship("User", primaryjoin="PurchaseRequest.user_id == User.id")
     approver = relationship("User", primaryjoin="PurchaseRequest.approved_by == User.id")
     item = relationship("ShopItem")
+    
+    __table_args__ = (
+        Index("ix_purchase_requests_user_id_status", "user_id", "status"),
+    )
+
 
 class BudgetCategory(Base):
     """Budget categories for teen users."""
@@ -470,4 +655,23 @@ class UserActivity(Base):
     activity = relationship("Activity")
 
     def __repr__(self):
-        return f"<UserActivity(user_id={self.user_id}, activity_id={self.activity_id})>"
\ No newline at end of file
+        return f"<UserActivity(user_id={self.user_id}, activity_id={self.activity_id})>"
+
+class IdempotencyKey(Base):
+    """Result of a POST sent with an ``Idempotency-Key`` header, kept for replays."""
+
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of method, path and body
+    status = Column(String(20), nullable=False, default="in_progress")  # in_progress, completed
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    content_type = Column(String(100), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
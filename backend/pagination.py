@@ -0,0 +1,40 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor is the sort key of the last row on a page, JSON-encoded and then
+base64url'd so clients treat it as an opaque token. The next page is the rows
+strictly after that key, which costs the same however deep the page is.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+# Response header carrying the next page's cursor on endpoints whose body is a plain list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Page size of a list endpoint when a cursor is given without a limit
+DEFAULT_PAGE_SIZE = 50
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, str]]:
+    """Return the (created_at, id) key in ``cursor``, or None without a cursor."""
+    if cursor is None:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
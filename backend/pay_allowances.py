@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Pay every weekly allowance that is due, in one database transaction.
+Schedule it daily (e.g. from cron shortly after midnight UTC); a schedule is
+paid on its weekday, a missed run is caught up by the next one, and rerunning
+on the same day pays nothing twice.
+"""
+
+import asyncio
+
+from allowances import pay_due_allowances
+from database import create_db_and_tables, async_session_maker
+
+
+async def main():
+    await create_db_and_tables()
+    async with async_session_maker() as session:
+        paid = await pay_due_allowances(session)
+    print(f"✅ Paid {paid} allowances")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
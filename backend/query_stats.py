@@ -0,0 +1,156 @@
+"""Per-request SQL instrumentation.
+
+Engine events count every statement and time it; the middleware in ``main.py``
+opens a ``RequestQueryStats`` per request, reports it in the ``Server-Timing``
+response header and folds it into per-route totals.
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Longest statement prefix kept for the slowest-statement report
+STATEMENT_PREVIEW_LENGTH = 200
+
+
+class RequestQueryStats:
+    """Statements executed while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed >= self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement[:STATEMENT_PREVIEW_LENGTH]
+
+    def server_timing(self) -> str:
+        """Format as a ``Server-Timing`` header value (durations in ms)."""
+        return (
+            f'db;dur={self.total_time * 1000:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest_time * 1000:.2f}"
+        )
+
+
+class RouteQueryStats:
+    """Running totals for every request served by one route."""
+
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.total_time = 0.0
+        self.max_statements = 0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def add(self, stats: RequestQueryStats):
+        self.requests += 1
+        self.statements += stats.count
+        self.total_time += stats.total_time
+        self.max_statements = max(self.max_statements, stats.count)
+        if stats.slowest_time >= self.slowest_time and stats.slowest_statement:
+            self.slowest_time = stats.slowest_time
+            self.slowest_statement = stats.slowest_statement
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "avg_statements": round(self.statements / self.requests, 2) if self.requests else 0,
+            "max_statements": self.max_statements,
+            "avg_db_ms": round(self.total_time * 1000 / self.requests, 2) if self.requests else 0,
+            "slowest_ms": round(self.slowest_time * 1000, 2),
+            "slowest_statement": self.slowest_statement,
+        }
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+_route_stats: Dict[str, RouteQueryStats] = {}
+
+
+def start_request() -> RequestQueryStats:
+    """Begin collecting statements for the current request."""
+    stats = RequestQueryStats()
+    _current_stats.set(stats)
+    return stats
+
+
+def record_route(route: str, stats: RequestQueryStats):
+    """Fold a finished request into the totals for ``route`` (e.g. ``GET /api/goals/{goal_id}``)."""
+    _route_stats.setdefault(route, RouteQueryStats()).add(stats)
+
+
+def route_query_stats() -> Dict[str, dict]:
+    """Per-route totals, busiest routes (by statements executed) first."""
+    ordered = sorted(_route_stats.items(), key=lambda item: item[1].statements, reverse=True)
+    return {route: stats.to_dict() for route, stats in ordered}
+
+
+def reset_route_query_stats():
+    _route_stats.clear()
+
+
+def route_path(scope) -> Optional[str]:
+    """The route template that served ``scope`` (e.g. ``/api/goals/{goal_id}``).
+
+    ``scope["route"].path`` is relative to the router it was declared on, so
+    the template is rebuilt from the requested path by putting each matched
+    path parameter back in place of its value.
+    """
+    if scope.get("route") is None:
+        return None
+    params = {value: f"{{{name}}}" for name, value in scope.get("path_params", {}).items()}
+    if not params:
+        return scope["path"]
+    return "/".join(params.get(segment, segment) for segment in scope["path"].split("/"))
+
+
+def route_template(request) -> Optional[str]:
+    """``METHOD /full/path/{param}`` for the route that served ``request``."""
+    path = route_path(request.scope)
+    return f"{request.method} {path}" if path is not None else None
+
+
+def query_count(headers) -> int:
+    """Read the statement count back out of a response's ``Server-Timing`` header."""
+    for metric in headers.get("server-timing", "").split(","):
+        name, _, params = metric.strip().partition(";")
+        if name == "db":
+            for param in params.split(";"):
+                if param.startswith("desc="):
+                    return int(param[len("desc="):].strip('"').split()[0])
+    raise ValueError("response has no db Server-Timing metric")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute never fires for a failed statement
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Attach the statement counters to ``engine`` (idempotent)."""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
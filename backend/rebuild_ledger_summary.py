@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Reconcile the daily_ledger_summary rollup with the transactions table.
+Ledger writes keep the summary current as they happen; run this after
+importing or editing transactions outside the API. By default only users whose
+summary has drifted are rebuilt; --check just reports them (exit status 1 when
+any are found) and --full rebuilds every user.
+"""
+
+import argparse
+import asyncio
+import sys
+
+from database import create_db_and_tables, async_session_maker
+from rollups import rebuild_daily_ledger_summary, stale_ledger_summary_users
+
+
+async def main(check: bool, full: bool) -> int:
+    await create_db_and_tables()
+    async with async_session_maker() as session:
+        if full:
+            rows = await rebuild_daily_ledger_summary(session)
+            await session.commit()
+            print(f"✅ Rebuilt {rows} ledger summary rows")
+            return 0
+
+        stale = await stale_ledger_summary_users(session)
+        if not stale:
+            print("✅ Ledger summary matches the transactions table")
+            return 0
+        if check:
+            print(f"❌ Ledger summary is out of date for {len(stale)} users:")
+            for user_id in stale:
+                print(f"   {user_id}")
+            return 1
+
+        rows = await rebuild_daily_ledger_summary(session, stale)
+        await session.commit()
+    print(f"✅ Rebuilt {rows} ledger summary rows for {len(stale)} users")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--check", action="store_true", help="report drifted users without repairing them")
+    parser.add_argument("--full", action="store_true", help="rebuild the summary for every user")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.check, args.full)))
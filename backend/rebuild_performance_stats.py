@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""
+Rebuild the student_performance_stats rollup from user_module_progress.
+Run this once after deploying the table (backfill), or whenever the rollup is
+suspected to be out of sync with the raw progress rows.
+"""
+
+import asyncio
+
+from database import create_db_and_tables, async_session_maker
+from rollups import rebuild_student_performance_stats
+
+
+async def main():
+    await create_db_and_tables()
+    async with async_session_maker() as session:
+        students = await rebuild_student_performance_stats(session)
+        await session.commit()
+    print(f"✅ Rebuilt performance stats for {students} students")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
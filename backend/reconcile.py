@@ -0,0 +1,211 @@
+"""Checking ``ChildProfile.coins`` against the ledger.
+
+A child's balance should equal everything they earned or had refunded minus
+everything they spent or saved. ``check_chunk`` compares the two for one key range of child
+profiles in a single statement, with the ledger side summed in SQL from
+``daily_ledger_summary`` and ``monthly_ledger_summary``, and can set drifted
+balances back to the ledger's figure. ``reconcile`` walks every profile one
+chunk at a time, optionally across a process pool, and only keeps running
+totals, so memory stays flat however many users there are.
+
+The summaries are what this compares against, so check them against the raw
+transactions first (``rebuild_ledger_summary.py --check``).
+"""
+
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from prometheus_client import CollectorRegistry, Gauge, write_to_textfile
+from sqlalchemy import case, func, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from ledger import CREDIT_TYPES
+from models import ChildProfile, DailyLedgerSummary, MonthlyLedgerSummary
+
+# Child profiles checked per statement (and per task on the process pool)
+RECONCILE_CHUNK_SIZE = 5000
+
+
+@dataclass
+class Mismatch:
+    user_id: str
+    coins: int
+    expected: int
+    repaired: bool = False
+
+
+@dataclass
+class ChunkResult:
+    checked: int = 0
+    mismatches: List[Mismatch] = field(default_factory=list)
+
+
+@dataclass
+class ReconcileReport:
+    checked: int = 0
+    mismatched: int = 0
+    repaired: int = 0
+    drift: int = 0  # sum of |coins - expected| over mismatched users
+    duration: float = 0.0
+
+    def add(self, result: ChunkResult):
+        self.checked += result.checked
+        self.mismatched += len(result.mismatches)
+        self.repaired += sum(m.repaired for m in result.mismatches)
+        self.drift += sum(abs(m.coins - m.expected) for m in result.mismatches)
+
+
+def _in_range(column, after: Optional[str], upto: Optional[str]):
+    conditions = []
+    if after is not None:
+        conditions.append(column > after)
+    if upto is not None:
+        conditions.append(column <= upto)
+    return conditions
+
+
+async def chunk_bounds(session: AsyncSession, chunk_size: int = RECONCILE_CHUNK_SIZE) -> AsyncIterator[Tuple[Optional[str], Optional[str]]]:
+    """Yield ``(after, upto]`` user_id ranges of ``chunk_size`` profiles covering every child.
+
+    Each boundary is one seek on the user_id index; the last range is open-ended.
+    """
+    after = None
+    while True:
+        stmt = (
+            select(ChildProfile.user_id)
+            .where(*_in_range(ChildProfile.user_id, after, None))
+            .order_by(ChildProfile.user_id)
+            .offset(chunk_size - 1)
+            .limit(1)
+        )
+        upto = (await session.execute(stmt)).scalar_one_or_none()
+        yield after, upto
+        if upto is None:
+            return
+        after = upto
+
+
+async def check_chunk(
+    session: AsyncSession, after: Optional[str], upto: Optional[str], repair: bool = False
+) -> ChunkResult:
+    """Compare balances with the ledger for profiles with ``after < user_id <= upto``.
+
+    With ``repair`` each drifted balance is set to the ledger's figure, unless
+    it changed since it was read (the next run picks that user up again).
+    Commits when it repaired anything.
+    """
+    entries = union_all(
+        select(DailyLedgerSummary.user_id, DailyLedgerSummary.type, DailyLedgerSummary.amount_sum)
+        .where(*_in_range(DailyLedgerSummary.user_id, after, upto)),
+        select(MonthlyLedgerSummary.user_id, MonthlyLedgerSummary.type, MonthlyLedgerSummary.amount_sum)
+        .where(*_in_range(MonthlyLedgerSummary.user_id, after, upto)),
+    ).subquery()
+    signed = case((entries.c.type.in_(CREDIT_TYPES), entries.c.amount_sum), else_=-entries.c.amount_sum)
+    ledger = (
+        select(entries.c.user_id, func.sum(signed).label("balance"))
+        .group_by(entries.c.user_id)
+        .subquery()
+    )
+    coins = func.coalesce(ChildProfile.coins, 0)
+    stmt = (
+        select(ChildProfile.user_id, coins, func.coalesce(ledger.c.balance, 0))
+        .outerjoin(ledger, ledger.c.user_id == ChildProfile.user_id)
+        .where(*_in_range(ChildProfile.user_id, after, upto))
+    )
+    result = ChunkResult()
+    for user_id, balance, expected in await session.execute(stmt):
+        result.checked += 1
+        if balance != expected:
+            result.mismatches.append(Mismatch(user_id, balance, expected))
+
+    if repair and result.mismatches:
+        for mismatch in result.mismatches:
+            updated = await session.execute(
+                update(ChildProfile)
+                .where(ChildProfile.user_id == mismatch.user_id, coins == mismatch.coins)
+                .values(coins=mismatch.expected)
+                .execution_options(synchronize_session=False)
+            )
+            mismatch.repaired = updated.rowcount == 1
+        await session.commit()
+    return result
+
+
+# Per-process state of the pool workers: an event loop and a session factory
+_worker = {}
+
+
+def _init_worker(database_url: str):
+    _worker["loop"] = asyncio.new_event_loop()
+    engine = create_async_engine(database_url)
+    _worker["sessions"] = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _check_chunk_in_worker(after: Optional[str], upto: Optional[str], repair: bool) -> ChunkResult:
+    async def run():
+        async with _worker["sessions"]() as session:
+            return await check_chunk(session, after, upto, repair)
+
+    return _worker["loop"].run_until_complete(run())
+
+
+async def reconcile(
+    session: AsyncSession,
+    repair: bool = False,
+    chunk_size: int = RECONCILE_CHUNK_SIZE,
+    workers: int = 1,
+    database_url: Optional[str] = None,
+    on_chunk: Optional[Callable[[ChunkResult], None]] = None,
+) -> ReconcileReport:
+    """Check every child profile, ``chunk_size`` at a time.
+
+    With ``workers > 1`` the chunks are checked by a pool of processes that
+    each open their own connection to ``database_url``; ``session`` then only
+    finds the chunk boundaries. At most two chunks per worker are in flight.
+    ``on_chunk`` sees each chunk's result as it finishes, in no fixed order.
+    """
+    report = ReconcileReport()
+    started = time.perf_counter()
+
+    def finish(result: ChunkResult):
+        report.add(result)
+        if on_chunk is not None:
+            on_chunk(result)
+
+    if workers <= 1:
+        async for after, upto in chunk_bounds(session, chunk_size):
+            finish(await check_chunk(session, after, upto, repair))
+    else:
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(database_url,)) as pool:
+            pending = set()
+            async for after, upto in chunk_bounds(session, chunk_size):
+                if len(pending) >= 2 * workers:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        finish(future.result())
+                pending.add(loop.run_in_executor(pool, _check_chunk_in_worker, after, upto, repair))
+            for future in asyncio.as_completed(pending):
+                finish(await future)
+
+    report.duration = time.perf_counter() - started
+    return report
+
+
+def write_metrics(report: ReconcileReport, path: str):
+    """Write the run's results in the Prometheus text format (for node_exporter's textfile collector)."""
+    registry = CollectorRegistry()
+    values = {
+        "users_checked": ("Child profiles checked by the last reconciliation run", report.checked),
+        "mismatches": ("Balances that disagreed with the ledger", report.mismatched),
+        "repaired": ("Balances set back to the ledger's figure", report.repaired),
+        "drift_coins": ("Total absolute difference between balances and the ledger", report.drift),
+        "duration_seconds": ("How long the last run took", report.duration),
+        "last_run_timestamp_seconds": ("When the last run finished", time.time()),
+    }
+    for name, (description, value) in values.items():
+        Gauge(f"coincraft_ledger_reconcile_{name}", description, registry=registry).set(value)
+    write_to_textfile(path, registry)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Check every child's coin balance against the ledger (earned minus spent and
+saved) and report the ones that drifted; exit status 1 when any did. With
+--repair the drifted balances are set to the ledger's figure instead.
+Schedule it (e.g. nightly from cron) after rebuild_ledger_summary.py --check;
+--metrics-file writes the results for node_exporter's textfile collector.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+from database import DATABASE_URL, create_db_and_tables, async_session_maker
+from reconcile import RECONCILE_CHUNK_SIZE, ChunkResult, reconcile, write_metrics
+
+
+def print_mismatches(result: ChunkResult):
+    for m in result.mismatches:
+        action = "repaired" if m.repaired else "mismatch"
+        print(f"   {action}: {m.user_id} has {m.coins} coins, ledger says {m.expected}")
+
+
+async def main(repair: bool, workers: int, chunk_size: int, metrics_file: str) -> int:
+    await create_db_and_tables()
+    async with async_session_maker() as session:
+        report = await reconcile(
+            session,
+            repair=repair,
+            chunk_size=chunk_size,
+            workers=workers,
+            database_url=DATABASE_URL,
+            on_chunk=print_mismatches,
+        )
+    if metrics_file:
+        write_metrics(report, metrics_file)
+
+    summary = f"{report.checked} balances checked in {report.duration:.1f}s"
+    if not report.mismatched:
+        print(f"✅ {summary}, all match the ledger")
+        return 0
+    if repair:
+        print(f"✅ {summary}, repaired {report.repaired} of {report.mismatched} (drift {report.drift} coins)")
+        return 0 if report.repaired == report.mismatched else 1
+    print(f"❌ {summary}, {report.mismatched} disagree with the ledger (drift {report.drift} coins)")
+    return 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repair", action="store_true", help="set drifted balances to the ledger's figure")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes checking chunks in parallel")
+    parser.add_argument("--chunk-size", type=int, default=RECONCILE_CHUNK_SIZE, help="child profiles per chunk")
+    parser.add_argument("--metrics-file", help="write Prometheus metrics to this .prom file")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.repair, args.workers, args.chunk_size, args.metrics_file)))
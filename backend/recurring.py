@@ -0,0 +1,137 @@
+"""Materializing recurring chore templates into tasks.
+
+A ``TaskTemplate`` repeats daily, or weekly on a set of weekdays.
+``materialize_recurring_tasks`` creates the ``Task`` rows for the next
+``window_days`` days for every active template, working through the templates
+in keyset batches. Each batch is one INSERT ... SELECT that crosses the
+templates with the days of the window, so the number of statements depends
+on the number of batches, not on templates or occurrences.
+
+Every materialized task carries its ``(template_id, occurs_on)`` and the
+insert skips rows that would break the unique index on that pair, so
+overlapping or repeated runs never create an occurrence twice. Templates
+record how far they have been materialized; a daily run only touches the
+templates whose window has moved and only adds the new day. A task the parent
+deleted is therefore not brought back.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import Date, DateTime, and_, literal, or_, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import dialect_insert
+from models import ChildProfile, Task, TaskTemplate
+
+DEFAULT_WINDOW_DAYS = 7
+
+# Templates materialized per INSERT ... SELECT; each batch commits on its own
+MATERIALIZE_BATCH_SIZE = 500
+
+TASK_COLUMNS = [
+    "id", "title", "description", "assigned_by", "assigned_to", "coins_reward",
+    "requires_approval", "due_date", "status", "created_at", "template_id", "occurs_on",
+]
+
+
+def _window(first: date, last: date):
+    """The days from ``first`` to ``last`` as rows of (day, weekday digit, task id suffix, due date)."""
+    days = []
+    day = first
+    while day <= last:
+        days.append(select(
+            literal(day, Date).label("day"),
+            literal(str(day.weekday())).label("weekday"),
+            literal(f":{day.isoformat()}").label("suffix"),
+            literal(datetime.combine(day, time(23, 59, 59)), DateTime).label("due_date"),
+        ))
+        day += timedelta(days=1)
+    return union_all(*days).subquery("days")
+
+
+def _occurrences(days, template_ids: List[str], now: datetime):
+    """Task rows for the templates' occurrences in ``days`` not materialized yet."""
+    template = TaskTemplate
+    return select(
+        literal("template:") + template.id + days.c.suffix,
+        template.title,
+        template.description,
+        template.assigned_by,
+        template.assigned_to,
+        template.coins_reward,
+        template.requires_approval,
+        days.c.due_date,
+        literal("pending"),
+        literal(now, DateTime),
+        template.id,
+        days.c.day,
+    ).join(days, and_(
+        days.c.day >= template.starts_on,
+        or_(template.ends_on.is_(None), days.c.day <= template.ends_on),
+        or_(template.materialized_through.is_(None), days.c.day > template.materialized_through),
+        or_(
+            template.frequency == "daily",
+            and_(template.frequency == "weekly", template.weekdays.contains(days.c.weekday)),
+        ),
+    )).where(
+        template.id.in_(template_ids),
+        # Only while the child still belongs to the parent who set the chore
+        select(ChildProfile.user_id)
+        .where(ChildProfile.user_id == template.assigned_to, ChildProfile.parent_id == template.assigned_by)
+        .exists(),
+    )
+
+
+async def materialize_recurring_tasks(
+    session: AsyncSession,
+    today: Optional[date] = None,
+    window_days: int = DEFAULT_WINDOW_DAYS,
+    batch_size: Optional[int] = None,
+    template_ids: Optional[List[str]] = None,
+) -> int:
+    """Create the tasks of active templates up to ``window_days`` ahead and commit.
+
+    Only the templates in ``template_ids`` when given. Returns the number of
+    tasks created.
+    """
+    now = datetime.now(timezone.utc)
+    today = today or now.date()
+    through = today + timedelta(days=window_days - 1)
+    batch_size = batch_size or MATERIALIZE_BATCH_SIZE
+    days = _window(today, through)
+    insert = dialect_insert(session)
+
+    created = 0
+    last_id = ""
+    while True:
+        batch_stmt = (
+            select(TaskTemplate.id)
+            .where(
+                TaskTemplate.is_active,
+                or_(TaskTemplate.materialized_through.is_(None), TaskTemplate.materialized_through < through),
+                TaskTemplate.id > last_id,
+            )
+            .order_by(TaskTemplate.id)
+            .limit(batch_size)
+        )
+        if template_ids is not None:
+            batch_stmt = batch_stmt.where(TaskTemplate.id.in_(template_ids))
+        batch = (await session.execute(batch_stmt)).scalars().all()
+        if not batch:
+            break
+
+        stmt = insert(Task.__table__).from_select(TASK_COLUMNS, _occurrences(days, batch, now))
+        stmt = stmt.on_conflict_do_nothing(index_elements=["template_id", "occurs_on"])
+        result = await session.execute(stmt)
+        created += result.rowcount
+        await session.execute(
+            update(TaskTemplate)
+            .where(TaskTemplate.id.in_(batch))
+            .values(materialized_through=through)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        last_id = batch[-1]
+
+    return created
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Refresh the class_daily_stats and teacher_daily_stats rollups behind
+/api/teacher/analytics/performance.
+Completions update the rollups as they happen; schedule this job (e.g. hourly
+from cron) to pick up class enrolment changes and any rows written outside the
+API. Use --full once after deploying a rollup table to backfill history.
+"""
+
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+from database import create_db_and_tables, async_session_maker
+from rollups import refresh_class_daily_stats
+
+
+async def main(days: int, full: bool):
+    await create_db_and_tables()
+    since = date.min if full else datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    async with async_session_maker() as session:
+        rows = await refresh_class_daily_stats(session, since)
+        await session.commit()
+    print(f"✅ Refreshed {rows} class-day rows since {since.isoformat()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=2, help="number of most recent days to recompute")
+    parser.add_argument("--full", action="store_true", help="recompute the whole history")
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.full))
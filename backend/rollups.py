@@ -0,0 +1,356 @@
+"""Precomputed rollup tables maintained alongside the raw activity tables."""
+
+from datetime import date, datetime, time
+from typing import Dict, List, Optional
+
+from sqlalchemy import select, func, case, delete, union, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import dialect_insert
+from models import (
+    StudentPerformanceStats, UserModuleProgress, Class, ClassStudent, ClassDailyStats, TeacherDailyStats,
+    Transaction, DailyLedgerSummary, MonthlyLedgerSummary,
+)
+
+# Students averaging below this score are flagged as needing support
+SUPPORT_THRESHOLD = 70
+
+
+async def record_module_completion(
+    session: AsyncSession,
+    user_id: str,
+    score: Optional[float],
+    completed_at: datetime,
+    was_completed: bool = False,
+    previous_score: Optional[float] = None,
+    previous_completed_at: Optional[datetime] = None,
+):
+    """Fold a module completion into the student's rollups.
+
+    Runs in the caller's transaction. The performance stats are a single
+    upsert; when the progress row was already counted as completed, only the
+    score difference is applied. The student's classes, and their teachers,
+    then have their daily stats refreshed from the completion day (or the
+    earlier previous completion day) onwards.
+    """
+    completed_delta = 0 if was_completed else 1
+    score_delta = (score or 0) - ((previous_score or 0) if was_completed else 0)
+
+    insert = dialect_insert(session)
+    stats = StudentPerformanceStats.__table__
+    stmt = insert(stats).values(
+        user_id=user_id,
+        completed_count=completed_delta,
+        score_sum=score_delta,
+        last_completed_at=completed_at,
+        needs_support=score_delta < SUPPORT_THRESHOLD * completed_delta,
+    )
+    completed_count = stats.c.completed_count + stmt.excluded.completed_count
+    score_sum = stats.c.score_sum + stmt.excluded.score_sum
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[stats.c.user_id],
+        set_={
+            "completed_count": completed_count,
+            "score_sum": score_sum,
+            "last_completed_at": case(
+                (stats.c.last_completed_at.is_(None), stmt.excluded.last_completed_at),
+                (
+                    stmt.excluded.last_completed_at > stats.c.last_completed_at,
+                    stmt.excluded.last_completed_at,
+                ),
+                else_=stats.c.last_completed_at,
+            ),
+            "needs_support": score_sum < SUPPORT_THRESHOLD * completed_count,
+        },
+    )
+    await session.execute(stmt)
+
+    refresh_from = completed_at.date()
+    if was_completed and previous_completed_at is not None:
+        refresh_from = min(refresh_from, previous_completed_at.date())
+    await refresh_class_daily_stats(session, refresh_from, user_id=user_id)
+
+
+async def rebuild_student_performance_stats(session: AsyncSession) -> int:
+    """Recompute every student's performance stats from user_module_progress.
+
+    Returns the number of students with completed modules.
+    """
+    completed_count = func.count(UserModuleProgress.id)
+    score_sum = func.sum(func.coalesce(UserModuleProgress.score, 0))
+    aggregates = (
+        select(
+            UserModuleProgress.user_id,
+            completed_count,
+            score_sum,
+            func.max(UserModuleProgress.completed_at),
+            score_sum < SUPPORT_THRESHOLD * completed_count,
+        )
+        .where(UserModuleProgress.is_completed == True)
+        .group_by(UserModuleProgress.user_id)
+    )
+
+    await session.execute(delete(StudentPerformanceStats))
+    result = await session.execute(
+        StudentPerformanceStats.__table__.insert().from_select(
+            ["user_id", "completed_count", "score_sum", "last_completed_at", "needs_support"],
+            aggregates,
+        )
+    )
+    return result.rowcount
+
+
+async def refresh_class_daily_stats(
+    session: AsyncSession, since: date, user_id: Optional[str] = None
+) -> int:
+    """Recompute class_daily_stats and teacher_daily_stats rows for ``since`` and every later day.
+
+    With ``user_id``, only the classes that student is enrolled in, and their
+    teachers, are refreshed. Completions are attributed to the student's
+    current classes. Returns the number of (class, day) rows written.
+    """
+    # Pending progress changes must be visible to the aggregate below
+    await session.flush()
+
+    since_at = datetime.combine(since, time.min)
+    day = func.date(UserModuleProgress.completed_at)
+    aggregates = (
+        select(
+            ClassStudent.class_id,
+            day,
+            func.count(UserModuleProgress.id),
+            func.sum(func.coalesce(UserModuleProgress.score, 0)),
+            func.count(func.distinct(UserModuleProgress.user_id)),
+        )
+        .join(UserModuleProgress, UserModuleProgress.user_id == ClassStudent.student_id)
+        .where(
+            UserModuleProgress.is_completed == True,
+            UserModuleProgress.completed_at >= since_at,
+        )
+        .group_by(ClassStudent.class_id, day)
+    )
+    stale_rows = delete(ClassDailyStats).where(ClassDailyStats.day >= since)
+
+    if user_id is not None:
+        student_classes = select(ClassStudent.class_id).where(ClassStudent.student_id == user_id)
+        aggregates = aggregates.where(ClassStudent.class_id.in_(student_classes))
+        stale_rows = stale_rows.where(ClassDailyStats.class_id.in_(student_classes))
+
+    await session.execute(stale_rows)
+    result = await session.execute(
+        ClassDailyStats.__table__.insert().from_select(
+            ["class_id", "day", "completions", "score_sum", "active_students"],
+            aggregates,
+        )
+    )
+    await _refresh_teacher_daily_stats(session, since_at, user_id)
+    return result.rowcount
+
+
+async def _refresh_teacher_daily_stats(session: AsyncSession, since_at: datetime, user_id: Optional[str]):
+    """Recompute teacher_daily_stats from ``since_at``, for the teachers of ``user_id`` when given."""
+    # Each student once per teacher, however many of the teacher's classes they're in
+    teacher_students = (
+        select(Class.teacher_id, ClassStudent.student_id)
+        .join(ClassStudent, ClassStudent.class_id == Class.id)
+        .where(Class.teacher_id.is_not(None))
+        .distinct()
+    )
+    stale_rows = delete(TeacherDailyStats).where(TeacherDailyStats.day >= since_at.date())
+
+    if user_id is not None:
+        student_teachers = (
+            select(Class.teacher_id)
+            .join(ClassStudent, ClassStudent.class_id == Class.id)
+            .where(ClassStudent.student_id == user_id)
+        )
+        teacher_students = teacher_students.where(Class.teacher_id.in_(student_teachers))
+        stale_rows = stale_rows.where(TeacherDailyStats.teacher_id.in_(student_teachers))
+
+    teacher_students = teacher_students.subquery()
+    day = func.date(UserModuleProgress.completed_at)
+    aggregates = (
+        select(
+            teacher_students.c.teacher_id,
+            day,
+            func.count(UserModuleProgress.id),
+            func.sum(func.coalesce(UserModuleProgress.score, 0)),
+            func.count(func.distinct(UserModuleProgress.user_id)),
+        )
+        .join(UserModuleProgress, UserModuleProgress.user_id == teacher_students.c.student_id)
+        .where(
+            UserModuleProgress.is_completed == True,
+            UserModuleProgress.completed_at >= since_at,
+        )
+        .group_by(teacher_students.c.teacher_id, day)
+    )
+
+    await session.execute(stale_rows)
+    await session.execute(
+        TeacherDailyStats.__table__.insert().from_select(
+            ["teacher_id", "day", "completions", "score_sum", "active_students"],
+            aggregates,
+        )
+    )
+
+
+async def record_ledger_entry(
+    session: AsyncSession,
+    user_id: str,
+    type: str,
+    category: Optional[str],
+    amount: int,
+    day: date,
+):
+    """Fold one ledger row into daily_ledger_summary. Runs in the caller's transaction."""
+    insert = dialect_insert(session)
+    summary = DailyLedgerSummary.__table__
+    stmt = insert(summary).values(
+        user_id=user_id, day=day, type=type, category=category or "", amount_sum=amount, count=1
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[summary.c.user_id, summary.c.day, summary.c.type, summary.c.category],
+        set_={
+            "amount_sum": summary.c.amount_sum + stmt.excluded.amount_sum,
+            "count": summary.c.count + 1,
+        },
+    )
+    await session.execute(stmt)
+
+
+async def record_ledger_entries(session: AsyncSession, rows):
+    """Fold a set of ledger rows into daily_ledger_summary in one statement.
+
+    ``rows`` selects (user_id, day, type, category, amount_sum, count) with at
+    most one row per summary key. Runs in the caller's transaction.
+    """
+    insert = dialect_insert(session)
+    summary = DailyLedgerSummary.__table__
+    stmt = insert(summary).from_select(
+        ["user_id", "day", "type", "category", "amount_sum", "count"], rows
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[summary.c.user_id, summary.c.day, summary.c.type, summary.c.category],
+        set_={
+            "amount_sum": summary.c.amount_sum + stmt.excluded.amount_sum,
+            "count": summary.c.count + stmt.excluded.count,
+        },
+    )
+    await session.execute(stmt)
+
+
+def _ledger_aggregates(user_ids: Optional[List[str]] = None):
+    """daily_ledger_summary rows as computed from the transactions table."""
+    day = func.date(Transaction.created_at)
+    category = func.coalesce(Transaction.category, "")
+    stmt = (
+        select(
+            Transaction.user_id,
+            day,
+            Transaction.type,
+            category,
+            func.sum(Transaction.amount),
+            func.count(Transaction.id),
+        )
+        .where(Transaction.user_id.is_not(None))
+        .group_by(Transaction.user_id, day, Transaction.type, category)
+    )
+    if user_ids is not None:
+        stmt = stmt.where(Transaction.user_id.in_(user_ids))
+    return stmt
+
+
+async def rebuild_daily_ledger_summary(session: AsyncSession, user_ids: Optional[List[str]] = None) -> int:
+    """Recompute daily_ledger_summary from the transactions table.
+
+    With ``user_ids``, only those users' rows are replaced. Returns the number
+    of rows written.
+    """
+    stale_rows = delete(DailyLedgerSummary)
+    if user_ids is not None:
+        stale_rows = stale_rows.where(DailyLedgerSummary.user_id.in_(user_ids))
+    await session.execute(stale_rows)
+    result = await session.execute(
+        DailyLedgerSummary.__table__.insert().from_select(
+            ["user_id", "day", "type", "category", "amount_sum", "count"],
+            _ledger_aggregates(user_ids),
+        )
+    )
+    return result.rowcount
+
+
+async def stale_ledger_summary_users(session: AsyncSession) -> List[str]:
+    """Users whose daily_ledger_summary rows differ from their transactions."""
+    summary = select(
+        DailyLedgerSummary.user_id,
+        DailyLedgerSummary.day,
+        DailyLedgerSummary.type,
+        DailyLedgerSummary.category,
+        DailyLedgerSummary.amount_sum,
+        DailyLedgerSummary.count,
+    )
+    expected = _ledger_aggregates()
+    missing = expected.except_(summary).subquery()
+    extra = summary.except_(expected).subquery()
+    stmt = union(
+        select(missing.c[0].label("user_id")), select(extra.c[0].label("user_id"))
+    )
+    result = await session.execute(stmt)
+    return sorted(result.scalars().all())
+
+
+async def ledger_totals(session: AsyncSession, user_id: str, since: Optional[date] = None) -> Dict[str, int]:
+    """Coins per transaction type for the user, from ``since`` (or ever) up to now.
+
+    Refunds are netted against ``spend``: a redemption holds its coins as a
+    spend when requested and a rejection refunds them, so the pair cancels out.
+    All-time totals include the months compacted into monthly_ledger_summary
+    by the archive job; windows with ``since`` only read the daily rows.
+    """
+    daily = (
+        select(DailyLedgerSummary.type, DailyLedgerSummary.amount_sum)
+        .where(DailyLedgerSummary.user_id == user_id)
+    )
+    if since is not None:
+        rows = daily.where(DailyLedgerSummary.day >= since).subquery()
+    else:
+        monthly = (
+            select(MonthlyLedgerSummary.type, MonthlyLedgerSummary.amount_sum)
+            .where(MonthlyLedgerSummary.user_id == user_id)
+        )
+        rows = union_all(daily, monthly).subquery()
+    result = await session.execute(
+        select(rows.c.type, func.sum(rows.c.amount_sum)).group_by(rows.c.type)
+    )
+    totals = {"earn": 0, "spend": 0, "save": 0}
+    totals.update({type: amount or 0 for type, amount in result.all()})
+    totals["spend"] -= totals.pop("refund", 0)
+    return totals
+
+
+def earnings_since_subquery(user_id, since: date):
+    """Coins the user earned from ``since`` up to now, as a scalar subquery to embed in a larger SELECT."""
+    return (
+        select(func.coalesce(func.sum(DailyLedgerSummary.amount_sum), 0))
+        .where(
+            DailyLedgerSummary.user_id == user_id,
+            DailyLedgerSummary.type == "earn",
+            DailyLedgerSummary.day >= since,
+        )
+        .scalar_subquery()
+    )
+
+
+async def earnings_since(session: AsyncSession, user_id: str, *days: date) -> List[int]:
+    """Coins the user earned from each of ``days`` up to now, in one read of the summary."""
+    summary = DailyLedgerSummary
+    totals = [
+        func.coalesce(func.sum(case((summary.day >= day, summary.amount_sum), else_=0)), 0)
+        for day in days
+    ]
+    result = await session.execute(
+        select(*totals).where(
+            summary.user_id == user_id, summary.type == "earn", summary.day >= min(days)
+        )
+    )
+    return list(result.one())
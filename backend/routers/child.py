@@ -4,11 +4,12 @@ from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc
+from sqlalchemy import case, select, func, and_, or_, desc, update
 from sqlalchemy.orm import selectinload
 
 from database import get_async_session
 from auth import current_active_user, get_user_manager, UserManager
+from ledger import InsufficientCoins, credit, debit, record
 from models import (
     User,
     ChildProfile,
@@ -22,7 +23,8 @@ from models import (
     ModuleSection,
     QuizQuestion,
 )
-from schemas import UserRead
+from schemas import GoalContribution, UserRead
+from rollups import ledger_totals, record_module_completion
 
 router = APIRouter()
 
@@ -344,7 +346,7 @@ async def create_child_goal(
 @router.put("/goals/{goal_id}/progress", response_model=dict)
 async def update_goal_progress(
     goal_id: str,
-    progress_data: dict,
+    progress_data: GoalContribution,
     current_user: User = Depends(current_active_user),
     session: AsyncSession = Depends(get_async_session),
 ):
@@ -378,33 +380,42 @@ async def update_goal_progress(
             status_code=status.HTTP_404_NOT_FOUND, detail="Child profile not found"
         )
 
-    amount = progress_data.get("amount", 0)
+    amount = progress_data.amount
 
-    if amount > child_profile.coins:
+    try:
+        await debit(session, Transaction(
+            user_id=current_user.id,
+            type="spend",
+            amount=amount,
+            description=f"Added to goal: {goal.title}",
+            category="goal",
+            reference_id=goal.id,
+            reference_type="goal",
+        ))
+    except InsufficientCoins:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Not enough coins"
         )
 
-    goal.current_amount = min(goal.current_amount + amount, goal.target_amount)
-
-    if goal.current_amount >= goal.target_amount:
-        goal.is_completed = True
-        goal.updated_at = datetime.now(timezone.utc)
-
-    child_profile.coins -= amount
-
-    transaction = Transaction(
-        user_id=current_user.id,
-        type="spend",
-        amount=amount,
-        description=f"Added to goal: {goal.title}",
-        category="goal",
-        reference_id=goal.id,
-        reference_type="goal",
+    # Add to the stored amount rather than writing back the one read above,
+    # so concurrent contributions can't overwrite each other
+    new_amount = case(
+        (Goal.current_amount + amount >= Goal.target_amount, Goal.target_amount),
+        else_=Goal.current_amount + amount,
+    )
+    await session.execute(
+        update(Goal)
+        .where(Goal.id == goal_id)
+        .values(
+            current_amount=new_amount,
+            is_completed=or_(Goal.is_completed, Goal.current_amount + amount >= Goal.target_amount),
+            updated_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
     )
 
-    session.add(transaction)
     await session.commit()
+    await session.refresh(goal)
 
     print(f"[BACKEND] Updated goal progress: {goal.title} (+{amount} coins)")
 
@@ -521,11 +532,12 @@ async def complete_activity(
 
     score = completion_data.get("score", 100)
     coins_earned = int((score / 100) * module.points_reward)
+    completed_at = datetime.now(timezone.utc)
 
     if existing_progress:
         existing_progress.is_completed = True
         existing_progress.score = score
-        existing_progress.completed_at = datetime.now(timezone.utc)
+        existing_progress.completed_at = completed_at
         existing_progress.time_spent = completion_data.get("time_spent", 0)
     else:
         new_progress = UserModuleProgress(
@@ -533,25 +545,25 @@ async def complete_activity(
             module_id=activity_id,
             is_completed=True,
             score=score,
-            completed_at=datetime.now(timezone.utc),
+            completed_at=completed_at,
             time_spent=completion_data.get("time_spent", 0),
         )
         session.add(new_progress)
 
-    child_profile.coins += coins_earned
+    await record_module_completion(session, current_user.id, score, completed_at)
 
-    transaction = Transaction(
-        user_id=current_user.id,
-        type="earn",
-        amount=coins_earned,
-        description=f"Completed: {module.title}",
-        category="activity",
-        source="module_completion",
-        reference_id=activity_id,
-        reference_type="module",
-    )
+    if coins_earned > 0:
+        await credit(session, Transaction(
+            user_id=current_user.id,
+            type="earn",
+            amount=coins_earned,
+            description=f"Completed: {module.title}",
+            category="activity",
+            source="module_completion",
+            reference_id=activity_id,
+            reference_type="module",
+        ))
 
-    session.add(transaction)
     await session.commit()
 
     print(f"[BACKEND] Activity completed: {module.title} (+{coins_earned} coins)")
@@ -620,62 +632,66 @@ async def get_child_stats(
             status_code=status.HTTP_403_FORBIDDEN, detail="Only children can view stats"
         )
 
-    # Get child profile
-    child_stmt = select(ChildProfile).where(ChildProfile.user_id == current_user.id)
-    child_result = await session.execute(child_stmt)
-    child_profile = child_result.scalar_one_or_none()
-
-    if not child_profile:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Child profile not found"
-        )
-
-    # Get goals stats
-    goals_stmt = select(Goal).where(Goal.user_id == current_user.id)
-    goals_result = await session.execute(goals_stmt)
-    goals = goals_result.scalars().all()
-
-    active_goals = [g for g in goals if not g.is_completed]
-    completed_goals = [g for g in goals if g.is_completed]
-
-    # Get module/activity stats
-    modules_stmt = select(Module).where(Module.is_published)
-    modules_result = await session.execute(modules_stmt)
-    total_modules = modules_result.scalars().all()
-
-    progress_stmt = select(UserModuleProgress).where(
-        and_(
+    # Profile, goal and module counts in one round trip
+    goals_total = (
+        select(func.count(Goal.id)).where(Goal.user_id == current_user.id).scalar_subquery()
+    )
+    goals_completed = (
+        select(func.count(Goal.id))
+        .where(Goal.user_id == current_user.id, Goal.is_completed)
+        .scalar_subquery()
+    )
+    modules_available = (
+        select(func.count(Module.id)).where(Module.is_published).scalar_subquery()
+    )
+    activities_completed = (
+        select(func.count(UserModuleProgress.id))
+        .where(
             UserModuleProgress.user_id == current_user.id,
             UserModuleProgress.is_completed,
         )
+        .scalar_subquery()
     )
-    progress_result = await session.execute(progress_stmt)
-    completed_activities = progress_result.scalars().all()
+    stats_stmt = select(
+        ChildProfile.coins,
+        ChildProfile.level,
+        ChildProfile.streak_days,
+        goals_total,
+        goals_completed,
+        modules_available,
+        activities_completed,
+    ).where(ChildProfile.user_id == current_user.id)
+    stats = (await session.execute(stats_stmt)).one_or_none()
+
+    if not stats:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Child profile not found"
+        )
 
-    # Get transaction stats
-    transactions_stmt = select(Transaction).where(
-        Transaction.user_id == current_user.id
-    )
-    transactions_result = await session.execute(transactions_stmt)
-    transactions = transactions_result.scalars().all()
+    (
+        coins, level, streak_days,
+        total_goals, completed_goals, total_modules, completed_activities,
+    ) = stats
 
-    total_earned = sum(t.amount for t in transactions if t.type == "earn")
-    total_spent = sum(t.amount for t in transactions if t.type == "spend")
+    # Get transaction stats
+    totals = await ledger_totals(session, current_user.id)
+    total_earned = totals["earn"]
+    total_spent = totals["spend"]
 
     return {
         "profile": {
-            "coins": child_profile.coins,
-            "level": child_profile.level,
-            "streak_days": child_profile.streak_days,
+            "coins": coins,
+            "level": level,
+            "streak_days": streak_days,
         },
         "goals": {
-            "active": len(active_goals),
-            "completed": len(completed_goals),
-            "total": len(goals),
+            "active": total_goals - completed_goals,
+            "completed": completed_goals,
+            "total": total_goals,
         },
         "activities": {
-            "completed": len(completed_activities),
-            "total_available": len(total_modules),
+            "completed": completed_activities,
+            "total_available": total_modules,
         },
         "transactions": {
             "total_earned": total_earned,
@@ -767,6 +783,10 @@ async def update_module_progress(
             detail="Module progress record not found. Module may not be assigned to you.",
         )
     
+    was_completed = progress.is_completed
+    previous_score = progress.score
+    previous_completed_at = progress.completed_at
+
     try:
         # Update progress fields
         if "status" in progress_data:
@@ -788,6 +808,22 @@ async def update_module_progress(
             progress.time_spent = 15  # Default 15 minutes for completion
             print(f"[BACKEND] Module completed, setting time_spent to 15 minutes")
         
+        # Keep the teacher-facing rollups in step with this row
+        if progress.is_completed and (
+            not was_completed
+            or progress.score != previous_score
+            or progress.completed_at != previous_completed_at
+        ):
+            await record_module_completion(
+                session,
+                current_user.id,
+                progress.score,
+                progress.completed_at,
+                was_completed=was_completed,
+                previous_score=previous_score,
+                previous_completed_at=previous_completed_at,
+            )
+        
         print(f"[BACKEND] About to commit progress update...")
         await session.commit()
         print(f"[BACKEND] Progress update committed successfully")
@@ -814,7 +850,6 @@ async def update_module_progress(
                     reference_id=module_id,
                     reference_type="activity"
                 )
-                session.add(transaction)
                 
                 # Update child profile coins
                 child_profile_stmt = select(ChildProfile).where(ChildProfile.user_id == current_user.id)
@@ -822,7 +857,9 @@ async def update_module_progress(
                 child_profile = child_profile_result.scalar_one_or_none()
                 
                 if child_profile:
-                    child_profile.coins += coin_reward
+                    await credit(session, transaction)
+                else:
+                    await record(session, transaction)
                 
                 await session.commit()
         
@@ -4,10 +4,12 @@ from typing import List
 from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, or_, update
 
 from database import get_async_session
 from auth import current_active_user
+from idempotency import idempotency_key
+from ledger import InsufficientCoins, debit
 from models import User, Goal, Transaction, ChildProfile
 from schemas import GoalRead, GoalCreate, GoalUpdate, GoalContribution, TransactionRead
 
@@ -144,7 +146,7 @@ async def delete_goal(
     return {"message": "Goal deleted successfully"}
 
 
-@router.post("/users/{user_id}/goals/{goal_id}/contribute")
+@router.post("/users/{user_id}/goals/{goal_id}/contribute", dependencies=[Depends(idempotency_key)])
 async def contribute_to_goal(
     user_id: str,
     goal_id: str,
@@ -181,19 +183,6 @@ async def contribute_to_goal(
             detail="Only children can contribute to goals",
         )
 
-    if child_profile.coins < contribution.amount:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient coins"
-        )
-
-    goal.current_amount += contribution.amount
-    child_profile.coins -= contribution.amount
-
-    if goal.current_amount >= goal.target_amount:
-        goal.is_completed = True
-
-    goal.updated_at = datetime.now(timezone.utc)
-
     transaction = Transaction(
         user_id=user_id,
         type="save",
@@ -203,7 +192,25 @@ async def contribute_to_goal(
         reference_id=goal_id,
         reference_type="goal",
     )
-    session.add(transaction)
+    try:
+        await debit(session, transaction)
+    except InsufficientCoins:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient coins"
+        )
+
+    # Add to the stored amount rather than writing back the one read above
+    new_amount = Goal.current_amount + contribution.amount
+    await session.execute(
+        update(Goal)
+        .where(Goal.id == goal_id)
+        .values(
+            current_amount=new_amount,
+            is_completed=or_(Goal.is_completed, new_amount >= Goal.target_amount),
+            updated_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
+    )
 
     await session.commit()
     await session.refresh(goal)
@@ -233,14 +240,7 @@ async def update_goal_progress(
     if not goal:
         raise HTTPException(status_code=404, detail="Goal not found")
 
-    # Update current amount
-    goal.current_amount += contribution.amount
-    if goal.current_amount >= goal.target_amount:
-        goal.is_completed = True
-
-    goal.updated_at = datetime.now(timezone.utc)
-
-    # Create transaction record
+    # The saved coins come out of the balance, as in contribute_to_goal
     transaction = Transaction(
         user_id=current_user.id,
         type="save",
@@ -249,7 +249,24 @@ async def update_goal_progress(
         reference_id=goal.id,
         reference_type="goal",
     )
-    session.add(transaction)
+    try:
+        await debit(session, transaction)
+    except InsufficientCoins:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient coins"
+        )
+
+    new_amount = Goal.current_amount + contribution.amount
+    await session.execute(
+        update(Goal)
+        .where(Goal.id == goal_id)
+        .values(
+            current_amount=new_amount,
+            is_completed=or_(Goal.is_completed, new_amount >= Goal.target_amount),
+            updated_at=datetime.now(timezone.utc),
+        )
+        .execution_options(synchronize_session=False)
+    )
 
     await session.commit()
     await session.refresh(goal)
@@ -8,6 +8,7 @@ from sqlalchemy import select, and_
 
 from database import get_async_session
 from auth import current_active_user
+from ledger import credit
 from models import User, Activity, UserActivity, ChildProfile, Transaction
 from schemas import ActivityRead, ModuleRead, ModuleCreate, ModuleUpdate, ModuleResponse
 
@@ -110,9 +111,8 @@ async def complete_activity(
         child_stmt = select(ChildProfile).where(ChildProfile.user_id == current_user.id)
         child_result = await session.execute(child_stmt)
         child_profile = child_result.scalar_one_or_none()
-        if child_profile:
-            child_profile.coins += activity.coins
-            transaction = Transaction(
+        if child_profile and activity.coins > 0:
+            await credit(session, Transaction(
                 user_id=current_user.id,
                 type="earn",
                 amount=activity.coins,
@@ -120,8 +120,7 @@ async def complete_activity(
                 category="activity",
                 reference_id=str(activity_id),
                 reference_type="activity"
-            )
-            session.add(transaction)
+            ))
     await session.commit()
     return {"success": True, "activity_id": activity_id}
 
@@ -1,15 +1,17 @@
 """Parent management router for CoinCraft."""
 
 from typing import List, Optional
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import Integer, String, bindparam, cast, delete, insert, literal, null, select, func, and_, or_, union_all, update
 from sqlalchemy.orm import selectinload
 
 from database import get_async_session
 from auth import current_active_user, get_user_manager, UserManager
+from exports import export_filters, export_response
+from ledger import credit, transition
 from models import (
     User,
     ChildProfile,
@@ -24,7 +26,12 @@ from models import (
     RedemptionRequest,
     ShopItem,
     PurchaseRequest,
+    AllowanceSchedule,
+    TaskTemplate,
 )
+from recurring import materialize_recurring_tasks
+from routers.redemptions import list_family_redemptions
+from rollups import earnings_since_subquery, record_ledger_entries
 from schemas import (
     UserRead,
     ChildProfileRead,
@@ -40,11 +47,18 @@ from schemas import (
     ChildCreateResponse,
     TaskCreateResponse,
     TaskApprovalResponse,
+    TaskBulkReview,
+    TaskReviewResult,
+    TaskBulkReviewResponse,
     ChildProgressResponse,
     ParentSettingsResponse,
     ActivityRead,
     AchievementRead,
     ChildSummaryRead,
+    AllowanceScheduleSet,
+    AllowanceScheduleRead,
+    TaskTemplateCreate,
+    TaskTemplateRead,
 )
 
 router = APIRouter()
@@ -103,10 +117,37 @@ async def get_parent_dashboard(
         session.add(parent_profile)
         await session.commit()
 
-    # Get children with their profiles
+    # Children with their per-child counters, in one grouped query
+    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    family = select(ChildProfile.user_id).where(ChildProfile.parent_id == current_user.id)
+    goal_counts = (
+        select(Goal.user_id, func.count(Goal.id).label("active_goals"))
+        .where(and_(Goal.user_id.in_(family), Goal.is_completed == False))
+        .group_by(Goal.user_id)
+        .subquery()
+    )
+    task_counts = (
+        select(Task.assigned_to, func.count(Task.id).label("completed_tasks"))
+        .where(
+            and_(
+                Task.assigned_to.in_(family),
+                Task.status == "completed",
+                Task.completed_at >= thirty_days_ago,
+            )
+        )
+        .group_by(Task.assigned_to)
+        .subquery()
+    )
     children_stmt = (
-        select(User, ChildProfile)
+        select(
+            User,
+            ChildProfile,
+            func.coalesce(goal_counts.c.active_goals, 0),
+            func.coalesce(task_counts.c.completed_tasks, 0),
+        )
         .join(ChildProfile, User.id == ChildProfile.user_id)
+        .outerjoin(goal_counts, goal_counts.c.user_id == User.id)
+        .outerjoin(task_counts, task_counts.c.assigned_to == User.id)
         .where(ChildProfile.parent_id == current_user.id)
     )
     children_result = await session.execute(children_stmt)
@@ -123,25 +164,7 @@ async def get_parent_dashboard(
     
     # Prepare children list including age for UI display
     children_list = []
-    for user, child_profile in children_data:
-        # Calculate stats for this child
-        goals_stmt = select(func.count(Goal.id)).where(
-            and_(Goal.user_id == user.id, Goal.is_completed == False)
-        )
-        goals_result = await session.execute(goals_stmt)
-        active_goals = goals_result.scalar() or 0
-
-        thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
-        tasks_stmt = select(func.count(Task.id)).where(
-            and_(
-                Task.assigned_to == user.id,
-                Task.status == "completed",
-                Task.completed_at >= thirty_days_ago,
-            )
-        )
-        tasks_result = await session.execute(tasks_stmt)
-        completed_tasks = tasks_result.scalar() or 0
-
+    for user, child_profile, active_goals, completed_tasks in children_data:
         # Aggregate family stats
         total_coins += child_profile.coins
         total_completed_tasks += completed_tasks
@@ -167,7 +190,7 @@ async def get_parent_dashboard(
 
     # Get recent transactions for the family
     if children_data:
-        children_ids = [user.id for user, _ in children_data]
+        children_ids = [row[0].id for row in children_data]
         recent_transactions_stmt = (
             select(Transaction)
             .where(Transaction.user_id.in_(children_ids))
@@ -334,24 +357,8 @@ async def get_child_progress(
             detail="Only parents can view child progress",
         )
 
-    # Verify child belongs to parent
-    child_stmt = (
-        select(User, ChildProfile)
-        .join(ChildProfile, User.id == ChildProfile.user_id)
-        .where(and_(User.id == child_id, ChildProfile.parent_id == current_user.id))
-    )
-    child_result = await session.execute(child_stmt)
-    child_data = child_result.first()
-
-    if not child_data:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Child not found or not associated with your account",
-        )
-
-    child_user, child_profile = child_data
-
-    # Calculate timeframe dates
+    # Calculate timeframe dates. The window starts at midnight (UTC) of its first
+    # day, since rewards come from a per-day summary; every figure uses it
     now = datetime.now(timezone.utc)
     if timeframe == "week":
         start_date = now - timedelta(days=7)
@@ -361,63 +368,103 @@ async def get_child_progress(
         start_date = now - timedelta(days=90)
     else:  # year
         start_date = now - timedelta(days=365)
+    start_date = datetime.combine(start_date.date(), time.min, tzinfo=timezone.utc)
 
-    # Get statistics
-
-    rewards_stmt = select(func.sum(Transaction.amount)).where(
-        and_(
-            Transaction.user_id == child_id,
-            Transaction.type == "earn",
-            Transaction.created_at >= start_date,
+    # The child (which also checks it belongs to the parent) with every scalar
+    # metric in one statement; rewards come from the daily ledger summary
+    lessons_completed = (
+        select(func.count(UserModuleProgress.id))
+        .where(
+            and_(
+                UserModuleProgress.user_id == child_id,
+                UserModuleProgress.is_completed == True,
+                UserModuleProgress.completed_at >= start_date,
+            )
         )
+        .scalar_subquery()
     )
-    rewards_result = await session.execute(rewards_stmt)
-    total_rewards = rewards_result.scalar() or 0
-
-    # Completed lessons/modules
-    lessons_stmt = select(func.count(UserModuleProgress.id)).where(
-        and_(
-            UserModuleProgress.user_id == child_id,
-            UserModuleProgress.is_completed == True,
-            UserModuleProgress.completed_at >= start_date,
+    goals_achieved = (
+        select(func.count(Goal.id))
+        .where(
+            and_(
+                Goal.user_id == child_id,
+                Goal.is_completed == True,
+                Goal.updated_at >= start_date,
+            )
         )
+        .scalar_subquery()
     )
-    lessons_result = await session.execute(lessons_stmt)
-    lessons_completed = lessons_result.scalar() or 0
-
-    # Goals achieved
-    goals_stmt = select(func.count(Goal.id)).where(
-        and_(
-            Goal.user_id == child_id,
-            Goal.is_completed == True,
-            Goal.updated_at >= start_date,
+    child_stmt = (
+        select(
+            User,
+            ChildProfile,
+            earnings_since_subquery(child_id, start_date.date()),
+            lessons_completed,
+            goals_achieved,
         )
+        .join(ChildProfile, User.id == ChildProfile.user_id)
+        .where(and_(User.id == child_id, ChildProfile.parent_id == current_user.id))
     )
-    goals_result = await session.execute(goals_stmt)
-    goals_achieved = goals_result.scalar() or 0
+    child_result = await session.execute(child_stmt)
+    child_data = child_result.first()
 
-    # Recent activities
-    activities_stmt = (
-        select(Transaction)
+    if not child_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child not found or not associated with your account",
+        )
+
+    child_user, child_profile, total_rewards, lessons_completed, goals_achieved = child_data
+
+    # Recent activities, active goals and recent achievements in one UNION ALL;
+    # each section maps its fields onto the same columns
+    no_text = cast(null(), String)
+    no_number = cast(null(), Integer)
+    activities = (
+        select(
+            literal("activity").label("section"),
+            Transaction.id.label("id"),
+            Transaction.type.label("label"),
+            Transaction.description.label("description"),
+            Transaction.amount.label("amount"),
+            no_number.label("current_amount"),
+            Transaction.created_at.label("at"),
+            no_text.label("icon"),
+            no_text.label("rarity"),
+        )
         .where(
             and_(Transaction.user_id == child_id, Transaction.created_at >= start_date)
         )
         .order_by(Transaction.created_at.desc())
         .limit(10)
+        .subquery()
     )
-    activities_result = await session.execute(activities_stmt)
-    recent_activities = activities_result.scalars().all()
-
-    # Active goals
-    active_goals_stmt = select(Goal).where(
-        and_(Goal.user_id == child_id, Goal.is_completed == False)
+    goals = (
+        select(
+            literal("goal"),
+            Goal.id,
+            Goal.title,
+            Goal.description,
+            Goal.target_amount,
+            Goal.current_amount,
+            Goal.deadline,
+            no_text,
+            no_text,
+        )
+        .where(and_(Goal.user_id == child_id, Goal.is_completed == False))
     )
-    active_goals_result = await session.execute(active_goals_stmt)
-    active_goals = active_goals_result.scalars().all()
-
-    # Recent achievements
-    achievements_stmt = (
-        select(Achievement, UserAchievement.earned_at)
+    achievements = (
+        select(
+            literal("achievement").label("section"),
+            Achievement.id.label("id"),
+            Achievement.title.label("label"),
+            Achievement.description.label("description"),
+            no_number.label("amount"),
+            no_number.label("current_amount"),
+            UserAchievement.earned_at.label("at"),
+            Achievement.icon.label("icon"),
+            Achievement.rarity.label("rarity"),
+        )
         .join(UserAchievement, Achievement.id == UserAchievement.achievement_id)
         .where(
             and_(
@@ -427,9 +474,16 @@ async def get_child_progress(
         )
         .order_by(UserAchievement.earned_at.desc())
         .limit(5)
+        .subquery()
     )
-    achievements_result = await session.execute(achievements_stmt)
-    achievements_data = achievements_result.all()
+    sections_stmt = union_all(select(activities), goals, select(achievements))
+    sections_result = await session.execute(sections_stmt)
+    sections = {"activity": [], "goal": [], "achievement": []}
+    for row in sections_result.all():
+        sections[row.section].append(row)
+    recent_activities = sorted(sections["activity"], key=lambda row: row.at, reverse=True)
+    active_goals = sections["goal"]
+    recent_achievements = sorted(sections["achievement"], key=lambda row: row.at, reverse=True)
 
     return {
         "child": {
@@ -449,37 +503,37 @@ async def get_child_progress(
         "recent_activities": [
             {
                 "id": activity.id,
-                "type": activity.type,
+                "type": activity.label,
                 "amount": activity.amount,
                 "description": activity.description,
-                "created_at": activity.created_at.isoformat(),
+                "created_at": activity.at.isoformat(),
             }
             for activity in recent_activities
         ],
         "active_goals": [
             {
                 "id": goal.id,
-                "title": goal.title,
+                "title": goal.label,
                 "description": goal.description,
-                "target_amount": goal.target_amount,
+                "target_amount": goal.amount,
                 "current_amount": goal.current_amount,
-                "progress_percentage": (goal.current_amount / goal.target_amount * 100)
-                if goal.target_amount > 0
+                "progress_percentage": (goal.current_amount / goal.amount * 100)
+                if goal.amount > 0
                 else 0,
-                "deadline": goal.deadline.isoformat() if goal.deadline else None,
+                "deadline": goal.at.isoformat() if goal.at else None,
             }
             for goal in active_goals
         ],
         "recent_achievements": [
             {
                 "id": achievement.id,
-                "title": achievement.title,
+                "title": achievement.label,
                 "description": achievement.description,
                 "icon": achievement.icon,
                 "rarity": achievement.rarity,
-                "earned_at": earned_at.isoformat(),
+                "earned_at": achievement.at.isoformat(),
             }
-            for achievement, earned_at in achievements_data
+            for achievement in recent_achievements
         ],
     }
 
@@ -649,15 +703,18 @@ async def approve_task(
             detail="Task already approved"
         )
 
-    # Approve task and award coins
-    task.status = "approved"
-    task.approved_at = datetime.now(timezone.utc)
+    # Approve task; a concurrent approval of the same task gets no second payout
+    approved = await transition(
+        session, task, "completed", status="approved", approved_at=datetime.now(timezone.utc)
+    )
+    if not approved:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Task must be completed before approval",
+        )
 
     # Award coins to child
-    child_profile.coins += task.coins_reward
-
-    # Create transaction record
-    transaction = Transaction(
+    await credit(session, Transaction(
         user_id=task.assigned_to,
         type="earn",
         amount=task.coins_reward,
@@ -666,8 +723,7 @@ async def approve_task(
         source="parent_approval",
         reference_id=task.id,
         reference_type="task",
-    )
-    session.add(transaction)
+    ))
 
     await session.commit()
 
@@ -680,57 +736,339 @@ async def approve_task(
     )
 
 
-@router.get("/redemptions", response_model=List[RedemptionRequestRead])
-async def get_redemption_requests(
-    status: Optional[str] = None,
+# Statuses a task can be moved out of by each bulk review action
+REVIEWABLE_STATUSES = {
+    "approve": ["completed"],
+    "reject": ["completed", "pending", "in_progress"],
+}
+
+
+@router.post("/tasks/review", response_model=TaskBulkReviewResponse)
+async def review_tasks(
+    review: TaskBulkReview,
     current_user: User = Depends(current_active_user),
     session: AsyncSession = Depends(get_async_session),
 ):
-    """Get redemption requests from children."""
+    """Approve or reject several of the children's tasks at once.
+
+    Ownership is checked for all tasks in one query and the status change is a
+    single conditional UPDATE, so tasks approved in the meantime are skipped
+    rather than paid twice. Approvals write their earn transactions in one
+    executemany and one summed coin UPDATE per child, all in one commit.
+    """
 
     if current_user.role != "parent":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only parents can view redemption requests",
+            detail="Only parents can review tasks",
         )
 
-    # Get all children of this parent
-    children_stmt = select(ChildProfile.user_id).where(
-        ChildProfile.parent_id == current_user.id
+    task_ids = list(dict.fromkeys(review.task_ids))
+    allowed = REVIEWABLE_STATUSES[review.action]
+    new_status = "approved" if review.action == "approve" else "rejected"
+    now = datetime.now(timezone.utc)
+
+    # Every requested task that belongs to one of the parent's children
+    tasks_stmt = select(Task.id, Task.title, Task.assigned_to, Task.coins_reward, Task.status).where(
+        and_(
+            Task.id.in_(task_ids),
+            Task.assigned_to.in_(
+                select(ChildProfile.user_id).where(ChildProfile.parent_id == current_user.id)
+            ),
+        )
     )
-    children_result = await session.execute(children_stmt)
-    children_ids = [row[0] for row in children_result.all()]
+    tasks = {row.id: row for row in (await session.execute(tasks_stmt)).all()}
+
+    values = {"status": new_status}
+    if review.action == "approve":
+        values["approved_at"] = now
+    eligible = [task_id for task_id in task_ids if task_id in tasks and tasks[task_id].status in allowed]
+    moved = set()
+    if eligible:
+        moved_result = await session.execute(
+            update(Task)
+            .where(and_(Task.id.in_(eligible), Task.status.in_(allowed)))
+            .values(**values)
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        moved = set(moved_result.scalars().all())
 
-    if not children_ids:
-        return []
+    approved = [tasks[task_id] for task_id in task_ids if task_id in moved] if review.action == "approve" else []
+    if approved:
+        transaction_ids = [str(uuid.uuid4()) for _ in approved]
+        await session.execute(insert(Transaction), [
+            {
+                "id": transaction_id,
+                "user_id": task.assigned_to,
+                "type": "earn",
+                "amount": task.coins_reward,
+                "description": f"Task completed: {task.title}",
+                "category": "task",
+                "source": "parent_approval",
+                "reference_id": task.id,
+                "reference_type": "task",
+                "created_at": now,
+            }
+            for transaction_id, task in zip(transaction_ids, approved)
+        ])
+
+        rewards = {}
+        for task in approved:
+            rewards[task.assigned_to] = rewards.get(task.assigned_to, 0) + task.coins_reward
+        profiles = ChildProfile.__table__
+        await session.execute(
+            update(profiles)
+            .where(profiles.c.user_id == bindparam("child_id"))
+            .values(coins=profiles.c.coins + bindparam("reward")),
+            [{"child_id": child_id, "reward": reward} for child_id, reward in rewards.items()],
+        )
+        await record_ledger_entries(session, select(
+            Transaction.user_id,
+            literal(now.date()),
+            literal("earn"),
+            literal("task"),
+            func.sum(Transaction.amount),
+            func.count(Transaction.id),
+        ).where(Transaction.id.in_(transaction_ids)).group_by(Transaction.user_id))
 
-    # Get redemption requests for these children
-    from models import RedemptionRequest
-    redemptions_stmt = (
-        select(RedemptionRequest, User.name)
-        .join(User, RedemptionRequest.user_id == User.id)
-        .where(RedemptionRequest.user_id.in_(children_ids))
-        .order_by(RedemptionRequest.created_at.desc())
+    await session.commit()
+
+    results = []
+    for task_id in task_ids:
+        task = tasks.get(task_id)
+        if task is None:
+            results.append(TaskReviewResult(
+                task_id=task_id, success=False, message="Task not found or not associated with your children"
+            ))
+        elif task_id not in moved:
+            message = (
+                "Task must be completed before approval"
+                if review.action == "approve"
+                else "Task cannot be rejected in current state"
+            )
+            results.append(TaskReviewResult(task_id=task_id, success=False, status=task.status, message=message))
+        else:
+            coins = task.coins_reward if review.action == "approve" else 0
+            results.append(TaskReviewResult(
+                task_id=task_id,
+                success=True,
+                status=new_status,
+                coins_awarded=coins,
+                message=f"Task '{task.title}' {new_status}",
+            ))
+
+    print(f"[BACKEND] Parent {current_user.id} {new_status} {len(moved)} of {len(task_ids)} tasks")
+    return TaskBulkReviewResponse(
+        results=results,
+        approved=len(approved),
+        rejected=len(moved) if review.action == "reject" else 0,
+        coins_awarded=sum(task.coins_reward for task in approved),
     )
 
-    # Apply status filter if provided
-    if status:
-        redemptions_stmt = redemptions_stmt.where(RedemptionRequest.status == status)
 
-    redemptions_result = await session.execute(redemptions_stmt)
-    redemptions_data = redemptions_result.all()
+async def get_own_child_profile(session: AsyncSession, parent: User, child_id: str) -> ChildProfile:
+    if parent.role != "parent":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only parents can manage their children",
+        )
+    child_stmt = select(ChildProfile).where(
+        and_(ChildProfile.user_id == child_id, ChildProfile.parent_id == parent.id)
+    )
+    child_profile = (await session.execute(child_stmt)).scalar_one_or_none()
+    if not child_profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Child not found or not associated with your account",
+        )
+    return child_profile
+
 
-    # Build response with child information
-    redemptions_list = []
-    for redemption, child_name in redemptions_data:
-        redemption_dict = RedemptionRequestRead.model_validate(redemption).model_dump()
-        redemption_dict["child"] = {
-            "name": child_name,
-            "id": redemption.user_id
-        }
-        redemptions_list.append(RedemptionRequestRead(**redemption_dict))
+@router.get("/children/{child_id}/allowance", response_model=AllowanceScheduleRead)
+async def get_child_allowance(
+    child_id: str,
+    current_user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Get the child's weekly allowance schedule."""
+    await get_own_child_profile(session, current_user, child_id)
+    schedule_stmt = select(AllowanceSchedule).where(AllowanceSchedule.child_id == child_id)
+    schedule = (await session.execute(schedule_stmt)).scalar_one_or_none()
+    if not schedule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No allowance set for this child"
+        )
+    return schedule
 
-    return redemptions_list
+
+@router.put("/children/{child_id}/allowance", response_model=AllowanceScheduleRead)
+async def set_child_allowance(
+    child_id: str,
+    allowance: AllowanceScheduleSet,
+    current_user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Create or replace the child's weekly allowance (paid by pay_allowances.py)."""
+    await get_own_child_profile(session, current_user, child_id)
+
+    if allowance.goal_id:
+        goal_stmt = select(Goal.id).where(and_(Goal.id == allowance.goal_id, Goal.user_id == child_id))
+        if not (await session.execute(goal_stmt)).scalar_one_or_none():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Goal does not belong to this child",
+            )
+
+    schedule_stmt = select(AllowanceSchedule).where(AllowanceSchedule.child_id == child_id)
+    schedule = (await session.execute(schedule_stmt)).scalar_one_or_none()
+    if not schedule:
+        schedule = AllowanceSchedule(
+            child_id=child_id,
+            starts_on=datetime.now(timezone.utc).date(),
+        )
+        session.add(schedule)
+    schedule.parent_id = current_user.id
+    for field, value in allowance.model_dump().items():
+        setattr(schedule, field, value)
+
+    await session.commit()
+    await session.refresh(schedule)
+    return schedule
+
+
+@router.delete("/children/{child_id}/allowance", response_model=dict)
+async def delete_child_allowance(
+    child_id: str,
+    current_user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Stop the child's weekly allowance."""
+    await get_own_child_profile(session, current_user, child_id)
+    result = await session.execute(
+        delete(AllowanceSchedule).where(AllowanceSchedule.child_id == child_id)
+    )
+    await session.commit()
+    if not result.rowcount:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No allowance set for this child"
+        )
+    return {"success": True, "message": "Allowance removed"}
+
+
+@router.get("/task-templates", response_model=List[TaskTemplateRead])
+async def get_task_templates(
+    current_user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Get the family's active recurring chores."""
+
+    if current_user.role != "parent":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only parents can view recurring tasks",
+        )
+
+    templates_stmt = (
+        select(TaskTemplate)
+        .where(and_(TaskTemplate.assigned_by == current_user.id, TaskTemplate.is_active))
+        .order_by(TaskTemplate.created_at)
+    )
+    templates = (await session.execute(templates_stmt)).scalars().all()
+    return [TaskTemplateRead.model_validate(template) for template in templates]
+
+
+@router.post("/task-templates", response_model=TaskTemplateRead)
+async def create_task_template(
+    template_data: TaskTemplateCreate,
+    current_user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Create a recurring chore; its upcoming tasks are created straight away
+    and then kept topped up by materialize_tasks.py."""
+    await get_own_child_profile(session, current_user, template_data.assigned_to)
+    if template_data.frequency == "weekly" and not template_data.weekdays:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Weekly tasks need at least one weekday",
+        )
+
+    today = datetime.now(timezone.utc).date()
+    template = TaskTemplate(
+        **template_data.model_dump(exclude={"starts_on", "weekdays"}),
+        weekdays="".join(sorted(set(template_data.weekdays))) if template_data.frequency == "weekly" else None,
+        starts_on=template_data.starts_on or today,
+        assigned_by=current_user.id,
+    )
+    session.add(template)
+    await session.commit()
+
+    await materialize_recurring_tasks(session, today, template_ids=[template.id])
+    await session.refresh(template)
+    print(f"[BACKEND] Created {template.frequency} task template {template.id} for child {template.assigned_to}")
+    return TaskTemplateRead.model_validate(template)
+
+
+@router.delete("/task-templates/{template_id}", response_model=dict)
+async def delete_task_template(
+    template_id: str,
+    current_user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Stop a recurring chore and remove its upcoming tasks that haven't been started."""
+
+    if current_user.role != "parent":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only parents can manage recurring tasks",
+        )
+
+    stopped = await session.execute(
+        update(TaskTemplate)
+        .where(and_(TaskTemplate.id == template_id, TaskTemplate.assigned_by == current_user.id))
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+    if not stopped.rowcount:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Recurring task not found"
+        )
+    removed = await session.execute(
+        delete(Task)
+        .where(
+            and_(
+                Task.template_id == template_id,
+                Task.status == "pending",
+                Task.occurs_on >= datetime.now(timezone.utc).date(),
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return {"success": True, "message": f"Recurring task stopped, {removed.rowcount} upcoming tasks removed"}
+
+
+@router.get("/redemptions", response_model=List[RedemptionRequestRead])
+async def get_redemption_requests(
+    response: Response,
+    request_status: Optional[str] = Query(None, alias="status", pattern="^(pending|approved|rejected)$"),
+    child_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200),
+    current_user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Get redemption requests from children; pass ``limit`` to page through them (see ``X-Next-Cursor``)."""
+
+    if current_user.role != "parent":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only parents can view redemption requests",
+        )
+
+    return await list_family_redemptions(
+        session, current_user.id, response, request_status, child_id, cursor, limit
+    )
 
 
 @router.put("/settings", response_model=dict)
@@ -779,6 +1117,35 @@ async def update_parent_settings(
     }
 
 
+@router.get("/transactions/export")
+async def export_family_transactions(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    child_id: Optional[str] = None,
+    type: Optional[str] = Query(None, pattern="^(earn|spend|save|refund)$"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Stream the transaction history of all the parent's children (or one) as CSV or NDJSON."""
+    if child_id:
+        await get_own_child_profile(session, current_user, child_id)
+    elif current_user.role != "parent":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only parents can export family transactions",
+        )
+
+    children = select(ChildProfile.user_id).where(ChildProfile.parent_id == current_user.id)
+
+    def where(model):
+        filters = [model.user_id == child_id] if child_id else [model.user_id.in_(children)]
+        filters.extend(export_filters(model, type, start_date, end_date))
+        return and_(*filters)
+
+    return export_response(session, where, format, "family-transactions")
+
+
 @router.get("/children/goals", response_model=List[dict])
 async def get_all_children_goals(
     current_user: User = Depends(current_active_user),
@@ -1,14 +1,17 @@
 """Redemption requests management router."""
 
-from typing import List
+from typing import List, Optional
+import uuid
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, tuple_
 
 from database import get_async_session
 from auth import current_active_user
-from models import User, RedemptionRequest, ChildProfile, ParentProfile
+from ledger import InsufficientCoins, credit, debit, transition
+from pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from models import User, RedemptionRequest, ChildProfile, ParentProfile, Transaction
 from schemas import RedemptionRequestRead, RedemptionRequestCreate
 
 router = APIRouter()
@@ -71,12 +74,6 @@ async def create_conversion_request(
             detail="Only children can request money conversion"
         )
     
-  
-    if child_profile.coins < request_data.coins_amount:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Insufficient coins"
-        )
     
 
     parent_stmt = select(ParentProfile).where(ParentProfile.user_id == child_profile.parent_id)
@@ -87,7 +84,26 @@ async def create_conversion_request(
     cash_amount = request_data.coins_amount * parent_profile.exchange_rate
     
 
+    # Hold the coins first; the request only exists if the balance covered it
+    request_id = str(uuid.uuid4())
+    try:
+        await debit(session, Transaction(
+            user_id=user_id,
+            type="spend",
+            amount=request_data.coins_amount,
+            description="Redemption request",
+            category="redemption",
+            reference_id=request_id,
+            reference_type="redemption",
+        ))
+    except InsufficientCoins:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Insufficient coins"
+        )
+
     redemption_request = RedemptionRequest(
+        id=request_id,
         user_id=user_id,
         coins_amount=request_data.coins_amount,
         cash_amount=cash_amount,
@@ -95,9 +111,6 @@ async def create_conversion_request(
     )
     session.add(redemption_request)
     
-
-    child_profile.coins -= request_data.coins_amount
-    
     await session.commit()
     await session.refresh(redemption_request)
     await session.refresh(child_profile)
@@ -108,9 +121,70 @@ async def create_conversion_request(
     }
 
 
+async def list_family_redemptions(
+    session: AsyncSession,
+    parent_id: str,
+    response: Response,
+    request_status: Optional[str] = None,
+    child_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[RedemptionRequestRead]:
+    """Redemption requests of the parent's children, newest first, with the child attached.
+
+    One joined query. Without ``limit`` or ``cursor`` every request is
+    returned, as the endpoints always did. Otherwise the result is a page
+    keyed on (created_at, id); when there are more rows the cursor for the
+    next page is sent in the ``X-Next-Cursor`` header, so the body stays a
+    plain list.
+    """
+    after = decode_cursor(cursor)
+    if limit is None and after is not None:
+        limit = DEFAULT_PAGE_SIZE
+    stmt = (
+        select(RedemptionRequest, User.name, User.avatar_url, ChildProfile.age)
+        .join(ChildProfile, RedemptionRequest.user_id == ChildProfile.user_id)
+        .join(User, RedemptionRequest.user_id == User.id)
+        .where(ChildProfile.parent_id == parent_id)
+    )
+    if request_status:
+        stmt = stmt.where(RedemptionRequest.status == request_status)
+    if child_id:
+        stmt = stmt.where(RedemptionRequest.user_id == child_id)
+    if after is not None:
+        stmt = stmt.where(tuple_(RedemptionRequest.created_at, RedemptionRequest.id) < after)
+    stmt = stmt.order_by(RedemptionRequest.created_at.desc(), RedemptionRequest.id.desc())
+    if limit is not None:
+        # One extra row tells whether there is a next page
+        stmt = stmt.limit(limit + 1)
+
+    rows = (await session.execute(stmt)).all()
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+
+    requests = []
+    for request, name, avatar_url, age in rows:
+        request_dict = RedemptionRequestRead.model_validate(request).model_dump()
+        request_dict["child"] = {
+            "id": request.user_id,
+            "name": name,
+            "avatar_url": avatar_url,
+            "age": age,
+        }
+        requests.append(RedemptionRequestRead(**request_dict))
+    return requests
+
+
 @router.get("/parents/{parent_id}/redemption-requests", response_model=List[RedemptionRequestRead])
 async def get_parent_redemption_requests(
     parent_id: str,
+    response: Response,
+    request_status: Optional[str] = Query(None, alias="status", pattern="^(pending|approved|rejected)$"),
+    child_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=200),
     current_user: User = Depends(current_active_user),
     session: AsyncSession = Depends(get_async_session)
 ):
@@ -120,32 +194,10 @@ async def get_parent_redemption_requests(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only parents can view their children's redemption requests"
         )
-    
 
-    stmt = select(RedemptionRequest).join(ChildProfile).where(
-        ChildProfile.parent_id == parent_id
-    ).order_by(RedemptionRequest.created_at.desc())
-    
-    result = await session.execute(stmt)
-    requests = result.scalars().all()
-    
-    # Add child info to each request
-    enriched_requests = []
-    for req in requests:
-
-        child_stmt = select(User).join(ChildProfile).where(ChildProfile.user_id == req.user_id)
-        child_result = await session.execute(child_stmt)
-        child = child_result.scalar_one()
-        
-        req_dict = RedemptionRequestRead.model_validate(req).model_dump()
-        req_dict["child"] = {
-            "name": child.name,
-            "avatar_url": child.avatar_url,
-            "age": child.child_profile.age
-        }
-        enriched_requests.append(RedemptionRequestRead(**req_dict))
-    
-    return enriched_requests
+    return await list_family_redemptions(
+        session, parent_id, response, request_status, child_id, cursor, limit
+    )
 
 
 @router.put("/redemption-requests/{request_id}/approve", response_model=RedemptionRequestRead)
@@ -177,10 +229,20 @@ async def approve_redemption_request(
             detail="Only the parent can approve redemption requests"
         )
     
-    # Update request
-    redemption_request.status = "approved"
-    redemption_request.approved_by = current_user.id
-    redemption_request.approved_at = datetime.now(timezone.utc)
+    # Update request, unless it was approved or rejected in the meantime
+    approved = await transition(
+        session,
+        redemption_request,
+        "pending",
+        status="approved",
+        approved_by=current_user.id,
+        approved_at=datetime.now(timezone.utc),
+    )
+    if not approved:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Redemption request already processed"
+        )
     
     await session.commit()
     await session.refresh(redemption_request)
@@ -218,12 +280,31 @@ async def reject_redemption_request(
         )
     
   
-    redemption_request.status = "rejected"
-    redemption_request.approved_by = current_user.id
-    redemption_request.approved_at = datetime.now(timezone.utc)
-    
+    rejected = await transition(
+        session,
+        redemption_request,
+        "pending",
+        status="rejected",
+        approved_by=current_user.id,
+        approved_at=datetime.now(timezone.utc),
+    )
+    if not rejected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Redemption request already processed"
+        )
     
-    child_profile.coins += redemption_request.coins_amount
+    # Give the coins held by the request back; a refund, not new earnings
+    await credit(session, Transaction(
+        user_id=redemption_request.user_id,
+        type="refund",
+        amount=redemption_request.coins_amount,
+        description="Redemption request rejected",
+        category="redemption",
+        source="refund",
+        reference_id=redemption_request.id,
+        reference_type="redemption",
+    ))
     
     await session.commit()
     await session.refresh(redemption_request)
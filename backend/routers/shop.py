@@ -7,6 +7,8 @@ from sqlalchemy import select, and_
 
 from database import get_async_session
 from auth import current_active_user
+from idempotency import idempotency_key
+from ledger import InsufficientCoins, debit, transition
 from models import User, ShopItem, ChildProfile, ParentProfile, Transaction, UserOwnedItem, PurchaseRequest, TeenShopItem, TeenOwnedItem
 from schemas import ShopItemRead, ShopItemRequest, PurchaseRequestRead
 
@@ -30,7 +32,7 @@ async def get_shop_items(current_user: User = Depends(current_active_user),
         return [ShopItemRead.model_validate(item) for item in teen_shop_items]
 
 
-@router.post("/shop/{user_id}/purchase", response_model=dict)
+@router.post("/shop/{user_id}/purchase", response_model=dict, dependencies=[Depends(idempotency_key)])
 async def purchase_item(
     user_id: str,
     request: ShopItemRequest,
@@ -248,13 +250,31 @@ async def approve_purchase_request(
     if req.status != 'pending':
         raise HTTPException(status_code=400, detail='Request already processed')
 
-    # Verify coins
-    if child_profile.coins < req.price:
+    # Deduct coins (free items have nothing to deduct)
+    try:
+        if req.price > 0:
+            await debit(session, Transaction(
+                user_id=req.user_id,
+                type='spend',
+                amount=req.price,
+                description='Purchased item',
+                category='shop',
+                reference_id=req.shop_item_id,
+                reference_type='shop',
+            ))
+    except InsufficientCoins:
         raise HTTPException(status_code=400, detail='Insufficient coins')
 
-    # Deduct coins and grant item, split by child role
-    child_profile.coins -= req.price
-    session.add(child_profile)
+    # Mark approved, unless a concurrent approval got there first
+    from datetime import datetime as _dt
+    approved = await transition(
+        session, req, 'pending', status='approved', approved_by=current_user.id, approved_at=_dt.utcnow()
+    )
+    if not approved:
+        await session.rollback()
+        raise HTTPException(status_code=400, detail='Request already processed')
+
+    # Grant item, split by child role
     from models import User, TeenOwnedItem
     user_stmt = select(User).where(User.id == req.user_id)
     user_result = await session.execute(user_stmt)
@@ -263,21 +283,6 @@ async def approve_purchase_request(
         session.add(TeenOwnedItem(user_id=req.user_id, shop_item_id=req.shop_item_id))
     else:
         session.add(UserOwnedItem(user_id=req.user_id, shop_item_id=req.shop_item_id))
-    session.add(Transaction(
-        user_id=req.user_id,
-        type='spend',
-        amount=req.price,
-        description='Purchased item',
-        category='shop',
-        reference_id=req.shop_item_id,
-        reference_type='shop',
-    ))
-
-    # Mark approved
-    from datetime import datetime as _dt
-    req.status = 'approved'
-    req.approved_by = current_user.id
-    req.approved_at = _dt.utcnow()
     await session.commit()
     await session.refresh(req)
     return {
@@ -8,6 +8,7 @@ from sqlalchemy import select, and_
 
 from database import get_async_session
 from auth import current_active_user
+from ledger import credit, transition
 from models import User, Task, ChildProfile, Transaction
 from schemas import TaskRead, TaskCreate, TaskUpdate
 
@@ -178,6 +179,17 @@ async def update_task_status(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions"
             )
 
+    # Claim the approval before anything else so a repeated or concurrent
+    # approval can't award the coins twice
+    if task_update.status == "approved":
+        previous_status = task.status
+        if previous_status == "approved" or not await transition(
+            session, task, previous_status, status="approved", approved_at=datetime.now(timezone.utc)
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Task already approved"
+            )
+
     # Update task
     update_data = task_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
@@ -186,17 +198,8 @@ async def update_task_status(
     if task_update.status == "completed":
         task.completed_at = datetime.now(timezone.utc)
     elif task_update.status == "approved":
-        task.approved_at = datetime.now(timezone.utc)
-
         # Award coins to child
-        stmt = select(ChildProfile).where(ChildProfile.user_id == task.assigned_to)
-        result = await session.execute(stmt)
-        child_profile = result.scalar_one()
-
-        child_profile.coins += task.coins_reward
-
-        # Create transaction record
-        transaction = Transaction(
+        await credit(session, Transaction(
             user_id=task.assigned_to,
             type="earn",
             amount=task.coins_reward,
@@ -204,8 +207,7 @@ async def update_task_status(
             category="task",
             reference_id=task_id,
             reference_type="task",
-        )
-        session.add(transaction)
+        ))
 
     await session.commit()
     await session.refresh(task)
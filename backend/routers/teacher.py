@@ -1,13 +1,14 @@
 """Teacher management router for CoinCraft."""
 
+import uuid
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_, desc
+from sqlalchemy import select, func, and_, or_, desc, case
 from sqlalchemy.orm import selectinload
 
-from database import get_async_session
+from database import get_async_session, dialect_insert
 from auth import current_active_user, get_user_manager, UserManager
 from models import (
     User,
@@ -19,6 +20,9 @@ from models import (
     QuizQuestion,
     QuizOption,
     UserModuleProgress,
+    StudentPerformanceStats,
+    ClassDailyStats,
+    TeacherDailyStats,
     ModuleClassAssignment,
     Transaction,
     Goal,
@@ -30,6 +34,10 @@ from schemas import UserRead, TeacherDashboardResponse
 
 router = APIRouter()
 
+# Bound parameters allowed per statement by SQLite builds before 3.32; bulk
+# INSERTs are chunked to fit, whatever the database
+MAX_BIND_PARAMETERS = 999
+
 
 # Teacher-specific data models
 class ClassSummary:
@@ -66,6 +74,47 @@ class ModuleSummary:
         self.avg_score = stats.get("avg_score", 0)
 
 
+async def _get_class_performance_stats(session: AsyncSession, class_ids: List[str]) -> dict:
+    """Return ``{class_id: (student_count, performance_sum, needing_support)}``.
+
+    A student's performance is the average score of their completed modules
+    (read from the ``student_performance_stats`` rollup); students without
+    completed modules count towards the class size with a performance of 0.
+    """
+    if not class_ids:
+        return {}
+
+    student_stats = (
+        select(
+            StudentPerformanceStats.user_id.label("user_id"),
+            (
+                StudentPerformanceStats.score_sum / StudentPerformanceStats.completed_count
+            ).label("avg_score"),
+            StudentPerformanceStats.needs_support.label("needs_support"),
+        )
+        .where(StudentPerformanceStats.completed_count > 0)
+        .subquery()
+    )
+
+    stats_stmt = (
+        select(
+            ClassStudent.class_id,
+            func.count(ClassStudent.id),
+            func.coalesce(func.sum(student_stats.c.avg_score), 0),
+            func.count(case((student_stats.c.needs_support == True, 1))),
+        )
+        .outerjoin(student_stats, student_stats.c.user_id == ClassStudent.student_id)
+        .where(ClassStudent.class_id.in_(class_ids))
+        .group_by(ClassStudent.class_id)
+    )
+    stats_result = await session.execute(stats_stmt)
+
+    return {
+        class_id: (student_count, float(performance_sum), needing_support)
+        for class_id, student_count, performance_sum, needing_support in stats_result.all()
+    }
+
+
 @router.get("/dashboard", response_model=TeacherDashboardResponse)
 async def get_teacher_dashboard(
     current_user: User = Depends(current_active_user),
@@ -103,64 +152,27 @@ async def get_teacher_dashboard(
         f"[BACKEND] Teacher Dashboard: Found {len(classes_data)} classes for teacher {current_user.id}"
     )
 
+    # Per-class student count, summed student averages and support count in one
+    # grouped statement instead of one query per student.
+    class_stats = await _get_class_performance_stats(
+        session, [class_obj.id for class_obj in classes_data]
+    )
+
     classes = []
     total_students = 0
     total_performance = 0
     students_needing_support = 0
 
     for class_obj in classes_data:
-        # Get students in this class
-        students_stmt = select(ClassStudent).where(
-            ClassStudent.class_id == class_obj.id
+        student_count, performance_sum, class_students_needing_support = class_stats.get(
+            class_obj.id, (0, 0, 0)
         )
-        students_result = await session.execute(students_stmt)
-        class_students = students_result.scalars().all()
-
-        student_count = len(class_students)
         total_students += student_count
+        students_needing_support += class_students_needing_support
 
-        # Calculate class performance
-        class_performance = 0
-        class_students_needing_support = 0
-
-        if student_count > 0:
-            for class_student in class_students:
-                # Get student's overall performance
-                student_user_stmt = select(User).where(
-                    User.id == class_student.student_id
-                )
-                student_result = await session.execute(student_user_stmt)
-                student_user = student_result.scalar_one_or_none()
-
-                if student_user:
-                    progress_stmt = select(UserModuleProgress).where(
-                        UserModuleProgress.user_id == student_user.id
-                    )
-                    progress_result = await session.execute(progress_stmt)
-                    student_progress = progress_result.scalars().all()
-
-                    if student_progress:
-                        completed_modules = [
-                            p for p in student_progress if p.is_completed
-                        ]
-                        if completed_modules:
-                            avg_score = sum(
-                                p.score or 0 for p in completed_modules
-                            ) / len(completed_modules)
-                            class_performance += avg_score
-
-                            if avg_score < 70:
-                                class_students_needing_support += 1
-                        else:
-                            class_performance += 0
-                    else:
-                        class_performance += 0
-
-            class_performance = (
-                class_performance / student_count if student_count > 0 else 0
-            )
-            students_needing_support += class_students_needing_support
-
+        class_performance = (
+            performance_sum / student_count if student_count > 0 else 0
+        )
         total_performance += class_performance
 
         class_summary = {
@@ -328,44 +340,14 @@ async def get_teacher_classes(
     classes_result = await session.execute(classes_stmt)
     classes = classes_result.scalars().all()
 
+    class_stats = await _get_class_performance_stats(
+        session, [class_obj.id for class_obj in classes]
+    )
+
     classes_data = []
     for class_obj in classes:
-        # Get student count
-        students_stmt = select(ClassStudent).where(
-            ClassStudent.class_id == class_obj.id
-        )
-        students_result = await session.execute(students_stmt)
-        student_count = len(students_result.scalars().all())
-
-        # Calculate average performance based on student module progress
-        avg_performance = 0
-        if student_count > 0:
-            # Get all students in this class
-            students_stmt = select(ClassStudent).where(
-                ClassStudent.class_id == class_obj.id
-            )
-            students_result = await session.execute(students_stmt)
-            students = students_result.scalars().all()
-
-            total_performance = 0
-            for student in students:
-                # Get student's module progress
-                progress_stmt = select(UserModuleProgress).where(
-                    UserModuleProgress.user_id == student.student_id
-                )
-                progress_result = await session.execute(progress_stmt)
-                progress_records = progress_result.scalars().all()
-
-                # Calculate average score for this student
-                if progress_records:
-                    student_avg = sum(p.score or 0 for p in progress_records) / len(
-                        progress_records
-                    )
-                    total_performance += student_avg
-
-            avg_performance = (
-                total_performance / student_count if student_count > 0 else 0
-            )
+        student_count, performance_sum, _ = class_stats.get(class_obj.id, (0, 0, 0))
+        avg_performance = performance_sum / student_count if student_count > 0 else 0
 
         classes_data.append(
             {
@@ -420,32 +402,37 @@ async def get_class_details(
             status_code=status.HTTP_404_NOT_FOUND, detail="Class not found"
         )
 
-    # Get students in this class
+    # Get students in this class with their performance rollup
     students_stmt = (
-        select(ClassStudent, User)
+        select(ClassStudent, User, StudentPerformanceStats)
         .join(User, ClassStudent.student_id == User.id)
+        .outerjoin(
+            StudentPerformanceStats, StudentPerformanceStats.user_id == User.id
+        )
         .where(ClassStudent.class_id == class_id)
     )
     students_result = await session.execute(students_stmt)
     students_data = students_result.all()
 
-    students = []
-    for class_student, user in students_data:
+    # Per-module progress for the whole class in one query
+    progress_by_student = {}
+    if students_data:
         progress_stmt = select(UserModuleProgress).where(
-            UserModuleProgress.user_id == user.id
+            UserModuleProgress.user_id.in_([user.id for _, user, _ in students_data])
         )
         progress_result = await session.execute(progress_stmt)
-        progress_data = progress_result.scalars().all()
+        for p in progress_result.scalars().all():
+            progress_by_student.setdefault(p.user_id, []).append(p)
+
+    students = []
+    for class_student, user, stats in students_data:
+        progress_data = progress_by_student.get(user.id, [])
 
         performance = 0
         needs_support = False
-        if progress_data:
-            completed_modules = [p for p in progress_data if p.is_completed]
-            if completed_modules:
-                performance = sum(p.score or 0 for p in completed_modules) / len(
-                    completed_modules
-                )
-                needs_support = performance < 70
+        if stats and stats.completed_count:
+            performance = stats.score_sum / stats.completed_count
+            needs_support = stats.needs_support
 
         students.append(
             {
@@ -770,10 +757,12 @@ async def create_module(
 
 @router.get("/modules", response_model=List[dict])
 async def get_teacher_modules(
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    offset: int = Query(0, ge=0),
     current_user: User = Depends(current_active_user),
     session: AsyncSession = Depends(get_async_session),
 ):
-    """Get all modules created by the teacher."""
+    """Get modules created by the teacher, newest first, optionally paginated."""
 
     if current_user.role != "teacher":
         raise HTTPException(
@@ -781,39 +770,61 @@ async def get_teacher_modules(
             detail="Only teachers can view modules",
         )
 
-    modules_stmt = select(Module).where(Module.created_by == current_user.id)
+    # Load modules with their sections, quiz questions and options up front
+    modules_stmt = (
+        select(Module)
+        .where(Module.created_by == current_user.id)
+        .order_by(Module.created_at.desc(), Module.id)
+        .offset(offset)
+        .options(
+            selectinload(Module.sections)
+            .selectinload(ModuleSection.quiz_questions)
+            .selectinload(QuizQuestion.options)
+        )
+    )
+    if limit is not None:
+        modules_stmt = modules_stmt.limit(limit)
     modules_result = await session.execute(modules_stmt)
     modules = modules_result.scalars().all()
 
-    modules_data = []
-    for module in modules:
-        progress_stmt = select(UserModuleProgress).where(
-            UserModuleProgress.module_id == module.id
+    # Completion rate and average score for every module in one grouped query
+    module_stats = {}
+    if modules:
+        stats_stmt = (
+            select(
+                UserModuleProgress.module_id,
+                func.count(UserModuleProgress.id),
+                func.count(case((UserModuleProgress.is_completed == True, 1))),
+                func.avg(
+                    case(
+                        (
+                            UserModuleProgress.is_completed == True,
+                            func.coalesce(UserModuleProgress.score, 0),
+                        )
+                    )
+                ),
+            )
+            .where(UserModuleProgress.module_id.in_([module.id for module in modules]))
+            .group_by(UserModuleProgress.module_id)
         )
-        progress_result = await session.execute(progress_stmt)
-        progress_data = progress_result.scalars().all()
-
-        completion_rate = 0
-        avg_score = 0
+        stats_result = await session.execute(stats_stmt)
+        module_stats = {
+            module_id: (total, completed, avg_score)
+            for module_id, total, completed, avg_score in stats_result.all()
+        }
 
-        if progress_data:
-            completed = [p for p in progress_data if p.is_completed]
-            completion_rate = len(completed) / len(progress_data) * 100
-            if completed:
-                avg_score = sum(p.score or 0 for p in completed) / len(completed)
+    modules_data = []
+    for module in modules:
+        total, completed, avg_score = module_stats.get(module.id, (0, 0, None))
+        completion_rate = completed / total * 100 if total else 0
+        avg_score = avg_score or 0
 
-        sections_stmt = (
-            select(ModuleSection)
-            .where(
-                and_(ModuleSection.module_id == module.id, ModuleSection.type != "quiz")
-            )
-            .order_by(ModuleSection.order_index)
-        )
-        sections_result = await session.execute(sections_stmt)
-        sections = sections_result.scalars().all()
+        sections = sorted(module.sections, key=lambda section: section.order_index)
 
         sections_data = []
         for section in sections:
+            if section.type == "quiz":
+                continue
             sections_data.append(
                 {
                     "title": section.title,
@@ -825,31 +836,17 @@ async def get_teacher_modules(
             )
 
         # Get quiz questions
-        quiz_stmt = select(ModuleSection).where(
-            and_(ModuleSection.module_id == module.id, ModuleSection.type == "quiz")
+        quiz_section = next(
+            (section for section in sections if section.type == "quiz"), None
         )
-        quiz_section_result = await session.execute(quiz_stmt)
-        quiz_section = quiz_section_result.scalar_one_or_none()
 
         quiz_data = []
         if quiz_section:
-            questions_stmt = (
-                select(QuizQuestion)
-                .where(QuizQuestion.section_id == quiz_section.id)
-                .order_by(QuizQuestion.order_index)
+            questions = sorted(
+                quiz_section.quiz_questions, key=lambda question: question.order_index
             )
-            questions_result = await session.execute(questions_stmt)
-            questions = questions_result.scalars().all()
-
             for question in questions:
-                options_stmt = (
-                    select(QuizOption)
-                    .where(QuizOption.question_id == question.id)
-                    .order_by(QuizOption.order_index)
-                )
-                options_result = await session.execute(options_stmt)
-                options = options_result.scalars().all()
-
+                options = sorted(question.options, key=lambda option: option.order_index)
                 options_data = []
                 for option in options:
                     options_data.append(
@@ -930,33 +927,35 @@ async def assign_module_to_class(
             status_code=status.HTTP_404_NOT_FOUND, detail="Module not found"
         )
 
-    # Get the class and verify teacher owns it
-    class_id = assignment_data.get("class_id")
+    # Accept a single class_id or a list of class_ids; verify ownership in one query
+    class_ids = assignment_data.get("class_ids") or [assignment_data.get("class_id")]
+    class_ids = list(dict.fromkeys(cid for cid in class_ids if cid))
     class_stmt = select(Class).where(
-        and_(Class.id == class_id, Class.teacher_id == teacher_profile.id)
+        and_(Class.id.in_(class_ids), Class.teacher_id == teacher_profile.id)
     )
     class_result = await session.execute(class_stmt)
-    class_obj = class_result.scalar_one_or_none()
+    classes = class_result.scalars().all()
 
-    if not class_obj:
+    if not class_ids or len(classes) != len(class_ids):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Class not found"
         )
 
-    # Get students in this class
-    students_stmt = select(ClassStudent).where(ClassStudent.class_id == class_id)
+    # Distinct students across all target classes
+    students_stmt = (
+        select(ClassStudent.student_id)
+        .where(ClassStudent.class_id.in_(class_ids))
+        .distinct()
+    )
     students_result = await session.execute(students_stmt)
-    class_students = students_result.scalars().all()
+    student_ids = students_result.scalars().all()
 
-    if not class_students:
+    if not student_ids:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No students in this class"
         )
 
     try:
-        # Create module assignments for each student
-        assignments_created = 0
-        
         # Convert due_date string to datetime if provided
         due_date_obj = None
         if assignment_data.get("due_date"):
@@ -965,54 +964,59 @@ async def assign_module_to_class(
             except ValueError:
                 print(f"[BACKEND] Invalid due_date format: {assignment_data['due_date']}")
                 due_date_obj = None
-        
-        # Create module-class assignment record
-        module_class_assignment = ModuleClassAssignment(
-            module_id=module_id,
-            class_id=class_id,
-            assigned_by=current_user.id,
-            assigned_at=datetime.now(timezone.utc),
-            due_date=due_date_obj
-        )
-        session.add(module_class_assignment)
-        
-        for class_student in class_students:
-            # Check if assignment already exists
-            existing_assignment = select(UserModuleProgress).where(
-                and_(
-                    UserModuleProgress.user_id == class_student.student_id,
-                    UserModuleProgress.module_id == module_id
-                )
+
+        assigned_at = datetime.now(timezone.utc)
+
+        # Create module-class assignment records
+        for class_obj in classes:
+            session.add(ModuleClassAssignment(
+                module_id=module_id,
+                class_id=class_obj.id,
+                assigned_by=current_user.id,
+                assigned_at=assigned_at,
+                due_date=due_date_obj
+            ))
+
+        # Bulk insert progress rows; students already holding the module are skipped
+        # by the unique (user_id, module_id) index
+        insert = dialect_insert(session)
+        assignments_created = 0
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": student_id,
+                "module_id": module_id,
+                "assigned_by": current_user.id,
+                "assigned_at": assigned_at,
+                "started_at": assigned_at,
+                "due_date": due_date_obj,
+                "status": "assigned",
+                "is_completed": False,
+                "progress_percentage": 0.0,
+                "time_spent": 0,
+            }
+            for student_id in student_ids
+        ]
+        chunk_size = MAX_BIND_PARAMETERS // len(rows[0]) if rows else 1
+        for chunk_start in range(0, len(rows), chunk_size):
+            chunk = rows[chunk_start:chunk_start + chunk_size]
+            stmt = insert(UserModuleProgress.__table__).values(chunk).on_conflict_do_nothing(
+                index_elements=["user_id", "module_id"]
             )
-            existing_result = await session.execute(existing_assignment)
-            
-            if not existing_result.scalar_one_or_none():
-                # Create new assignment
-                print(f"[BACKEND] Creating UserModuleProgress for student {class_student.student_id} and module {module_id}")
-                assignment = UserModuleProgress(
-                    user_id=class_student.student_id,
-                    module_id=module_id,
-                    assigned_by=current_user.id,
-                    assigned_at=datetime.now(timezone.utc),
-                    due_date=due_date_obj,
-                    status="assigned"
-                )
-                session.add(assignment)
-                assignments_created += 1
-                print(f"[BACKEND] Created assignment {assignment.id} for student {class_student.student_id}")
-            else:
-                print(f"[BACKEND] Assignment already exists for student {class_student.student_id} and module {module_id}")
+            result = await session.execute(stmt)
+            assignments_created += result.rowcount
 
         await session.commit()
-        print(f"[BACKEND] Module {module.title} assigned to class {class_obj.name} for {assignments_created} students")
-        print(f"[BACKEND] Total students in class: {len(class_students)}")
+        class_names = ", ".join(class_obj.name for class_obj in classes)
+        print(f"[BACKEND] Module {module.title} assigned to {class_names}: {assignments_created} new of {len(student_ids)} students")
 
         return {
-            "message": f"Module '{module.title}' assigned to class '{class_obj.name}' successfully",
+            "message": f"Module '{module.title}' assigned to class '{class_names}' successfully",
             "module_id": module_id,
-            "class_id": class_id,
+            "class_id": class_ids[0],
+            "class_ids": class_ids,
             "students_assigned": assignments_created,
-            "total_students": len(class_students)
+            "total_students": len(student_ids)
         }
 
     except Exception as e:
@@ -1064,46 +1068,71 @@ async def get_performance_analytics(
             "module_completion": [],
         }
 
-    # Get teacher's classes
-    classes_stmt = select(Class).where(Class.teacher_id == teacher_profile.id)
+    # Get teacher's classes with their sizes
+    class_size = (
+        select(func.count(ClassStudent.id)).where(ClassStudent.class_id == Class.id).scalar_subquery()
+    )
+    classes_stmt = select(Class, class_size).where(Class.teacher_id == teacher_profile.id)
     classes_result = await session.execute(classes_stmt)
-    classes = classes_result.scalars().all()
+    classes_with_sizes = classes_result.all()
+    classes = [class_obj for class_obj, _ in classes_with_sizes]
+    class_sizes = {class_obj.id: size for class_obj, size in classes_with_sizes}
+    class_ids = [class_obj.id for class_obj in classes]
+
+    # At most one rollup row per class and day in the window
+    daily_stmt = (
+        select(ClassDailyStats)
+        .where(
+            and_(
+                ClassDailyStats.class_id.in_(class_ids),
+                ClassDailyStats.day >= start_date.date(),
+            )
+        )
+        .order_by(ClassDailyStats.day)
+    )
+    daily_result = await session.execute(daily_stmt)
+    daily_rows = daily_result.scalars().all()
+
+    def day_point(day, completions, score_sum, active_students):
+        return {
+            "date": day.isoformat(),
+            "completions": completions,
+            "avg_score": round(score_sum / completions, 1) if completions > 0 else 0,
+            "active_students": active_students,
+        }
+
+    rows_by_class = {class_id: [] for class_id in class_ids}
+    for row in daily_rows:
+        rows_by_class[row.class_id].append(row)
+
+    # Summing the class rows would count a student once per class they're in;
+    # the teacher rollup counts each student once
+    series_stmt = (
+        select(
+            TeacherDailyStats.day,
+            TeacherDailyStats.completions,
+            TeacherDailyStats.score_sum,
+            TeacherDailyStats.active_students,
+        )
+        .where(
+            TeacherDailyStats.teacher_id == teacher_profile.id,
+            TeacherDailyStats.day >= start_date.date(),
+        )
+        .order_by(TeacherDailyStats.day)
+    )
+    series_result = await session.execute(series_stmt)
 
     class_performance = []
     overall_performance = 0
     total_students = 0
 
     for class_obj in classes:
-        # Get students in class
-        students_stmt = select(ClassStudent).where(
-            ClassStudent.class_id == class_obj.id
-        )
-        students_result = await session.execute(students_stmt)
-        class_students = students_result.scalars().all()
-
-        class_avg = 0
-        if class_students:
-            for class_student in class_students:
-                progress_stmt = select(UserModuleProgress).where(
-                    and_(
-                        UserModuleProgress.user_id == class_student.student_id,
-                        UserModuleProgress.completed_at >= start_date,
-                    )
-                )
-                progress_result = await session.execute(progress_stmt)
-                progress_data = progress_result.scalars().all()
-
-                if progress_data:
-                    completed = [p for p in progress_data if p.is_completed]
-                    if completed:
-                        student_avg = sum(p.score or 0 for p in completed) / len(
-                            completed
-                        )
-                        class_avg += student_avg
-
-            class_avg = class_avg / len(class_students) if class_students else 0
-            total_students += len(class_students)
-
+        class_rows = rows_by_class[class_obj.id]
+        completions = sum(row.completions for row in class_rows)
+        score_sum = sum(row.score_sum for row in class_rows)
+        class_avg = score_sum / completions if completions > 0 else 0
+        student_count = class_sizes.get(class_obj.id, 0)
+        total_students += student_count
         overall_performance += class_avg
 
         class_performance.append(
@@ -1111,7 +1140,12 @@ async def get_performance_analytics(
                 "class_id": class_obj.id,
                 "class_name": class_obj.name,
                 "avg_performance": round(class_avg, 1),
-                "student_count": len(class_students),
+                "student_count": student_count,
+                "completions": completions,
+                "daily": [
+                    day_point(row.day, row.completions, row.score_sum, row.active_students)
+                    for row in class_rows
+                ],
             }
         )
 
@@ -1120,6 +1154,9 @@ async def get_performance_analytics(
     return {
         "overall_performance": round(overall_performance, 1),
         "class_performance": class_performance,
+        "daily_series": [
+            day_point(*row) for row in series_result.all()
+        ],
         "total_students": total_students,
         "timeframe": timeframe,
     }
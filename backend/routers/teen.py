@@ -21,6 +21,7 @@ from models import (
     RedemptionRequest,
     BudgetCategory,
 )
+from rollups import ledger_totals
 from schemas import UserRead
 
 router = APIRouter()
@@ -761,33 +762,33 @@ async def get_teen_analytics(
     else:  # year
         start_date = now - timedelta(days=365)
 
-    transactions_stmt = select(Transaction).where(
-        and_(
-            Transaction.user_id == current_user.id, Transaction.created_at >= start_date
-        )
-    )
-    transactions_result = await session.execute(transactions_stmt)
-    transactions = transactions_result.scalars().all()
-
-    total_earned = sum(t.amount for t in transactions if t.type == "earn")
-    total_spent = sum(t.amount for t in transactions if t.type == "spend")
-    total_saved = sum(t.amount for t in transactions if t.type == "save")
-
-    goals_stmt = select(Goal).where(Goal.user_id == current_user.id)
-    goals_result = await session.execute(goals_stmt)
-    goals = goals_result.scalars().all()
+    totals = await ledger_totals(session, current_user.id, since=start_date.date())
+    total_earned = totals["earn"]
+    total_spent = totals["spend"]
+    total_saved = totals["save"]
 
-    active_goals = [g for g in goals if not g.is_completed]
-    completed_goals = [g for g in goals if g.is_completed]
-
-    progress_stmt = select(UserModuleProgress).where(
+    goals_total = (
+        select(func.count(Goal.id)).where(Goal.user_id == current_user.id).scalar_subquery()
+    )
+    goals_completed = (
+        select(func.count(Goal.id))
+        .where(Goal.user_id == current_user.id, Goal.is_completed)
+        .scalar_subquery()
+    )
+    activities_stmt = select(
+        goals_total,
+        goals_completed,
+        func.count(UserModuleProgress.id),
+        func.coalesce(func.sum(UserModuleProgress.score), 0),
+    ).where(
         and_(
             UserModuleProgress.user_id == current_user.id,
             UserModuleProgress.completed_at >= start_date,
         )
     )
-    progress_result = await session.execute(progress_stmt)
-    completed_activities = progress_result.scalars().all()
+    (
+        total_goals, completed_goals, completed_activities, activity_score
+    ) = (await session.execute(activities_stmt)).one()
 
     return {
         "timeframe": timeframe,
@@ -798,13 +799,13 @@ async def get_teen_analytics(
             "net_change": total_earned - total_spent - total_saved,
         },
         "goals_analytics": {
-            "active_goals": len(active_goals),
-            "completed_goals": len(completed_goals),
-            "completion_rate": len(completed_goals) / len(goals) * 100 if goals else 0,
+            "active_goals": total_goals - completed_goals,
+            "completed_goals": completed_goals,
+            "completion_rate": completed_goals / total_goals * 100 if total_goals else 0,
         },
         "activities_analytics": {
-            "completed_activities": len(completed_activities),
-            "total_coins_earned": sum(p.score or 0 for p in completed_activities),
+            "completed_activities": completed_activities,
+            "total_coins_earned": activity_score,
         },
         "spending_patterns": {
             "by_category": {"saving": total_saved, "spending": total_spent, "wants": 0}
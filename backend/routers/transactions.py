@@ -4,34 +4,27 @@ from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_, func, tuple_
 
 from database import get_async_session
 from auth import current_active_user
-from models import User, Transaction, ChildProfile
+from idempotency import idempotency_key
+from ledger import InsufficientCoins, credit, debit
+from exports import export_filters, export_response
+from pagination import decode_cursor, encode_cursor
+from rollups import earnings_since
+from models import User, Transaction, TransactionArchive, ChildProfile
 from schemas import TransactionRead, TransactionCreate, TransactionList
 
 router = APIRouter()
 
 
-@router.get("/users/{user_id}/transactions", response_model=TransactionList)
-async def get_user_transactions(
-    user_id: str,
-    limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
-    type: Optional[str] = Query(None, pattern="^(earn|spend|save)$"),
-    category: Optional[str] = None,
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
-    current_user: User = Depends(current_active_user),
-    session: AsyncSession = Depends(get_async_session)
-):
-    """Get user transactions with optional filters."""
+async def resolve_history_owner(user_id: str, current_user: User, session: AsyncSession) -> str:
+    """Resolve ``me`` and check the user may read ``user_id``'s history (their own, or their child's)."""
     if user_id == "me":
-        user_id = current_user.id
-    elif user_id != current_user.id:
+        return current_user.id
+    if user_id != current_user.id:
         if current_user.role == "parent":
-            from models import ChildProfile
             stmt = select(ChildProfile).where(
                 and_(ChildProfile.user_id == user_id, ChildProfile.parent_id == current_user.id)
             )
@@ -47,68 +40,125 @@ async def get_user_transactions(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Insufficient permissions"
             )
-    
-
-    filters = [Transaction.user_id == user_id]
-    
-    if type:
-        filters.append(Transaction.type == type)
-    if category:
-        filters.append(Transaction.category == category)
-    if start_date:
-        filters.append(Transaction.created_at >= start_date)
-    if end_date:
-        filters.append(Transaction.created_at <= end_date)
-    
+    return user_id
 
-    stmt = select(Transaction).where(and_(*filters)).order_by(
-        Transaction.created_at.desc()
-    ).offset(offset).limit(limit)
-    
-    result = await session.execute(stmt)
-    transactions = result.scalars().all()
-    
-  
-    count_stmt = select(func.count(Transaction.id)).where(and_(*filters))
-    count_result = await session.execute(count_stmt)
-    total_count = count_result.scalar()
-    
 
-    now = datetime.now(timezone.utc)
-    week_ago = now - timedelta(days=7)
-    month_ago = now - timedelta(days=30)
-    
-
-    weekly_stmt = select(func.sum(Transaction.amount)).where(
-        and_(
-            Transaction.user_id == user_id,
-            Transaction.type == "earn",
-            Transaction.created_at >= week_ago
+@router.get("/users/{user_id}/transactions", response_model=TransactionList)
+async def get_user_transactions(
+    user_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    include_total: bool = False,
+    type: Optional[str] = Query(None, pattern="^(earn|spend|save|refund)$"),
+    category: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Get user transactions with optional filters, newest first.
+
+    Pages are keyed on (created_at, id): pass the previous page's
+    ``next_cursor`` as ``cursor`` to get the next one. ``offset`` still works
+    for old clients but gets slower the deeper it goes. The exact
+    ``total_count`` is only computed with ``include_total=true``. History
+    that has been archived is included once the recent rows run out.
+    """
+    user_id = await resolve_history_owner(user_id, current_user, session)
+
+    def filters_for(model):
+        filters = [model.user_id == user_id]
+        if type:
+            filters.append(model.type == type)
+        if category:
+            filters.append(model.category == category)
+        if start_date:
+            filters.append(model.created_at >= start_date)
+        if end_date:
+            filters.append(model.created_at <= end_date)
+        return and_(*filters)
+
+    after = decode_cursor(cursor)
+
+    def page_of(model, skip: int, count: int):
+        stmt = select(model).where(filters_for(model))
+        if after is not None:
+            stmt = stmt.where(tuple_(model.created_at, model.id) < after)
+        else:
+            stmt = stmt.offset(skip)
+        return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(count)
+
+    # One extra row tells whether there is a next page
+    result = await session.execute(page_of(Transaction, offset, limit + 1))
+    transactions = list(result.scalars().all())
+
+    # Archived rows are all older than the hot ones, so the archive is only
+    # read once the hot table has run out of rows for this page
+    if len(transactions) <= limit:
+        skip = 0
+        if after is None and offset and not transactions:
+            hot_count = await session.execute(
+                select(func.count(Transaction.id)).where(filters_for(Transaction))
+            )
+            skip = max(offset - hot_count.scalar(), 0)
+        archived = await session.execute(
+            page_of(TransactionArchive, skip, limit + 1 - len(transactions))
         )
-    )
-    weekly_result = await session.execute(weekly_stmt)
-    weekly_total = weekly_result.scalar() or 0
+        transactions.extend(archived.scalars().all())
+
+    next_cursor = None
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    
+    total_count = None
+    if include_total:
+        total_count = 0
+        for model in (Transaction, TransactionArchive):
+            count_result = await session.execute(
+                select(func.count(model.id)).where(filters_for(model))
+            )
+            total_count += count_result.scalar()
     
-
-    monthly_stmt = select(func.sum(Transaction.amount)).where(
-        and_(
-            Transaction.user_id == user_id,
-            Transaction.type == "earn",
-            Transaction.created_at >= month_ago
-        )
+    # Rolling totals over the last 7 and 30 days, today included
+    today = datetime.now(timezone.utc).date()
+    weekly_total, monthly_total = await earnings_since(
+        session, user_id, today - timedelta(days=6), today - timedelta(days=29)
     )
-    monthly_result = await session.execute(monthly_stmt)
-    monthly_total = monthly_result.scalar() or 0
     
     return TransactionList(
         transactions=[TransactionRead.model_validate(t) for t in transactions],
         total_count=total_count,
         weekly_total=weekly_total,
-        monthly_total=monthly_total
+        monthly_total=monthly_total,
+        next_cursor=next_cursor
     )
 
 
-@router.post("/users/{user_id}/transactions", response_model=dict)
+@router.get("/users/{user_id}/transactions/export")
+async def export_user_transactions(
+    user_id: str,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    type: Optional[str] = Query(None, pattern="^(earn|spend|save|refund)$"),
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: User = Depends(current_active_user),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Stream the user's whole transaction history, oldest first, as CSV or NDJSON."""
+    user_id = await resolve_history_owner(user_id, current_user, session)
+
+    def where(model):
+        filters = [model.user_id == user_id]
+        filters.extend(export_filters(model, type, start_date, end_date))
+        return and_(*filters)
+
+    return export_response(session, where, format, f"transactions-{user_id}")
+
+
+@router.post("/users/{user_id}/transactions", response_model=dict, dependencies=[Depends(idempotency_key)])
 async def create_transaction(
     user_id: str,
     transaction_data: TransactionCreate,
@@ -150,26 +200,23 @@ async def create_transaction(
         )
     
 
-    if transaction_data.type == "spend" and child_profile.coins < transaction_data.amount:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Insufficient coins for spending"
-        )
-    
-
     transaction = Transaction(
         user_id=user_id,
         **transaction_data.model_dump()
     )
-    session.add(transaction)
-    
 
+    # Saved coins leave the balance just like spent ones
     if transaction_data.type == "earn":
-        child_profile.coins += transaction_data.amount
-    elif transaction_data.type == "spend":
-        child_profile.coins -= transaction_data.amount
+        await credit(session, transaction)
+    else:
+        try:
+            await debit(session, transaction)
+        except InsufficientCoins:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Insufficient coins for {'spending' if transaction_data.type == 'spend' else 'saving'}"
+            )
 
-    
     await session.commit()
     await session.refresh(transaction)
     await session.refresh(child_profile)
@@ -244,40 +244,6 @@ async def get_coins(user_id: str, current_user: User = Depends(current_active_us
             return 0
         
 
-@router.post("/{user_id}/coins", response_model=int)
-async def update_coins(user_id: str, response: dict, current_user: User = Depends(current_active_user),
-                       session: AsyncSession = Depends(get_async_session)):
-    coins=response.get("coins")
-    print("I have received the request")
-    if current_user.role not in ['younger_child', 'older_child']:
-        return 0
-    else:
-        stmt = select(ChildProfile).where(ChildProfile.user_id == user_id)
-        result = await session.execute(stmt)
-        child_profile = result.scalar_one_or_none()
-        if child_profile:
-            child_profile.coins = coins
-            session.add(child_profile)
-            await session.commit()
-            return child_profile.coins
-        else:
-            return 0
-        
-@router.get("/{user_id}/transactions", response_model=List[TransactionRead])
-async def get_transactions(user_id: str, current_user: User = Depends(current_active_user),
-                           session: AsyncSession = Depends(get_async_session)):
-    if current_user.role not in ['younger_child', 'older_child']:
-        return []
-    else:
-        stmt = select(Transaction).where(Transaction.user_id == user_id)
-        result = await session.execute(stmt)
-        transactions = result.scalars().all()
-
-        if transactions:
-            return [TransactionRead.model_validate(transaction) for transaction in transactions]
-        else:
-            return []
-        
 @router.get("/{user_id}/goals", response_model=List[GoalRead])
 async def get_goals(user_id: str, current_user: User = Depends(current_active_user),
                     session: AsyncSession = Depends(get_async_session)):
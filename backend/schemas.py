@@ -1,6 +1,6 @@
 """Pydantic schemas for API validation."""
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
@@ -155,19 +155,20 @@ class GoalContribution(BaseModel):
 
 # Transaction Schemas
 class TransactionBase(BaseModel):
-    type: str = Field(..., pattern="^(earn|spend|save)$")
+    type: str = Field(..., pattern="^(earn|spend|save|refund)$")
     amount: int = Field(..., gt=0)
     description: str = Field(..., min_length=1, max_length=500)
     category: Optional[str] = None
     source: Optional[str] = None
     reference_id: Optional[str] = None
     reference_type: Optional[str] = Field(
-        None, pattern="^(goal|task|activity|shop|redemption)$"
+        None, pattern="^(goal|task|activity|shop|redemption|allowance)$"
     )
 
 
 class TransactionCreate(TransactionBase):
-    pass
+    # Refunds are only issued by the server
+    type: str = Field(..., pattern="^(earn|spend|save)$")
 
 
 class TransactionRead(TransactionBase):
@@ -181,9 +182,10 @@ class TransactionRead(TransactionBase):
 
 class TransactionList(BaseModel):
     transactions: List[TransactionRead]
-    total_count: int
+    total_count: Optional[int] = None
     weekly_total: int
     monthly_total: int
+    next_cursor: Optional[str] = None
 
 
 # Achievement Schemas
@@ -237,6 +239,61 @@ class TaskRead(TaskBase):
         from_attributes = True
 
 
+# Allowance Schemas
+class AllowanceScheduleBase(BaseModel):
+    amount: int = Field(..., gt=0)
+    weekday: int = Field(6, ge=0, le=6)  # 0 = Monday ... 6 = Sunday
+    goal_id: Optional[str] = None
+    goal_percent: int = Field(0, ge=0, le=100)
+    is_active: bool = True
+
+
+class AllowanceScheduleSet(AllowanceScheduleBase):
+    pass
+
+
+class AllowanceScheduleRead(AllowanceScheduleBase):
+    id: str
+    child_id: str
+    parent_id: str
+    starts_on: date
+    last_paid_on: Optional[date] = None
+    last_saved_amount: int = 0
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Recurring Task Template Schemas
+class TaskTemplateBase(BaseModel):
+    title: str = Field(..., min_length=1, max_length=200)
+    description: Optional[str] = None
+    coins_reward: int = Field(..., gt=0)
+    requires_approval: bool = True
+    frequency: str = Field(..., pattern="^(daily|weekly)$")
+    weekdays: Optional[str] = Field(None, pattern="^[0-6]{1,7}$")  # weekly: 0 = Monday ... 6 = Sunday, e.g. "024"
+    ends_on: Optional[date] = None
+
+
+class TaskTemplateCreate(TaskTemplateBase):
+    assigned_to: str
+    starts_on: Optional[date] = None
+
+
+class TaskTemplateRead(TaskTemplateBase):
+    id: str
+    assigned_by: str
+    assigned_to: str
+    starts_on: date
+    is_active: bool
+    materialized_through: Optional[date] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 # Module Schemas
 class ModuleBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
@@ -585,6 +642,26 @@ class TaskApprovalResponse(BaseModel):
         from_attributes = True
 
 
+class TaskBulkReview(BaseModel):
+    task_ids: List[str] = Field(..., min_length=1, max_length=200)
+    action: str = Field(..., pattern="^(approve|reject)$")
+
+
+class TaskReviewResult(BaseModel):
+    task_id: str
+    success: bool
+    status: Optional[str] = None
+    coins_awarded: int = 0
+    message: str
+
+
+class TaskBulkReviewResponse(BaseModel):
+    results: List[TaskReviewResult]
+    approved: int
+    rejected: int
+    coins_awarded: int
+
+
 class ChildProgressResponse(BaseModel):
     child: UserRead
     stats: DashboardStats
@@ -1,17 +1,29 @@
-"""Seed initial data for CoinCraft application."""
+"""Seed initial data for CoinCraft application.
 
+``python seed_data.py`` creates the demo accounts; ``python seed_data.py
+--generate`` bulk-loads a synthetic dataset of any size instead (see
+``generate_dataset``).
+"""
+
+import argparse
 import asyncio
-from datetime import datetime, timedelta, timezone
+import random
+import time
+from datetime import date, datetime, timedelta, timezone
 
 from database import create_db_and_tables, get_async_session, engine
 from models import (
-    User, ChildProfile, ParentProfile, TeacherProfile, Goal, Transaction,
-    Achievement, Module, ShopItem, UserOwnedItem, Activity, UserActivity, TeenShopItem
+    Base, User, ChildProfile, ParentProfile, TeacherProfile, Goal, Transaction,
+    Achievement, Module, ShopItem, UserOwnedItem, Activity, UserActivity, TeenShopItem,
+    Class, ClassStudent, ModuleClassAssignment, UserModuleProgress, Task, RedemptionRequest,
 )
-from sqlalchemy import delete, select
+from sqlalchemy import DateTime, delete, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from auth import get_user_db, get_user_manager
+from rollups import rebuild_daily_ledger_summary, rebuild_student_performance_stats, refresh_class_daily_stats
 from schemas import UserCreate
 from fastapi_users import exceptions
+from fastapi_users.password import PasswordHelper
 
 async def seed_data():
     """Seed initial data for development."""
@@ -715,6 +727,10 @@ async def seed_data():
                 user_activity = UserActivity(user_id=child1_user.id, activity_id=piggy_bank.id)
                 session.add(user_activity)
                 await session.commit()
+
+            # The demo transactions above bypass the ledger, so rebuild its rollup
+            await rebuild_daily_ledger_summary(session)
+            await session.commit()
             
             print("Data seeding completed successfully!")
             
@@ -732,5 +748,371 @@ async def seed_data():
             await session.close()
 
         
+# Rows per executemany call when generating
+GENERATE_BATCH_SIZE = 20000
+
+# Every generated account logs in with this password
+GENERATED_PASSWORD = "demo123"
+
+# (type, category, reference_type, weight) of the ledger events a child produces
+LEDGER_EVENTS = [
+    ("earn", "task", "task", 35),
+    ("earn", "activity", "activity", 15),
+    ("earn", "allowance", None, 10),
+    ("spend", "shop", "shop", 20),
+    ("save", "goal", "goal", 15),
+    ("spend", "redemption", "redemption", 5),
+]
+
+GOAL_TITLES = ["New Bike", "Video Game", "Lego Set", "Concert Tickets", "Art Supplies", "Headphones", "Skateboard"]
+CHORES = ["Wash dishes", "Clean room", "Walk the dog", "Take out trash", "Water plants", "Fold laundry", "Homework"]
+MODULE_TOPICS = ["Saving Basics", "Needs vs Wants", "Budgeting 101", "Compound Interest", "Smart Shopping", "Earning Money"]
+
+
+class DatasetGenerator:
+    """Builds a synthetic dataset row by row from one seeded RNG.
+
+    Rows are plain dicts buffered per table and flushed with a Core
+    ``executemany`` every ``GENERATE_BATCH_SIZE`` rows, so nothing goes
+    through the ORM unit of work and every account shares one password hash.
+    """
+
+    def __init__(self, conn, seed: int, months: int, transactions_per_month: float, end: date):
+        self.conn = conn
+        self.rng = random.Random(seed)
+        self.transactions_per_month = transactions_per_month
+        self.end = datetime.combine(end, datetime.min.time())
+        self.start = self.end - timedelta(days=30 * months)
+        self.hashed_password = PasswordHelper().hash(GENERATED_PASSWORD)
+        self.buffers = {}
+        self.counts = {}
+
+    def new_id(self) -> str:
+        # uuid4-shaped, but from the seeded RNG (uuid.UUID() is slow at this volume)
+        h = f"{self.rng.getrandbits(128):032x}"
+        return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{h[16:20]}-{h[20:]}"
+
+    def random_time(self, start: datetime = None, end: datetime = None) -> datetime:
+        start = start or self.start
+        end = end or self.end
+        return start + timedelta(seconds=int(self.rng.random() * (end - start).total_seconds()))
+
+    def add(self, model, row: dict):
+        self.buffers.setdefault(model.__table__, []).append(row)
+
+    async def flush(self, batch_size: int = 1):
+        """Write out every table with at least ``batch_size`` buffered rows."""
+        for table, rows in self.buffers.items():
+            if rows and len(rows) >= batch_size:
+                if self.conn.dialect.name == "sqlite":
+                    await self.executemany_sqlite(table, rows)
+                else:
+                    await self.conn.execute(table.insert(), rows)
+                self.counts[table.name] = self.counts.get(table.name, 0) + len(rows)
+                self.buffers[table] = []
+
+    async def executemany_sqlite(self, table, rows: list):
+        """Same INSERT as ``table.insert()``, minus SQLAlchemy's per-row bind processing.
+
+        That processing is most of the load time at a million rows; SQLite only
+        needs datetimes in the text format SQLAlchemy would have written.
+        """
+        compiled = table.insert().compile(dialect=self.conn.dialect, column_keys=list(rows[0]))
+        keys = compiled.positiontup
+        datetime_positions = [
+            position for position, key in enumerate(keys) if isinstance(table.c[key].type, DateTime)
+        ]
+        values = []
+        for row in rows:
+            value = [row[key] for key in keys]
+            for position in datetime_positions:
+                if value[position] is not None:
+                    value[position] = value[position].isoformat(" ", "microseconds")
+            values.append(tuple(value))
+        await self.conn.exec_driver_sql(str(compiled), values)
+
+    def add_user(self, email: str, name: str, role: str, avatar: str, created_at: datetime) -> str:
+        user_id = self.new_id()
+        self.add(User, {
+            "id": user_id, "email": email, "hashed_password": self.hashed_password,
+            "is_active": True, "is_superuser": False, "is_verified": True,
+            "name": name, "role": role, "avatar_url": avatar,
+            "created_at": created_at, "updated_at": created_at,
+        })
+        return user_id
+
+    def add_family(self, family: int, children_per_family: float) -> list:
+        rng = self.rng
+        joined = self.random_time(self.start, self.start + (self.end - self.start) / 4)
+        parent_id = self.add_user(
+            f"parent{family}@generated.coincraft.app", f"Parent {family}", "parent", "👩‍💼", joined
+        )
+        self.add(ParentProfile, {
+            "id": self.new_id(), "user_id": parent_id, "exchange_rate": rng.choice([0.05, 0.10, 0.10, 0.25]),
+            "auto_approval_limit": rng.choice([50, 100, 500]), "require_approval": rng.random() < 0.8,
+        })
+
+        # Mostly one to three children, centred on children_per_family
+        child_count = max(1, min(6, round(rng.gauss(children_per_family, 0.8))))
+        child_ids = []
+        for index in range(child_count):
+            age = rng.randint(6, 17)
+            child_id = self.add_user(
+                f"child{family}-{index}@generated.coincraft.app", f"Child {family}-{index}",
+                "younger_child" if age < 11 else "older_child", "👶" if age < 11 else "🧒", joined,
+            )
+            coins = self.add_ledger(child_id, parent_id, age, joined)
+            self.add(ChildProfile, {
+                "id": self.new_id(), "user_id": child_id, "age": age, "coins": coins,
+                "level": 1 + coins // 250, "streak_days": rng.choice([0, 0, 1, 2, 3, 5, 7, 14]),
+                "last_activity_date": self.random_time(self.end - timedelta(days=7)), "parent_id": parent_id,
+            })
+            child_ids.append(child_id)
+        return child_ids
+
+    def add_ledger(self, child_id: str, parent_id: str, age: int, joined: datetime) -> int:
+        """Generate a child's goals, tasks and transaction history; return the final balance."""
+        rng = self.rng
+        goals = []
+        for _ in range(rng.choice([0, 1, 1, 2, 3])):
+            goals.append({
+                "id": self.new_id(), "user_id": child_id, "title": rng.choice(GOAL_TITLES),
+                "target_amount": rng.choice([50, 100, 200, 500, 1000]), "current_amount": 0,
+                "icon": "🎯", "color": "blue", "is_completed": False,
+                "deadline": self.end + timedelta(days=rng.randint(7, 180)),
+                "created_at": joined, "updated_at": joined,
+            })
+
+        # Activity is skewed: a few children account for much of the volume
+        months = (self.end - joined).days / 30
+        expected = self.transactions_per_month * months * rng.lognormvariate(0, 0.6) / 1.2
+        events = sorted(self.random_time(joined) for _ in range(max(0, round(rng.gauss(expected, expected ** 0.5)))))
+        weights = [event[3] for event in LEDGER_EVENTS]
+
+        balance = 0
+        for created_at in events:
+            tx_type, category, reference_type, _ = rng.choices(LEDGER_EVENTS, weights)[0]
+            amount = max(1, round(rng.lognormvariate(2.5, 0.6)))
+            open_goals = [goal for goal in goals if not goal["is_completed"]]
+            # Children can't spend or save what they don't have; earn instead
+            if tx_type != "earn" and (amount > balance or (category == "goal" and not open_goals)):
+                tx_type, category, reference_type = "earn", "allowance", None
+            reference_id = None
+
+            if category == "task":
+                reference_id = self.new_id()
+                self.add(Task, {
+                    "id": reference_id, "title": rng.choice(CHORES), "assigned_by": parent_id,
+                    "assigned_to": child_id, "coins_reward": amount, "status": "approved",
+                    "requires_approval": True, "due_date": created_at,
+                    "completed_at": created_at - timedelta(hours=rng.randint(1, 48)),
+                    "approved_at": created_at, "created_at": created_at - timedelta(days=rng.randint(1, 7)),
+                })
+            elif category == "goal":
+                goal = rng.choice(open_goals)
+                amount = min(amount, goal["target_amount"] - goal["current_amount"])
+                goal["current_amount"] += amount
+                goal["is_completed"] = goal["current_amount"] >= goal["target_amount"]
+                reference_id = goal["id"]
+            elif category == "redemption":
+                reference_id = self.new_id()
+                self.add(RedemptionRequest, {
+                    "id": reference_id, "user_id": child_id, "coins_amount": amount,
+                    "cash_amount": round(amount * 0.10, 2), "description": "Cash out",
+                    "status": "approved", "approved_by": parent_id,
+                    "approved_at": created_at, "created_at": created_at - timedelta(hours=rng.randint(1, 72)),
+                })
+
+            balance += amount if tx_type == "earn" else -amount
+            self.add(Transaction, {
+                "id": self.new_id(), "user_id": child_id, "type": tx_type, "amount": amount,
+                "description": f"{category.title()} {tx_type}", "category": category, "source": None,
+                "reference_id": reference_id, "reference_type": reference_type, "created_at": created_at,
+            })
+
+        for goal in goals:
+            self.add(Goal, goal)
+
+        # Recent work still waiting on the parent
+        for _ in range(rng.choice([0, 0, 1, 2, 3])):
+            created_at = self.random_time(self.end - timedelta(days=5))
+            self.add(Task, {
+                "id": self.new_id(), "title": rng.choice(CHORES), "assigned_by": parent_id,
+                "assigned_to": child_id, "coins_reward": rng.choice([5, 10, 15, 20, 25]),
+                "status": rng.choice(["pending", "in_progress", "completed"]), "requires_approval": True,
+                "due_date": created_at + timedelta(days=3), "completed_at": None, "approved_at": None,
+                "created_at": created_at,
+            })
+        if age >= 11 and balance >= 20 and rng.random() < 0.2:
+            self.add(RedemptionRequest, {
+                "id": self.new_id(), "user_id": child_id, "coins_amount": 20, "cash_amount": 2.0,
+                "description": "Cash out", "status": "pending", "approved_by": None, "approved_at": None,
+                "created_at": self.random_time(self.end - timedelta(days=3)),
+            })
+        return balance
+
+    def add_school(self, teachers: int, classes_per_teacher: int, modules: int, students: list):
+        """Teachers with classes drawn from ``students``, and module progress for each class."""
+        rng = self.rng
+        students = list(students)
+        rng.shuffle(students)
+        class_count = teachers * classes_per_teacher
+        # Most children are in exactly one class; the rest aren't enrolled anywhere
+        enrolled = students[: int(len(students) * 0.8)]
+        rosters = [enrolled[index::class_count] for index in range(class_count)] if class_count else []
+
+        for teacher in range(teachers):
+            joined = self.random_time(self.start, self.start + timedelta(days=14))
+            teacher_id = self.add_user(
+                f"teacher{teacher}@generated.coincraft.app", f"Teacher {teacher}", "teacher", "👩‍🏫", joined
+            )
+            profile_id = self.new_id()
+            self.add(TeacherProfile, {
+                "id": profile_id, "user_id": teacher_id, "school_name": f"School {teacher % 10}",
+                "grade_level": rng.choice(["3", "4", "5", "6", "7", "8"]), "subject": "Financial Literacy",
+            })
+
+            module_ids = []
+            for index in range(modules):
+                module_id = self.new_id()
+                self.add(Module, {
+                    "id": module_id, "title": f"{MODULE_TOPICS[index % len(MODULE_TOPICS)]} {teacher}-{index}",
+                    "description": "Generated module", "category": "General",
+                    "difficulty": rng.choice(["easy", "medium", "hard"]), "estimated_duration": rng.choice([15, 30, 45]),
+                    "points_reward": rng.choice([10, 20, 50]), "created_by": teacher_id, "is_published": True,
+                    "created_at": joined, "updated_at": joined,
+                })
+                module_ids.append(module_id)
+
+            for index in range(classes_per_teacher):
+                class_id = self.new_id()
+                roster = rosters[teacher * classes_per_teacher + index]
+                self.add(Class, {
+                    "id": class_id, "name": f"Class {teacher}-{index}", "teacher_id": profile_id,
+                    "description": "Generated class", "class_code": "", "is_active": True, "created_at": joined,
+                })
+                for student_id in roster:
+                    self.add(ClassStudent, {
+                        "id": self.new_id(), "class_id": class_id, "student_id": student_id, "enrolled_at": joined,
+                    })
+
+                for module_id in module_ids:
+                    assigned_at = self.random_time(joined)
+                    self.add(ModuleClassAssignment, {
+                        "id": self.new_id(), "module_id": module_id, "class_id": class_id,
+                        "assigned_by": teacher_id, "assigned_at": assigned_at,
+                        "due_date": assigned_at + timedelta(days=14), "is_active": True,
+                    })
+                    for student_id in roster:
+                        self.add(UserModuleProgress, self.module_progress(student_id, module_id, teacher_id, assigned_at))
+
+    def module_progress(self, student_id: str, module_id: str, teacher_id: str, assigned_at: datetime) -> dict:
+        rng = self.rng
+        row = {
+            "id": self.new_id(), "user_id": student_id, "module_id": module_id, "progress_percentage": 0.0,
+            "is_completed": False, "score": None, "time_spent": 0, "started_at": assigned_at,
+            "completed_at": None, "assigned_by": teacher_id, "assigned_at": assigned_at,
+            "due_date": assigned_at + timedelta(days=14), "status": "assigned",
+        }
+        roll = rng.random()
+        if roll < 0.6:
+            completed_at = min(self.end, assigned_at + timedelta(hours=rng.randint(1, 24 * 14)))
+            # Scores cluster in the 70s-90s with a tail of students who struggle
+            score = round(min(100.0, max(20.0, rng.gauss(80, 14))), 1)
+            row.update(progress_percentage=100.0, is_completed=True, score=score, time_spent=rng.randint(10, 45),
+                       completed_at=completed_at, status="completed")
+        elif roll < 0.8:
+            row.update(progress_percentage=float(rng.randint(10, 90)), time_spent=rng.randint(1, 20),
+                       status="in_progress")
+        return row
+
+
+async def generate_dataset(
+    families: int = 100,
+    children_per_family: float = 2.0,
+    teachers: int = 5,
+    classes_per_teacher: int = 2,
+    modules: int = 4,
+    months: int = 6,
+    transactions_per_month: float = 20.0,
+    seed: int = 42,
+    end: date = None,
+    bind: AsyncEngine = engine,
+) -> dict:
+    """Bulk-load a synthetic dataset; the same arguments always produce the same rows.
+
+    History runs for ``months`` up to midnight on ``end`` (default today), so
+    pass ``end`` as well to reproduce a dataset on another day.
+
+    ``transactions_per_month`` is the mean per child; activity is skewed so a
+    few children are far busier than the rest. Generated accounts use
+    ``GENERATED_PASSWORD`` and ``@generated.coincraft.app`` emails, so run this
+    against an empty database. The teacher and ledger summary rollups are rebuilt afterwards.
+    Returns the number of rows written per table.
+    """
+    await create_db_and_tables(bind)
+    async with bind.begin() as conn:
+        if conn.dialect.name == "sqlite":
+            # A throwaway bulk load; the single commit at the end is what counts
+            await conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            # Random uuid keys touch pages all over the indexes; keep them cached
+            await conn.exec_driver_sql("PRAGMA cache_size=-262144")
+        # Building the secondary indexes once at the end beats maintaining them row by row
+        indexes = [index for table in Base.metadata.sorted_tables for index in table.indexes]
+        for index in indexes:
+            await conn.run_sync(index.drop)
+
+        generator = DatasetGenerator(conn, seed, months, transactions_per_month, end or date.today())
+        students = []
+        for family in range(families):
+            students.extend(generator.add_family(family, children_per_family))
+            await generator.flush(GENERATE_BATCH_SIZE)
+        generator.add_school(teachers, classes_per_teacher, modules, students)
+        await generator.flush()
+
+        for index in indexes:
+            await conn.run_sync(index.create)
+
+    async with AsyncSession(bind, expire_on_commit=False) as session:
+        await rebuild_student_performance_stats(session)
+        await refresh_class_daily_stats(session, generator.start.date())
+        await rebuild_daily_ledger_summary(session)
+        await session.commit()
+    return generator.counts
+
+
+async def main(args):
+    if not args.generate:
+        await seed_data()
+        return
+
+    started = time.perf_counter()
+    counts = await generate_dataset(
+        families=args.families,
+        children_per_family=args.children_per_family,
+        teachers=args.teachers,
+        classes_per_teacher=args.classes_per_teacher,
+        modules=args.modules,
+        months=args.months,
+        transactions_per_month=args.transactions_per_month,
+        seed=args.seed,
+        end=args.end_date,
+    )
+    for table, count in sorted(counts.items()):
+        print(f"  {table:<28} {count:>10,}")
+    print(f"✅ Generated dataset in {time.perf_counter() - started:.1f}s (password: {GENERATED_PASSWORD})")
+
+
 if __name__ == "__main__":
-    asyncio.run(seed_data())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Seed demo data, or generate a synthetic dataset.")
+    parser.add_argument("--generate", action="store_true", help="Bulk-load a synthetic dataset instead of the demo accounts")
+    parser.add_argument("--families", type=int, default=100)
+    parser.add_argument("--children-per-family", type=float, default=2.0, help="Mean children per family")
+    parser.add_argument("--teachers", type=int, default=5)
+    parser.add_argument("--classes-per-teacher", type=int, default=2)
+    parser.add_argument("--modules", type=int, default=4, help="Modules per teacher, assigned to each of their classes")
+    parser.add_argument("--months", type=int, default=6, help="Months of transaction history")
+    parser.add_argument("--transactions-per-month", type=float, default=20.0, help="Mean transactions per child per month")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, help="Last day of history, YYYY-MM-DD (default today)")
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file
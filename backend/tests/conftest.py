@@ -1,5 +1,6 @@
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from typing import AsyncGenerator
@@ -14,6 +15,7 @@ from backend.database import Base, get_async_session
 from backend.auth import auth_backend, get_user_manager
 from backend.models import User, ChildProfile, ParentProfile, TeacherProfile
 from backend.schemas import UserCreate, UserRead
+from backend.query_stats import instrument_engine, query_count
 
 # Use an in-memory SQLite database for testing
 # This ensures tests are isolated and don't affect your development database
@@ -25,6 +27,8 @@ engine = create_async_engine(
     echo=False,  # Set to True to see SQL queries in tests
     connect_args={"check_same_thread": False} # Required for SQLite
 )
+# Count statements per request so responses carry the Server-Timing query count
+instrument_engine(engine)
 
 # Create a sessionmaker for the test database
 TestingSessionLocal = sessionmaker(
@@ -54,6 +58,38 @@ async def session_fixture() -> AsyncGenerator[AsyncSession, None]:
         # Close the session after the test
         await db_session.close()
 
+@pytest.fixture(name="query_log")
+def query_log_fixture(session: AsyncSession):
+    """
+    Records every SQL statement executed against the test database.
+    Clear it right before the request under test to measure a query budget.
+    """
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+@pytest.fixture(name="query_budget")
+def query_budget_fixture():
+    """
+    Asserts that a response stayed within a statement budget.
+    Reads the count the app reports in the Server-Timing header.
+    """
+    def _check(response, max_statements: int) -> int:
+        count = query_count(response.headers)
+        assert count <= max_statements, (
+            f"{response.request.method} {response.request.url.path} ran {count} SQL statements "
+            f"(budget {max_statements})"
+        )
+        return count
+    return _check
+
 @pytest.fixture(name="client")
 async def client_fixture(session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """
@@ -0,0 +1,84 @@
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.allowances import pay_due_allowances
+from backend.models import User, ChildProfile, Goal, Transaction, AllowanceSchedule
+from backend.reconcile import reconcile
+from backend.rollups import ledger_totals, stale_ledger_summary_users
+
+SUNDAY = date(2026, 10, 18)
+
+
+async def add_child(session: AsyncSession, parent_id: str, child_id: str, coins: int = 0):
+    session.add(User(id=child_id, email=f"{child_id}@example.com", hashed_password="x", name=child_id, role="younger_child"))
+    session.add(ChildProfile(user_id=child_id, age=9, coins=coins, parent_id=parent_id))
+    await session.flush()
+
+
+async def coins_of(session: AsyncSession, child_id: str) -> int:
+    result = await session.execute(
+        select(ChildProfile.coins).where(ChildProfile.user_id == child_id).execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_due_allowances_are_paid_once_in_bulk(session: AsyncSession):
+    await add_child(session, None, "allowance-saver", coins=5)
+    await add_child(session, None, "allowance-spender")
+    await add_child(session, None, "allowance-monday")
+    session.add(Goal(id="allowance-goal", user_id="allowance-saver", title="Bike", target_amount=10, current_amount=0))
+    starts_on = SUNDAY - timedelta(days=7)
+    session.add_all([
+        AllowanceSchedule(child_id="allowance-saver", parent_id="p", amount=20, weekday=6, goal_id="allowance-goal", goal_percent=25, starts_on=starts_on),
+        AllowanceSchedule(child_id="allowance-spender", parent_id="p", amount=10, weekday=6, starts_on=starts_on),
+        AllowanceSchedule(child_id="allowance-monday", parent_id="p", amount=10, weekday=0, last_paid_on=SUNDAY - timedelta(days=6), starts_on=starts_on),
+    ])
+    await session.commit()
+
+    assert await pay_due_allowances(session, SUNDAY) == 2
+    assert await coins_of(session, "allowance-saver") == 5 + 15
+    assert await coins_of(session, "allowance-spender") == 10
+    assert await coins_of(session, "allowance-monday") == 0
+    goal = (await session.execute(
+        select(Goal).where(Goal.id == "allowance-goal").execution_options(populate_existing=True)
+    )).scalar_one()
+    assert (goal.current_amount, goal.is_completed) == (5, False)
+    assert await ledger_totals(session, "allowance-saver") == {"earn": 20, "spend": 0, "save": 5}
+
+    # Rerunning the same day, or later in the week, pays nothing twice
+    assert await pay_due_allowances(session, SUNDAY) == 0
+    assert await pay_due_allowances(session, SUNDAY + timedelta(days=3)) == 1  # Monday's, caught up
+    assert await coins_of(session, "allowance-spender") == 10
+
+    assert await pay_due_allowances(session, SUNDAY + timedelta(days=7)) == 2
+    transactions = (await session.execute(select(func.count()).select_from(Transaction))).scalar_one()
+    assert transactions == 7  # 2 + 1 + 2 earnings, 2 goal savings
+    assert await stale_ledger_summary_users(session) == []
+    assert (await reconcile(session)).mismatched == 1  # only the saver's starting 5 coins
+
+
+@pytest.mark.asyncio
+async def test_parent_sets_and_removes_allowance(auth_client: dict, session: AsyncSession):
+    client = auth_client["client"]
+    await add_child(session, auth_client["user_id"], "allowance-kid")
+    session.add(Goal(id="kid-goal", user_id="allowance-kid", title="Game", target_amount=50))
+    await add_child(session, "someone-else", "other-kid")
+    await session.commit()
+    url = "/api/parent/children/allowance-kid/allowance"
+
+    assert (await client.get(url)).status_code == 404
+    response = await client.put(url, json={"amount": 15, "weekday": 5, "goal_id": "kid-goal", "goal_percent": 20})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["amount"], data["weekday"], data["goal_percent"], data["last_paid_on"]) == (15, 5, 20, None)
+
+    response = await client.put(url, json={"amount": 25})
+    assert response.json()["id"] == data["id"]
+    assert (await client.get(url)).json()["amount"] == 25
+
+    assert (await client.put(url, json={"amount": 5, "goal_id": "missing"})).status_code == 400
+    assert (await client.put("/api/parent/children/other-kid/allowance", json={"amount": 5})).status_code == 404
+    assert (await client.delete(url)).status_code == 200
+    assert (await client.get(url)).status_code == 404
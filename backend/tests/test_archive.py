@@ -0,0 +1,66 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.archive import MIN_HORIZON_DAYS, archive_cutoff, archive_transactions, compact_ledger_summary
+from backend.ledger import record
+from backend.models import DailyLedgerSummary, MonthlyLedgerSummary, Transaction, TransactionArchive
+from backend.rollups import ledger_totals, stale_ledger_summary_users
+
+
+async def count(session: AsyncSession, model) -> int:
+    return (await session.execute(select(func.count()).select_from(model))).scalar_one()
+
+
+def test_archive_cutoff_is_a_month_start():
+    assert archive_cutoff(730, today=date(2026, 10, 17)) == date(2024, 10, 1)
+    with pytest.raises(ValueError):
+        archive_cutoff(MIN_HORIZON_DAYS - 1)
+
+
+@pytest.mark.asyncio
+async def test_archiving_keeps_totals_and_history(auth_child_client: dict, session: AsyncSession):
+    client = auth_child_client["client"]
+    child_id = auth_child_client["user_id"]
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    ages = [800, 790, 760, 30, 1]  # days; the first three fall before a 730-day horizon
+    for i, days in enumerate(ages):
+        await record(session, Transaction(
+            user_id=child_id, type=("earn", "spend")[i % 2], amount=10 + i, description=f"Txn {i}",
+            category="chores", created_at=now - timedelta(days=days),
+        ))
+    await session.commit()
+    before = (await client.get(f"/api/users/{child_id}/transactions", params={"limit": 100})).json()["transactions"]
+    totals = await ledger_totals(session, child_id)
+
+    cutoff = archive_cutoff(730)
+    assert await archive_transactions(session, cutoff, batch_size=2) == 3
+    assert await compact_ledger_summary(session, cutoff) == 3
+    await session.commit()
+
+    assert await count(session, Transaction) == 2
+    assert await count(session, TransactionArchive) == 3
+    assert await count(session, DailyLedgerSummary) == 2
+    assert await count(session, MonthlyLedgerSummary) >= 2
+    assert await ledger_totals(session, child_id) == totals
+    assert await stale_ledger_summary_users(session) == []
+    # Nothing left to do on a rerun
+    assert await archive_transactions(session, cutoff) == 0
+
+    # Cursor pages run from the hot table straight into the archive
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "include_total": True}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await client.get(f"/api/users/{child_id}/transactions", params=params)).json()
+        assert page["total_count"] == 5
+        seen += page["transactions"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert seen == before
+
+    # Offsets past the hot rows skip into the archive
+    page = (await client.get(f"/api/users/{child_id}/transactions", params={"limit": 2, "offset": 3})).json()
+    assert page["transactions"] == before[3:]
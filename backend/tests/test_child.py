@@ -3,6 +3,7 @@ from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from backend.models import User, ChildProfile, Goal, Transaction, Module, UserModuleProgress, Achievement, UserAchievement
+from backend.ledger import record
 from datetime import datetime, timedelta
 
 @pytest.mark.asyncio
@@ -277,6 +278,21 @@ async def test_update_goal_progress_insufficient_coins(auth_child_client: dict,
     assert response.status_code == 400
     assert response.json()["detail"] == "Not enough coins"
 
+@pytest.mark.asyncio
+async def test_update_goal_progress_rejects_non_positive_amounts(auth_child_client: dict, session: AsyncSession):
+    """
+    Test that a zero or negative amount can't be used to add coins to the balance.
+    """
+    client = auth_child_client["client"]
+    child_id = auth_child_client["user_id"]
+    goal = Goal(user_id=child_id, title="Bike", target_amount=100, current_amount=0)
+    session.add(goal)
+    await session.commit()
+
+    for progress_data in ({"amount": -50}, {"amount": 0}, {}):
+        response = await client.put(f"/api/child/goals/{goal.id}/progress", json=progress_data)
+        assert response.status_code == 422
+
 @pytest.mark.asyncio
 async def test_update_goal_progress_goal_not_found(auth_child_client: dict):
     """
@@ -488,7 +504,8 @@ async def test_get_child_stats_success(auth_child_client: dict, session: AsyncSe
 
     transaction_earn = Transaction(user_id=child_id, type="earn", amount=50, description="Bonus", category="bonus")
     transaction_spend = Transaction(user_id=child_id, type="spend", amount=20, description="Snacks", category="food")
-    session.add_all([transaction_earn, transaction_spend])
+    await record(session, transaction_earn)
+    await record(session, transaction_spend)
     await session.commit()
 
     response = await client.get("/api/child/stats")
@@ -191,12 +191,13 @@ async def test_get_todays_goals_child_success(auth_child_client: dict, session:
     # Add some activity and transactions for today
     today = datetime.now(timezone.utc).date()
     module = Module(title="Daily Lesson", description="Quick read", category="lesson", difficulty="easy", points_reward=5, is_published=True, created_by="system")
-    session.add(module)
+    game_module = Module(title="Daily Game", description="Quick game", category="lesson", difficulty="easy", points_reward=5, is_published=True, created_by="system")
+    session.add_all([module, game_module])
     await session.commit()
 
-    # Simulate progress for "Read Lessons" and "Complete Games"
+    # Simulate progress for "Read Lessons" and "Complete Games" (one progress row per module)
     progress1 = UserModuleProgress(user_id=child_id, module_id=module.id, progress_percentage=50, started_at=datetime.now(timezone.utc))
-    progress2 = UserModuleProgress(user_id=child_id, module_id=module.id, is_completed=True, completed_at=datetime.now(timezone.utc))
+    progress2 = UserModuleProgress(user_id=child_id, module_id=game_module.id, is_completed=True, completed_at=datetime.now(timezone.utc))
     session.add_all([progress1, progress2])
 
     # Simulate "Earn Coins"
@@ -0,0 +1,73 @@
+import csv
+import io
+import json
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend import exports
+from backend.models import User, ChildProfile, Transaction, TransactionArchive
+
+
+async def seed_history(session: AsyncSession, child_id: str, parent_id=None, transactions: int = 5):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if parent_id:
+        session.add(User(id=child_id, email=f"{child_id}@example.com", hashed_password="x", name=child_id, role="younger_child"))
+        session.add(ChildProfile(user_id=child_id, age=9, parent_id=parent_id))
+    session.add(TransactionArchive(
+        id=f"{child_id}-archived", user_id=child_id, type="earn", amount=1, description="Old, \"quoted\"",
+        created_at=now - timedelta(days=900), month=date(2024, 1, 1),
+    ))
+    for i in range(transactions):
+        session.add(Transaction(
+            id=f"{child_id}-{i}", user_id=child_id, type=("earn", "spend")[i % 2], amount=10 + i,
+            description=f"Txn {i}", category="chores", created_at=now - timedelta(days=transactions - i),
+        ))
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_export_streams_full_history_as_csv(auth_child_client: dict, session: AsyncSession, monkeypatch):
+    monkeypatch.setattr(exports, "EXPORT_BATCH_SIZE", 2)
+    client = auth_child_client["client"]
+    child_id = auth_child_client["user_id"]
+    await seed_history(session, child_id)
+
+    response = await client.get(f"/api/users/{child_id}/transactions/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "attachment" in response.headers["content-disposition"]
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == [f"{child_id}-archived"] + [f"{child_id}-{i}" for i in range(5)]
+    assert rows[0]["description"] == 'Old, "quoted"'
+    assert rows[1]["amount"] == "10"
+
+    response = await client.get(f"/api/users/me/transactions/export", params={"type": "spend"})
+    assert [row["id"] for row in csv.DictReader(io.StringIO(response.text))] == [f"{child_id}-1", f"{child_id}-3"]
+
+    other = await client.get("/api/users/someone-else/transactions/export")
+    assert other.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_family_export_covers_all_children_as_ndjson(auth_client: dict, session: AsyncSession):
+    client = auth_client["client"]
+    parent_id = auth_client["user_id"]
+    await seed_history(session, "export-kid1", parent_id, transactions=2)
+    await seed_history(session, "export-kid2", parent_id, transactions=3)
+    await seed_history(session, "export-stranger", "another-parent", transactions=1)
+
+    response = await client.get("/api/parent/transactions/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted({r["user_id"] for r in records}) == ["export-kid1", "export-kid2"]
+    assert len(records) == 2 + 3 + 2  # including each child's archived row
+
+    since = (datetime.now(timezone.utc) - timedelta(days=2, hours=1)).replace(tzinfo=None).isoformat()
+    response = await client.get("/api/parent/transactions/export", params={
+        "format": "ndjson", "child_id": "export-kid2", "start_date": since,
+    })
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == ["export-kid2-1", "export-kid2-2"]
+
+    response = await client.get("/api/parent/transactions/export", params={"child_id": "export-stranger"})
+    assert response.status_code == 404
@@ -0,0 +1,135 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from backend.database import Base, get_async_session
+from backend.idempotency import IDEMPOTENCY_TTL, IN_PROGRESS_LEASE, REPLAY_HEADER, purge_expired_keys
+from backend.main import app
+from backend.models import ChildProfile, IdempotencyKey, Transaction
+
+EARN = {"type": "earn", "amount": 15, "description": "Allowance", "category": "bonus"}
+
+
+async def transaction_count(session: AsyncSession, user_id: str) -> int:
+    return (await session.execute(
+        select(func.count()).select_from(Transaction).where(Transaction.user_id == user_id)
+    )).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_retried_post_replays_the_stored_response(auth_child_client: dict, session: AsyncSession):
+    client = auth_child_client["client"]
+    child_id = auth_child_client["user_id"]
+    url = f"/api/users/{child_id}/transactions"
+
+    first = await client.post(url, json=EARN, headers={"Idempotency-Key": "retry-1"})
+    retry = await client.post(url, json=EARN, headers={"Idempotency-Key": "retry-1"})
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert REPLAY_HEADER not in first.headers
+    assert retry.headers[REPLAY_HEADER] == "true"
+    assert await transaction_count(session, child_id) == 1
+    coins = (await session.execute(
+        select(ChildProfile.coins).where(ChildProfile.user_id == child_id)
+    )).scalar_one()
+    assert coins == 15
+
+    # A new key is a new request
+    other = await client.post(url, json=EARN, headers={"Idempotency-Key": "retry-2"})
+    assert other.json()["new_coin_balance"] == 30
+    assert await transaction_count(session, child_id) == 2
+
+
+@pytest.mark.asyncio
+async def test_key_reused_for_a_different_request_is_rejected(auth_child_client: dict):
+    client = auth_child_client["client"]
+    url = f"/api/users/{auth_child_client['user_id']}/transactions"
+
+    await client.post(url, json=EARN, headers={"Idempotency-Key": "reused"})
+    response = await client.post(url, json={**EARN, "amount": 99}, headers={"Idempotency-Key": "reused"})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_replayed_and_expired_keys_purged(auth_child_client: dict, session: AsyncSession):
+    client = auth_child_client["client"]
+    url = f"/api/users/{auth_child_client['user_id']}/transactions"
+    spend = {**EARN, "type": "spend", "amount": 500}
+
+    first = await client.post(url, json=spend, headers={"Idempotency-Key": "broke"})
+    retry = await client.post(url, json=spend, headers={"Idempotency-Key": "broke"})
+    assert first.status_code == retry.status_code == 400
+    assert retry.json() == first.json()
+
+    record = (await session.execute(select(IdempotencyKey))).scalar_one()
+    record.expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    await session.commit()
+    assert await purge_expired_keys(session) == 1
+
+
+@pytest.mark.asyncio
+async def test_claim_left_by_a_dead_request_is_reclaimed(auth_child_client: dict, session: AsyncSession):
+    client = auth_child_client["client"]
+    child_id = auth_child_client["user_id"]
+    url = f"/api/users/{child_id}/transactions"
+    # A worker claimed the key and died before storing a response
+    claimed_at = datetime.now(timezone.utc) - IN_PROGRESS_LEASE - timedelta(seconds=1)
+    session.add(IdempotencyKey(
+        user_id=child_id, key="orphan", fingerprint="x", status="in_progress",
+        created_at=claimed_at, expires_at=claimed_at + IN_PROGRESS_LEASE,
+    ))
+    await session.commit()
+
+    response = await client.post(url, json=EARN, headers={"Idempotency-Key": "orphan"})
+    assert response.status_code == 200
+    assert REPLAY_HEADER not in response.headers
+    assert await transaction_count(session, child_id) == 1
+
+    record = (await session.execute(
+        select(IdempotencyKey).execution_options(populate_existing=True)
+    )).scalar_one()
+    assert record.status == "completed"
+    assert record.expires_at > datetime.now() + IDEMPOTENCY_TTL - timedelta(minutes=1)
+
+
+@pytest.fixture
+async def file_client(tmp_path):
+    """A client whose requests each get their own session on an on-disk database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'idempotency.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_async_session():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_session] = override_get_async_session
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        yield client, factory
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_execute_once(file_client):
+    client, factory = file_client
+    registered = await client.post("/api/auth/register", json={
+        "email": "retry@example.com", "password": "childpassword", "name": "Retry", "role": "younger_child", "age": 8,
+    })
+    data = registered.json()
+    child_id = data["user"]["id"]
+    headers = {"Authorization": f"Bearer {data['access_token']}", "Idempotency-Key": "burst"}
+
+    responses = await asyncio.gather(*[
+        client.post(f"/api/users/{child_id}/transactions", json=EARN, headers=headers) for _ in range(5)
+    ])
+
+    assert [r.status_code for r in responses] == [200] * 5
+    assert len({r.text for r in responses}) == 1
+    assert sum(REPLAY_HEADER in r.headers for r in responses) == 4
+    async with factory() as session:
+        assert await transaction_count(session, child_id) == 1
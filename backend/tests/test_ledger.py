@@ -0,0 +1,141 @@
+import asyncio
+import pytest
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from backend.database import Base
+from backend.ledger import InsufficientCoins, credit, debit, transition
+from backend.models import ChildProfile, Task, Transaction
+
+CHILD_ID = "ledger-child"
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    """Sessions on an on-disk database, so each one gets its own connection."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'ledger.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def add_child(factory, coins: int):
+    async with factory() as session:
+        session.add(ChildProfile(user_id=CHILD_ID, age=10, coins=coins))
+        await session.commit()
+
+
+async def balance_and_ledger(factory):
+    signed = case((Transaction.type == "earn", Transaction.amount), else_=-Transaction.amount)
+    async with factory() as session:
+        balance = (await session.execute(
+            select(ChildProfile.coins).where(ChildProfile.user_id == CHILD_ID)
+        )).scalar_one()
+        ledger = (await session.execute(
+            select(func.coalesce(func.sum(signed), 0)).where(Transaction.user_id == CHILD_ID)
+        )).scalar_one()
+    return balance, ledger
+
+
+def spend(amount: int) -> Transaction:
+    return Transaction(user_id=CHILD_ID, type="spend", amount=amount, description="Spend", category="test")
+
+
+def earn(amount: int) -> Transaction:
+    return Transaction(user_id=CHILD_ID, type="earn", amount=amount, description="Earn", category="test")
+
+
+@pytest.mark.asyncio
+async def test_debit_updates_loaded_profile_and_records_transaction(session_factory):
+    await add_child(session_factory, 10)
+    async with session_factory() as session:
+        profile = (await session.execute(
+            select(ChildProfile).where(ChildProfile.user_id == CHILD_ID)
+        )).scalar_one()
+        assert await debit(session, spend(4)) == 6
+        assert profile.coins == 6
+
+        with pytest.raises(InsufficientCoins):
+            await debit(session, spend(7))
+        assert profile.coins == 6
+        await session.commit()
+
+    assert await balance_and_ledger(session_factory) == (6, -4)
+
+
+@pytest.mark.asyncio
+async def test_non_positive_amounts_are_rejected(session_factory):
+    await add_child(session_factory, 10)
+    async with session_factory() as session:
+        for amount in (0, -5):
+            with pytest.raises(ValueError):
+                await debit(session, spend(amount))
+            with pytest.raises(ValueError):
+                await credit(session, earn(amount))
+        await session.commit()
+
+    assert await balance_and_ledger(session_factory) == (10, 0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_debits_never_overdraw(session_factory):
+    await add_child(session_factory, 100)
+
+    async def attempt():
+        async with session_factory() as session:
+            try:
+                await debit(session, spend(3))
+            except InsufficientCoins:
+                return False
+            await session.commit()
+            return True
+
+    results = await asyncio.gather(*[attempt() for _ in range(60)])
+
+    assert sum(results) == 33
+    balance, ledger = await balance_and_ledger(session_factory)
+    assert balance == 1
+    assert ledger == -99
+
+
+@pytest.mark.asyncio
+async def test_concurrent_credits_and_debits_lose_no_updates(session_factory):
+    await add_child(session_factory, 50)
+
+    async def apply(transaction):
+        async with session_factory() as session:
+            try:
+                await (credit if transaction.type == "earn" else debit)(session, transaction)
+            except InsufficientCoins:
+                return
+            await session.commit()
+
+    transactions = [earn(5) if i % 2 else spend(7) for i in range(80)]
+    await asyncio.gather(*[apply(t) for t in transactions])
+
+    balance, ledger = await balance_and_ledger(session_factory)
+    assert balance >= 0
+    # Every applied change is in the ledger and nothing was overwritten
+    assert balance == 50 + ledger
+    async with session_factory() as session:
+        earned = (await session.execute(
+            select(func.count()).where(Transaction.type == "earn")
+        )).scalar_one()
+    assert earned == 40
+
+
+@pytest.mark.asyncio
+async def test_only_one_concurrent_transition_wins(session_factory):
+    async with session_factory() as session:
+        session.add(Task(id="task-1", title="Dishes", assigned_to=CHILD_ID, status="completed", coins_reward=5))
+        await session.commit()
+
+    async def approve():
+        async with session_factory() as session:
+            task = await session.get(Task, "task-1")
+            won = await transition(session, task, "completed", status="approved")
+            await session.commit()
+            return won
+
+    results = await asyncio.gather(*[approve() for _ in range(10)])
+    assert results.count(True) == 1
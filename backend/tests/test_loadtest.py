@@ -0,0 +1,46 @@
+import random
+import pytest
+from httpx import AsyncClient
+from backend.loadtest import ROLES, Recorder, compare, percentile, run_load, seed_population, summarize
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([0.2], 99) == 0.2
+
+
+@pytest.mark.asyncio
+async def test_role_sessions_run_without_errors(client: AsyncClient):
+    population = await seed_population(
+        client, "test", families=1, children_per_family=2, teachers=1, tasks_per_child=2, rng=random.Random(7)
+    )
+    # The test client shares one DB session, so drive the roles one at a time
+    recorder = Recorder()
+    for role in ROLES:
+        only_role = {name: actors if name == role else [] for name, actors in population.items()}
+        await run_load(client, only_role, users_per_role=1, iterations=2, seed=7, recorder=recorder)
+    report = summarize(recorder, elapsed=1.0, config={})
+
+    assert report["errors"] == 0, {name: n for name, n in recorder.errors.items() if n}
+    assert set(report["roles"]) == set(ROLES)
+    assert report["routes"]["PUT /api/parent/tasks/{task_id}/approve"]["count"] == 2
+    assert report["routes"]["GET /api/teacher/analytics/performance"]["count"] == 2
+    # Requests are grouped by route template, not by concrete id
+    assert not any(population["child"][0]["id"] in name for name in report["routes"])
+
+
+def test_compare_flags_routes_beyond_tolerance():
+    def report(p50):
+        return {
+            "throughput_rps": 100.0,
+            "routes": {
+                "GET /api/child/dashboard": {"p50_ms": p50, "p95_ms": p50 * 2},
+                "GET /api/users/me": {"p50_ms": 10.0, "p95_ms": 20.0},
+            },
+        }
+
+    assert compare(report(12.0), report(10.0), tolerance=0.25) == []
+    assert compare(report(15.0), report(10.0), tolerance=0.25) == ["GET /api/child/dashboard"]
@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+import time
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from prometheus_client.parser import text_string_to_metric_families
+from backend.metrics import REQUEST_ERRORS, PrometheusMiddleware
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Upper bound on what the middleware may add to one request (measured at ~40µs)
+MAX_OVERHEAD_SECONDS = 0.0005
+
+
+def sample_value(text: str, name: str, **labels) -> float:
+    for family in text_string_to_metric_families(text):
+        for sample in family.samples:
+            if sample.name == name and all(sample.labels.get(k) == v for k, v in labels.items()):
+                return sample.value
+    return 0.0
+
+
+async def plain(request):
+    return PlainTextResponse("ok")
+
+
+async def failing(request):
+    return PlainTextResponse("boom", status_code=503)
+
+
+def tiny_app(instrumented: bool):
+    app = Starlette(routes=[
+        Route("/items/{item_id}", plain),
+        Route("/failing", failing),
+    ])
+    return PrometheusMiddleware(app) if instrumented else app
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_latency_per_route_template(auth_client):
+    client = auth_client["client"]
+    for user_id in (auth_client["user_id"], "someone-else"):
+        await client.get(f"/api/users/{user_id}/goals")
+    await client.get("/api/parent/tasks")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+
+    text = response.text
+    assert sample_value(
+        text, "coincraft_http_request_duration_seconds_count", method="GET", route="/api/users/{user_id}/goals"
+    ) >= 2
+    assert sample_value(
+        text, "coincraft_http_request_duration_seconds_count", method="GET", route="/api/parent/tasks"
+    ) >= 1
+    # The scrape itself is in flight while it renders
+    assert sample_value(text, "coincraft_http_requests_in_progress") >= 1
+    assert "someone-else" not in text
+
+
+@pytest.mark.asyncio
+async def test_metrics_count_server_errors():
+    async with AsyncClient(transport=ASGITransport(app=tiny_app(True)), base_url="http://test") as client:
+        before = REQUEST_ERRORS.labels("GET", "/failing", "503")._value.get()
+        await client.get("/failing")
+        await client.get("/items/1")
+        assert REQUEST_ERRORS.labels("GET", "/failing", "503")._value.get() == before + 1
+
+
+def test_metrics_merge_across_worker_processes(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = (
+        "from metrics import REQUEST_LATENCY; "
+        "REQUEST_LATENCY.labels('GET', '/api/goals').observe(0.01)"
+    )
+    for _ in range(3):
+        subprocess.run([sys.executable, "-c", worker], cwd=BACKEND_DIR, env=env, check=True)
+
+    scrape = subprocess.run(
+        [sys.executable, "-c", "import sys; from metrics import render_metrics; sys.stdout.write(render_metrics().decode())"],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+    )
+    assert sample_value(
+        scrape.stdout, "coincraft_http_request_duration_seconds_count", method="GET", route="/api/goals"
+    ) == 3
+
+
+@pytest.mark.asyncio
+async def test_metrics_middleware_overhead_is_negligible():
+    async def per_request(app, rounds: int = 2000) -> float:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            for _ in range(100):
+                await client.get("/items/1")
+            started = time.perf_counter()
+            for i in range(rounds):
+                await client.get(f"/items/{i}")
+            return (time.perf_counter() - started) / rounds
+
+    bare = min([await per_request(tiny_app(False)) for _ in range(3)])
+    instrumented = min([await per_request(tiny_app(True)) for _ in range(3)])
+    print(f"metrics overhead: {(instrumented - bare) * 1e6:.1f}µs per request ({bare * 1e6:.0f}µs baseline)")
+    assert instrumented - bare < MAX_OVERHEAD_SECONDS
@@ -0,0 +1,95 @@
+import pytest
+import sqlalchemy as sa
+from alembic.autogenerate import compare_metadata
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy.ext.asyncio import create_async_engine
+from backend.database import Base, create_db_and_tables, verify_schema_revision
+from backend.migrations.helpers import rebuild_table_online
+
+
+@pytest.fixture
+async def file_engine(tmp_path):
+    """A throwaway on-disk database; migrations need a real file for rebuilds."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_migrations_build_the_model_schema(file_engine):
+    with pytest.raises(RuntimeError):
+        await verify_schema_revision(file_engine)
+
+    await create_db_and_tables(file_engine)
+    await verify_schema_revision(file_engine)
+
+    async with file_engine.connect() as conn:
+        diff = await conn.run_sync(
+            lambda sync_conn: compare_metadata(MigrationContext.configure(sync_conn), Base.metadata)
+        )
+    assert diff == []
+
+
+@pytest.mark.asyncio
+async def test_untracked_database_is_adopted(file_engine):
+    # A database created by create_all before migrations were tracked
+    async with file_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(sa.text(
+            "INSERT INTO users (id, email, hashed_password, is_active, is_superuser, is_verified, name, role) "
+            "VALUES ('u1', 'kept@example.com', 'x', 1, 0, 0, 'Kept', 'parent')"
+        ))
+
+    await create_db_and_tables(file_engine)
+    await verify_schema_revision(file_engine)
+
+    async with file_engine.connect() as conn:
+        emails = (await conn.execute(sa.text("SELECT email FROM users"))).scalars().all()
+    assert emails == ["kept@example.com"]
+
+
+def widgets_table(code_unique: bool) -> sa.Table:
+    return sa.Table(
+        "widgets",
+        sa.MetaData(),
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("code", sa.String(), unique=code_unique),
+        sa.Column("label", sa.String()),
+        sa.Index("ix_widgets_label", "label"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_rebuild_table_online_copies_in_chunks(file_engine):
+    async with file_engine.begin() as conn:
+        await conn.run_sync(widgets_table(code_unique=True).create)
+        await conn.execute(
+            sa.text("INSERT INTO widgets (id, code, label) VALUES (:id, :code, :label)"),
+            [{"id": f"w{i}", "code": f"c{i}", "label": f"label {i}"} for i in range(23)],
+        )
+
+    statements = []
+
+    def rebuild(sync_conn):
+        sa.event.listen(sync_conn, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        with Operations.context(MigrationContext.configure(sync_conn)):
+            return rebuild_table_online(widgets_table(code_unique=False), chunk_size=5)
+
+    async with file_engine.connect() as conn:
+        copied = await conn.run_sync(rebuild)
+    assert copied == 23
+    # The indexes are built before the swap; the locked part only drops and renames
+    swap = statements[statements.index("BEGIN IMMEDIATE") + 1:statements.index("COMMIT")]
+    assert [statement.split()[:2] for statement in swap] == [["DROP", "TRIGGER"]] * 3 + [["DROP", "TABLE"], ["ALTER", "TABLE"]]
+    assert any(statement.startswith("CREATE INDEX") for statement in statements)
+
+    async with file_engine.begin() as conn:
+        rows = (await conn.execute(sa.text("SELECT id, code, label FROM widgets ORDER BY rowid"))).all()
+        assert rows == [(f"w{i}", f"c{i}", f"label {i}") for i in range(23)]
+        # The unique constraint is gone and the index survived the swap
+        await conn.execute(sa.text("INSERT INTO widgets (id, code, label) VALUES ('dup', 'c0', 'x')"))
+        indexes = await conn.run_sync(lambda sync_conn: sa.inspect(sync_conn).get_indexes("widgets"))
+        assert [index["name"] for index in indexes] == ["ix_widgets_label"]
+        tables = await conn.run_sync(lambda sync_conn: sa.inspect(sync_conn).get_table_names())
+        assert "_widgets_rebuild" not in tables
@@ -0,0 +1,238 @@
+import time
+import tracemalloc
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models import (
+    User, ChildProfile, TeacherProfile, Class, ClassStudent, Module, UserModuleProgress,
+    Goal, Transaction, Task, RedemptionRequest, Achievement, UserAchievement,
+)
+from backend.rollups import rebuild_daily_ledger_summary, rebuild_student_performance_stats, refresh_class_daily_stats
+from backend.query_stats import query_count, route_query_stats
+
+# Statement budgets per endpoint (auth lookups included) for a family of four
+# children and two classes of four students. Raise a budget only deliberately.
+PARENT_BUDGETS = {
+    "/api/parent/dashboard": 5,
+    "/api/parent/children/budget-child0/progress": 3,
+    "/api/parent/tasks": 3,
+    "/api/parent/redemptions": 3,
+    "/api/parent/children/goals": 3,
+}
+TEACHER_BUDGETS = {
+    "/api/teacher/dashboard": 4,
+    "/api/teacher/classes": 4,
+    "/api/teacher/classes/budget-class0": 5,
+    "/api/teacher/classes/budget-class0/students": 4,
+    "/api/teacher/modules": 4,
+    "/api/teacher/analytics/performance": 5,
+    "/api/teacher/classes/budget-class0/assigned-modules": 4,
+}
+CHILD_BUDGETS = {
+    "/api/child/stats": 3,
+    "/api/teen/analytics?timeframe=year": 3,
+}
+LARGE_HISTORY = 50_000
+
+
+async def seed_family(session: AsyncSession, parent_id: str, children: int, first: int = 0):
+    now = datetime.now(timezone.utc)
+    for i in range(first, first + children):
+        child_id = f"budget-child{i}"
+        session.add(User(id=child_id, email=f"{child_id}@example.com", hashed_password="x", name=child_id, role="younger_child"))
+        session.add(ChildProfile(user_id=child_id, age=9, coins=50, parent_id=parent_id))
+        session.add(Goal(user_id=child_id, title="Bike", target_amount=100, current_amount=10))
+        session.add(Task(title="Dishes", assigned_by=parent_id, assigned_to=child_id, coins_reward=5, status="completed"))
+        session.add(RedemptionRequest(user_id=child_id, coins_amount=10, cash_amount=1.0))
+        for day in range(3):
+            session.add(Transaction(user_id=child_id, type="earn", amount=5, description="Chore", created_at=now - timedelta(days=day)))
+    await session.commit()
+
+
+async def seed_classes(session: AsyncSession, teacher_id: str, students: int, first: int = 0):
+    now = datetime.now(timezone.utc)
+    if first == 0:
+        profile = (await session.execute(select(TeacherProfile).where(TeacherProfile.user_id == teacher_id))).scalar_one()
+        session.add(Module(id="budget-module", title="Budget", description="Budget", created_by=teacher_id))
+        for c in range(2):
+            session.add(Class(id=f"budget-class{c}", name=f"budget-class{c}", teacher_id=profile.id))
+    for c in range(2):
+        class_id = f"budget-class{c}"
+        for i in range(first, first + students):
+            student_id = f"{class_id}-student{i}"
+            session.add(User(id=student_id, email=f"{student_id}@example.com", hashed_password="x", name=student_id, role="younger_child"))
+            session.add(ChildProfile(user_id=student_id, age=10))
+            session.add(ClassStudent(class_id=class_id, student_id=student_id))
+            session.add(UserModuleProgress(user_id=student_id, module_id="budget-module", is_completed=True, score=80, completed_at=now))
+    await session.flush()
+    await rebuild_student_performance_stats(session)
+    await refresh_class_daily_stats(session, (now - timedelta(days=1)).date())
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_parent_endpoints_within_query_budget(auth_client: dict, session: AsyncSession, query_budget):
+    client = auth_client["client"]
+    await seed_family(session, auth_client["user_id"], 4)
+    for path, budget in PARENT_BUDGETS.items():
+        response = await client.get(path)
+        assert response.status_code == 200, path
+        query_budget(response, budget)
+
+
+@pytest.mark.asyncio
+async def test_teacher_endpoints_within_query_budget(auth_teacher_client: dict, session: AsyncSession, query_budget):
+    client = auth_teacher_client["client"]
+    await seed_classes(session, auth_teacher_client["user_id"], 4)
+    for path, budget in TEACHER_BUDGETS.items():
+        response = await client.get(path)
+        assert response.status_code == 200, path
+        query_budget(response, budget)
+
+
+@pytest.mark.asyncio
+async def test_teacher_query_counts_independent_of_class_size(auth_teacher_client: dict, session: AsyncSession):
+    client = auth_teacher_client["client"]
+    await seed_classes(session, auth_teacher_client["user_id"], 1)
+    small = {path: query_count((await client.get(path)).headers) for path in TEACHER_BUDGETS}
+
+    await seed_classes(session, auth_teacher_client["user_id"], 5, first=1)
+    large = {path: query_count((await client.get(path)).headers) for path in TEACHER_BUDGETS}
+    assert large == small
+
+
+@pytest.mark.asyncio
+async def test_parent_dashboard_query_count_independent_of_family_size(auth_client: dict, session: AsyncSession):
+    client = auth_client["client"]
+    await seed_family(session, auth_client["user_id"], 1)
+    small = await client.get("/api/parent/dashboard")
+
+    await seed_family(session, auth_client["user_id"], 4, first=1)
+    large = await client.get("/api/parent/dashboard")
+    assert len(large.json()["children"]) == 5
+    assert large.json()["stats"]["goals_count"] == 5
+    assert query_count(large.headers) == query_count(small.headers)
+
+
+@pytest.mark.asyncio
+async def test_child_progress_sections_from_one_statement(auth_client: dict, session: AsyncSession):
+    client = auth_client["client"]
+    await seed_family(session, auth_client["user_id"], 1)
+    now = datetime.now(timezone.utc)
+    session.add(Achievement(id="budget-badge", title="Saver", description="Saved up", icon="piggy", rarity="rare"))
+    session.add(UserAchievement(user_id="budget-child0", achievement_id="budget-badge", earned_at=now))
+    for day in range(12):
+        session.add(Transaction(user_id="budget-child0", type="spend", amount=1, description="Old", created_at=now - timedelta(days=3 + day)))
+    await session.commit()
+    await rebuild_daily_ledger_summary(session)
+    await session.commit()
+
+    data = (await client.get("/api/parent/children/budget-child0/progress")).json()
+    assert data["stats"]["total_rewards"] == 15
+    activities = data["recent_activities"]
+    assert len(activities) == 10
+    assert [a["description"] for a in activities[:3]] == ["Chore"] * 3
+    assert [a["created_at"] for a in activities] == sorted((a["created_at"] for a in activities), reverse=True)
+    assert [(g["title"], g["target_amount"], g["current_amount"], g["progress_percentage"]) for g in data["active_goals"]] == [
+        ("Bike", 100, 10, 10.0)
+    ]
+    assert [(a["title"], a["icon"], a["rarity"]) for a in data["recent_achievements"]] == [("Saver", "piggy", "rare")]
+
+
+@pytest.mark.asyncio
+async def test_query_stats_aggregated_per_route(auth_client: dict, session: AsyncSession):
+    client = auth_client["client"]
+    await seed_family(session, auth_client["user_id"], 1)
+    before = route_query_stats().get("GET /api/parent/tasks", {}).get("requests", 0)
+
+    response = await client.get("/api/parent/tasks")
+    assert response.headers["server-timing"].startswith("db;dur=")
+
+    stats = route_query_stats()["GET /api/parent/tasks"]
+    assert stats["requests"] == before + 1
+    assert stats["max_statements"] >= query_count(response.headers)
+    assert stats["slowest_statement"].startswith("SELECT")
+
+    assert (await client.get("/api/status/queries")).status_code == 403
+    await session.execute(update(User).where(User.id == auth_client["user_id"]).values(is_superuser=True))
+    await session.commit()
+    response = await client.get("/api/status/queries")
+    assert response.status_code == 200
+    assert response.json()["GET /api/parent/tasks"]["requests"] == before + 1
+
+
+@pytest.mark.asyncio
+async def test_child_progress_window_starts_at_midnight_for_every_figure(auth_client: dict, session: AsyncSession):
+    client = auth_client["client"]
+    await seed_family(session, auth_client["user_id"], 1)
+    first_day = (datetime.now(timezone.utc) - timedelta(days=7)).date()
+    midnight = datetime.combine(first_day, datetime.min.time())
+    for at, description in ((midnight + timedelta(minutes=1), "Early"), (midnight - timedelta(minutes=1), "Too early")):
+        session.add(Transaction(user_id="budget-child0", type="earn", amount=100, description=description, created_at=at))
+        session.add(UserModuleProgress(user_id="budget-child0", module_id=description, is_completed=True, score=90, completed_at=at))
+    await session.commit()
+    await rebuild_daily_ledger_summary(session)
+    await session.commit()
+
+    data = (await client.get("/api/parent/children/budget-child0/progress", params={"timeframe": "week"})).json()
+    # Rewards, lessons and activities all include the first day's early hours and nothing before
+    assert data["stats"]["total_rewards"] == 15 + 100
+    assert data["stats"]["lessons_completed"] == 1
+    assert [a["description"] for a in data["recent_activities"]][-1] == "Early"
+
+
+async def seed_transactions(session: AsyncSession, child_id: str, count: int, first: int = 0):
+    """Bulk insert ``count`` transactions spread over the last year, then rebuild the ledger summary."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    kinds = ("earn", "spend", "save")
+    rows = [
+        {
+            "id": f"{child_id}-txn{i}",
+            "user_id": child_id,
+            "type": kinds[i % 3],
+            "amount": 1 + i % 7,
+            "description": "Bulk",
+            "category": ("chores", "treats", None)[i % 3],
+            "created_at": now - timedelta(minutes=10 * i),
+        }
+        for i in range(first, first + count)
+    ]
+    await session.execute(insert(Transaction), rows)
+    await rebuild_daily_ledger_summary(session, [child_id])
+    await session.commit()
+
+
+async def measure(client, path: str):
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = await client.get(path)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert response.status_code == 200, path
+    return response, elapsed, peak
+
+
+@pytest.mark.asyncio
+async def test_child_stats_flat_for_large_transaction_history(client, register_user, session: AsyncSession, query_budget):
+    teen = await register_user("budget-teen@example.com", "pass123", "Budget Teen", "older_child", age=14)
+    client.headers = {"Authorization": f"Bearer {teen['token']}"}
+    session.add(Goal(user_id=teen["user_id"], title="Bike", target_amount=100, current_amount=10))
+    await seed_transactions(session, teen["user_id"], 30)
+
+    for path in CHILD_BUDGETS:
+        await client.get(path)  # warm up statement compilation
+    small = {path: await measure(client, path) for path in CHILD_BUDGETS}
+    await seed_transactions(session, teen["user_id"], LARGE_HISTORY - 30, first=30)
+    large = {path: await measure(client, path) for path in CHILD_BUDGETS}
+
+    for path, budget in CHILD_BUDGETS.items():
+        small_response, small_elapsed, small_peak = small[path]
+        large_response, large_elapsed, large_peak = large[path]
+        assert query_count(large_response.headers) == query_count(small_response.headers)
+        query_budget(large_response, budget)
+        # Loading the history as ORM objects would cost tens of MB and seconds
+        assert large_peak < small_peak * 2 + 1_000_000, (path, small_peak, large_peak)
+        # Wall-clock time depends on the machine, so it is reported rather than asserted
+        print(f"{path}: {small_elapsed * 1e3:.1f}ms with 30 transactions, {large_elapsed * 1e3:.1f}ms with {LARGE_HISTORY}")
@@ -0,0 +1,168 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models import (
+    ChildProfile, TeacherProfile, Class, ClassStudent, Module, UserModuleProgress,
+    Goal, Transaction, Task, RedemptionRequest, PurchaseRequest, ShopItem,
+)
+
+# Tables whose hot lookups must be served by an index
+INDEXED_TABLES = {
+    "transactions",
+    "goals",
+    "tasks",
+    "child_profiles",
+    "class_students",
+    "user_module_progress",
+    "redemption_requests",
+    "purchase_requests",
+    "daily_ledger_summary",
+    "monthly_ledger_summary",
+    "transactions_archive",
+}
+
+
+async def seed_family(session: AsyncSession, parent_id: str, child_id: str, teacher_id: str):
+    """Give the child a parent, a class and some rows in every hot table."""
+    now = datetime.now(timezone.utc)
+    child_profile = (await session.execute(select(ChildProfile).where(ChildProfile.user_id == child_id))).scalar_one()
+    child_profile.parent_id = parent_id
+    teacher_profile = (await session.execute(select(TeacherProfile).where(TeacherProfile.user_id == teacher_id))).scalar_one()
+    module = Module(id="plan-module", title="Plan", description="Plan", created_by=teacher_id, is_published=True)
+    item = ShopItem(id="plan-item", name="Sticker", price=5)
+    session.add_all([
+        module,
+        item,
+        Class(id="plan-class", name="Plan Class", teacher_id=teacher_profile.id),
+        ClassStudent(class_id="plan-class", student_id=child_id),
+        UserModuleProgress(user_id=child_id, module_id="plan-module", assigned_by=teacher_id, is_completed=True, score=80, completed_at=now),
+        Goal(user_id=child_id, title="Bike", target_amount=100, current_amount=20),
+        Task(title="Dishes", assigned_by=parent_id, assigned_to=child_id, coins_reward=5, status="completed"),
+        RedemptionRequest(user_id=child_id, coins_amount=10, cash_amount=1.0),
+        PurchaseRequest(user_id=child_id, shop_item_id="plan-item", price=5),
+    ])
+    for days_ago in range(5):
+        session.add(Transaction(user_id=child_id, type="earn", amount=10, description="Chore", created_at=now - timedelta(days=days_ago)))
+    await session.commit()
+
+
+def full_scans(plan_rows):
+    """Return the plan lines that scan one of the indexed tables.
+
+    Only a SEARCH (an index seek) passes: ``SCAN t USING INDEX ...`` and
+    ``SCAN t USING COVERING INDEX ...`` still walk every entry of the index.
+    """
+    scans = []
+    for row in plan_rows:
+        detail = row[-1]
+        words = detail.split()
+        if len(words) >= 2 and words[0] == "SCAN" and words[1] in INDEXED_TABLES:
+            scans.append(detail)
+    return scans
+
+
+def test_full_index_scans_are_offenders():
+    plan = [
+        (0, 0, 0, "SEARCH transactions USING INDEX ix_transactions_user_id_created_at_id (user_id=?)"),
+        (1, 0, 0, "SCAN goals USING COVERING INDEX ix_goals_user_id"),
+        (2, 0, 0, "SCAN tasks USING INDEX ix_tasks_assigned_to"),
+        (3, 0, 0, "SCAN child_profiles"),
+        (4, 0, 0, "SCAN users"),
+    ]
+    assert full_scans(plan) == [row[-1] for row in plan[1:4]]
+
+
+@pytest.mark.asyncio
+async def test_router_queries_use_indexes(client, register_user, session: AsyncSession):
+    parent = await register_user("plan-parent@example.com", "pass123", "Plan Parent", "parent")
+    child = await register_user("plan-child@example.com", "pass123", "Plan Child", "younger_child", age=9)
+    teacher = await register_user("plan-teacher@example.com", "pass123", "Plan Teacher", "teacher")
+    await seed_family(session, parent["user_id"], child["user_id"], teacher["user_id"])
+
+    routes = {
+        parent["token"]: [
+            "/api/parent/dashboard",
+            f"/api/parent/children/{child['user_id']}/progress",
+            "/api/parent/tasks",
+            "/api/parent/redemptions",
+            "/api/parent/children/goals",
+        ],
+        child["token"]: [
+            "/api/child/dashboard",
+            "/api/child/goals",
+            "/api/child/transactions",
+            "/api/child/stats",
+            "/api/child/assigned-modules",
+            f"/api/users/{child['user_id']}/transactions",
+            f"/api/users/{child['user_id']}/goals",
+            "/api/tasks",
+            "/api/shop/purchase_requests",
+        ],
+        teacher["token"]: [
+            "/api/teacher/dashboard",
+            "/api/teacher/classes",
+            "/api/teacher/classes/plan-class",
+        ],
+    }
+
+    captured = []
+    engine = session.bind
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        for token, paths in routes.items():
+            client.headers = {"Authorization": f"Bearer {token}"}
+            for path in paths:
+                response = await client.get(path)
+                assert response.status_code == 200, path
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+
+    assert captured
+    offenders = {}
+    connection = await session.connection()
+    for statement, parameters in captured:
+        plan = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters))
+        scans = full_scans(plan.all())
+        if scans:
+            offenders[statement] = scans
+    assert not offenders, "\n\n".join(f"{stmt}\n  -> {scans}" for stmt, scans in offenders.items())
+
+
+@pytest.mark.asyncio
+async def test_transaction_cursor_pages_seek_the_index(auth_child_client: dict, session: AsyncSession):
+    """A cursor page is an index seek with no sort, so deep pages cost the same as the first."""
+    client = auth_child_client["client"]
+    child_id = auth_child_client["user_id"]
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    session.add_all([
+        Transaction(user_id=child_id, type="earn", amount=1, description="Chore", created_at=now - timedelta(minutes=i))
+        for i in range(3)
+    ])
+    await session.commit()
+    cursor = (await client.get(f"/api/users/{child_id}/transactions", params={"limit": 1})).json()["next_cursor"]
+
+    captured = []
+
+    def _record(conn, cur, statement, parameters, context, executemany):
+        if "FROM transactions" in statement and "LIMIT" in statement:
+            captured.append((statement, parameters))
+
+    engine = session.bind
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        response = await client.get(f"/api/users/{child_id}/transactions", params={"limit": 1, "cursor": cursor})
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", _record)
+    assert response.status_code == 200
+
+    statement, parameters = captured[-1]
+    connection = await session.connection()
+    plan = [row[-1] for row in (await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters))).all()]
+    assert any("USING INDEX ix_transactions_user_id_created_at_id" in line for line in plan), plan
+    assert not any("TEMP B-TREE" in line for line in plan), plan
@@ -0,0 +1,127 @@
+import pytest
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from backend.database import Base
+from backend.ledger import credit, debit
+from backend.models import User, ChildProfile, Goal, MonthlyLedgerSummary, RedemptionRequest, Transaction
+from backend.reconcile import reconcile, write_metrics
+from backend.rollups import ledger_totals
+from backend.schemas import TransactionRead
+
+
+async def seed_children(session: AsyncSession, count: int):
+    """Children with 100 earned and 30 spent, the odd ones with a drifted balance."""
+    for i in range(count):
+        child_id = f"reconcile-child{i:02d}"
+        session.add(User(id=child_id, email=f"{child_id}@example.com", hashed_password="x", name=child_id, role="younger_child"))
+        session.add(ChildProfile(user_id=child_id, age=9, coins=0))
+        await session.flush()
+        await credit(session, Transaction(user_id=child_id, type="earn", amount=100, description="Allowance"))
+        await debit(session, Transaction(user_id=child_id, type="spend", amount=30, description="Snack"))
+        if i % 2:
+            # A handler that moved the balance but never wrote its ledger row
+            profile = (await session.execute(select(ChildProfile).where(ChildProfile.user_id == child_id))).scalar_one()
+            profile.coins += 5
+    await session.commit()
+
+
+async def balances(session: AsyncSession):
+    result = await session.execute(
+        select(ChildProfile.coins).order_by(ChildProfile.user_id).execution_options(populate_existing=True)
+    )
+    return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_reconcile_reports_then_repairs_drift(session: AsyncSession):
+    await seed_children(session, 5)
+    # Archived history counts towards the expected balance too
+    session.add(MonthlyLedgerSummary(user_id="reconcile-child00", month=date(2023, 1, 1), type="earn", category="", amount_sum=40, count=2))
+    await session.commit()
+
+    seen = []
+    report = await reconcile(session, chunk_size=2, on_chunk=lambda result: seen.extend(result.mismatches))
+    assert (report.checked, report.mismatched, report.repaired, report.drift) == (5, 3, 0, 50)
+    assert sorted((m.user_id, m.coins, m.expected) for m in seen) == [
+        ("reconcile-child00", 70, 110),
+        ("reconcile-child01", 75, 70),
+        ("reconcile-child03", 75, 70),
+    ]
+    assert await balances(session) == [70, 75, 70, 75, 70]
+
+    report = await reconcile(session, repair=True, chunk_size=2)
+    assert (report.mismatched, report.repaired) == (3, 3)
+    assert await balances(session) == [110, 70, 70, 70, 70]
+    assert (await reconcile(session)).mismatched == 0
+
+
+@pytest.mark.asyncio
+async def test_reconcile_across_a_process_pool(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'reconcile.db'}"
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        await seed_children(session, 7)
+        report = await reconcile(session, repair=True, chunk_size=2, workers=2, database_url=url)
+        assert (report.checked, report.mismatched, report.repaired) == (7, 3, 3)
+        assert await balances(session) == [70] * 7
+    await engine.dispose()
+
+    metrics_file = tmp_path / "reconcile.prom"
+    write_metrics(report, str(metrics_file))
+    assert "coincraft_ledger_reconcile_mismatches 3.0" in metrics_file.read_text()
+
+
+@pytest.mark.asyncio
+async def test_saving_through_the_api_keeps_balances_reconciled(auth_child_client: dict, session: AsyncSession):
+    client = auth_child_client["client"]
+    child_id = auth_child_client["user_id"]
+    await credit(session, Transaction(user_id=child_id, type="earn", amount=50, description="Allowance"))
+    session.add(Goal(id="reconcile-goal", user_id=child_id, title="Bike", target_amount=100))
+    await session.commit()
+
+    response = await client.put("/api/goals/reconcile-goal/progress", json={"amount": 20})
+    assert response.status_code == 200
+    assert response.json()["current_amount"] == 20
+    response = await client.post(f"/api/users/{child_id}/transactions", json={"type": "save", "amount": 10, "description": "Piggy bank"})
+    assert response.json()["new_coin_balance"] == 20
+    assert (await client.put("/api/goals/reconcile-goal/progress", json={"amount": 500})).status_code == 400
+
+    report = await reconcile(session, repair=True)
+    assert (report.mismatched, report.repaired) == (0, 0)
+    profile = (await session.execute(
+        select(ChildProfile).where(ChildProfile.user_id == child_id).execution_options(populate_existing=True)
+    )).scalar_one()
+    assert profile.coins == 20
+
+
+@pytest.mark.asyncio
+async def test_rejected_redemption_is_refunded_not_earned(auth_client: dict, session: AsyncSession):
+    client = auth_client["client"]
+    child_id = "refund-kid"
+    session.add(User(id=child_id, email="refund-kid@example.com", hashed_password="x", name="Kid", role="younger_child"))
+    session.add(ChildProfile(user_id=child_id, age=9, coins=0, parent_id=auth_client["user_id"]))
+    await session.flush()
+    await credit(session, Transaction(user_id=child_id, type="earn", amount=100, description="Allowance"))
+    # The request holds its coins until the parent decides
+    await debit(session, Transaction(user_id=child_id, type="spend", amount=40, description="Redemption request"))
+    session.add(RedemptionRequest(id="refund-request", user_id=child_id, coins_amount=40, cash_amount=4.0))
+    await session.commit()
+
+    response = await client.put("/api/redemption-requests/refund-request/reject")
+    assert response.status_code == 200
+
+    refund = (await session.execute(
+        select(Transaction).where(Transaction.reference_id == "refund-request")
+    )).scalar_one()
+    assert TransactionRead.model_validate(refund).type == "refund"
+    assert await ledger_totals(session, child_id) == {"earn": 100, "spend": 0, "save": 0}
+    report = await reconcile(session, repair=True)
+    assert (report.mismatched, report.repaired) == (0, 0)
+    profile = (await session.execute(
+        select(ChildProfile).where(ChildProfile.user_id == child_id).execution_options(populate_existing=True)
+    )).scalar_one()
+    assert profile.coins == 100
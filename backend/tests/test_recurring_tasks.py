@@ -0,0 +1,91 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend import recurring
+from backend.models import User, ChildProfile, Task, TaskTemplate
+from backend.recurring import materialize_recurring_tasks
+
+MONDAY = date(2026, 10, 19)
+
+
+async def add_child(session: AsyncSession, parent_id: str, child_id: str):
+    session.add(User(id=child_id, email=f"{child_id}@example.com", hashed_password="x", name=child_id, role="younger_child"))
+    session.add(ChildProfile(user_id=child_id, age=9, parent_id=parent_id))
+    await session.flush()
+
+
+async def occurrences(session: AsyncSession, template_id: str):
+    result = await session.execute(
+        select(Task.occurs_on).where(Task.template_id == template_id).order_by(Task.occurs_on)
+    )
+    return result.scalars().all()
+
+
+@pytest.mark.asyncio
+async def test_templates_materialized_in_batches_without_duplicates(session: AsyncSession, monkeypatch):
+    monkeypatch.setattr(recurring, "MATERIALIZE_BATCH_SIZE", 2)
+    await add_child(session, "recurring-parent", "recurring-kid")
+    await add_child(session, "someone-else", "moved-kid")
+    template = dict(assigned_by="recurring-parent", assigned_to="recurring-kid", coins_reward=2, starts_on=MONDAY)
+    session.add_all([
+        TaskTemplate(id="make-bed", title="Make bed", frequency="daily", **template),
+        TaskTemplate(id="bins", title="Bins", frequency="weekly", weekdays="03", **template),
+        TaskTemplate(id="short", title="Short", frequency="daily", ends_on=MONDAY + timedelta(days=1), **template),
+        TaskTemplate(id="later", title="Later", frequency="daily", **{**template, "starts_on": MONDAY + timedelta(days=5)}),
+        TaskTemplate(id="stopped", title="Stopped", frequency="daily", is_active=False, **template),
+        TaskTemplate(id="not-theirs", title="Not theirs", frequency="daily", **{**template, "assigned_to": "moved-kid"}),
+    ])
+    await session.commit()
+
+    assert await materialize_recurring_tasks(session, MONDAY) == 7 + 2 + 2 + 2
+    assert await occurrences(session, "bins") == [MONDAY, MONDAY + timedelta(days=3)]
+    assert await occurrences(session, "later") == [MONDAY + timedelta(days=5), MONDAY + timedelta(days=6)]
+    assert await occurrences(session, "stopped") == []
+    assert await occurrences(session, "not-theirs") == []
+    task = (await session.execute(select(Task).where(Task.id == f"template:bins:{MONDAY.isoformat()}"))).scalar_one()
+    assert (task.title, task.assigned_to, task.status, task.coins_reward) == ("Bins", "recurring-kid", "pending", 2)
+
+    # Rerunning the same day creates nothing; the next day only adds the new day
+    assert await materialize_recurring_tasks(session, MONDAY) == 0
+    await session.execute(delete(Task).where(Task.id == f"template:make-bed:{MONDAY.isoformat()}"))
+    await session.commit()
+    assert await materialize_recurring_tasks(session, MONDAY + timedelta(days=1)) == 3  # next Monday: make bed, bins, later
+    assert len(await occurrences(session, "make-bed")) == 7
+
+    # Even a template whose progress was lost can't create an occurrence twice
+    await session.execute(TaskTemplate.__table__.update().values(materialized_through=None))
+    await session.commit()
+    before = (await session.execute(select(func.count()).select_from(Task))).scalar_one()
+    assert await materialize_recurring_tasks(session, MONDAY + timedelta(days=1)) == 0
+    assert (await session.execute(select(func.count()).select_from(Task))).scalar_one() == before
+
+
+@pytest.mark.asyncio
+async def test_parent_manages_recurring_tasks(auth_client: dict, session: AsyncSession):
+    client = auth_client["client"]
+    await add_child(session, auth_client["user_id"], "chore-kid")
+    await add_child(session, "someone-else", "other-kid")
+    await session.commit()
+
+    response = await client.post("/api/parent/task-templates", json={
+        "title": "Feed the cat", "coins_reward": 3, "frequency": "weekly", "weekdays": "5500", "assigned_to": "chore-kid",
+    })
+    assert response.status_code == 200
+    template = response.json()
+    today = datetime.now(timezone.utc).date()
+    assert template["weekdays"] == "05"
+    assert template["materialized_through"] == (today + timedelta(days=6)).isoformat()
+    assert len(await occurrences(session, template["id"])) == 2
+    assert [t["id"] for t in (await client.get("/api/parent/task-templates")).json()] == [template["id"]]
+
+    weekly_without_days = {"title": "Bins", "coins_reward": 1, "frequency": "weekly", "assigned_to": "chore-kid"}
+    assert (await client.post("/api/parent/task-templates", json=weekly_without_days)).status_code == 400
+    not_theirs = {"title": "Bins", "coins_reward": 1, "frequency": "daily", "assigned_to": "other-kid"}
+    assert (await client.post("/api/parent/task-templates", json=not_theirs)).status_code == 404
+
+    response = await client.delete(f"/api/parent/task-templates/{template['id']}")
+    assert response.status_code == 200
+    assert await occurrences(session, template["id"]) == []
+    assert (await client.get("/api/parent/task-templates")).json() == []
+    assert (await client.delete("/api/parent/task-templates/missing")).status_code == 404
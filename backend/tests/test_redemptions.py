@@ -2,7 +2,8 @@ import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from backend.models import User, ChildProfile, ParentProfile, RedemptionRequest
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from backend.query_stats import query_count
 
 @pytest.mark.asyncio
 async def test_get_conversion_requests_success(auth_child_client: dict, session: AsyncSession):
@@ -117,3 +118,48 @@ async def test_reject_redemption_request_forbidden(auth_client: dict, session: A
     await session.commit()
     response = await client.put(f"/api/redemptions/redemption-requests/{request.id}/reject")
     assert response.status_code == 403
+
+
+async def seed_redemptions(session: AsyncSession, parent_id: str):
+    now = datetime.now(timezone.utc)
+    for child_id, owner in (("redeem-kid1", parent_id), ("redeem-kid2", parent_id), ("redeem-stranger", "other-parent")):
+        session.add(User(id=child_id, email=f"{child_id}@example.com", hashed_password="x", name=child_id, role="younger_child"))
+        session.add(ChildProfile(user_id=child_id, age=9, parent_id=owner))
+        for i in range(5):
+            session.add(RedemptionRequest(
+                id=f"{child_id}-r{i}", user_id=child_id, coins_amount=10, cash_amount=1.0,
+                status=("pending", "approved")[i % 2], created_at=now - timedelta(hours=i),
+            ))
+    await session.commit()
+
+
+@pytest.mark.asyncio
+async def test_parent_redemption_listing_pages_with_one_query(auth_client: dict, session: AsyncSession):
+    client = auth_client["client"]
+    parent_id = auth_client["user_id"]
+    await seed_redemptions(session, parent_id)
+
+    pages = [await client.get("/api/parent/redemptions", params={"status": "pending", "limit": 2})]
+    while "x-next-cursor" in pages[-1].headers:
+        cursor = pages[-1].headers["x-next-cursor"]
+        pages.append(await client.get("/api/parent/redemptions", params={"status": "pending", "limit": 2, "cursor": cursor}))
+    assert len(pages) == 3
+    # The child is joined in, not looked up per request
+    assert len({query_count(page.headers) for page in pages}) == 1
+    listed = [r for page in pages for r in page.json()]
+    assert [r["id"] for r in listed] == [f"redeem-kid{k}-r{i}" for i in (0, 2, 4) for k in (2, 1)]
+    assert listed[0]["child"] == {"id": "redeem-kid2", "name": "redeem-kid2", "avatar_url": None, "age": 9}
+
+    response = await client.get(f"/api/parents/{parent_id}/redemption-requests", params={"child_id": "redeem-kid1"})
+    assert [r["id"] for r in response.json()] == [f"redeem-kid1-r{i}" for i in range(5)]
+    assert "x-next-cursor" not in response.headers
+    # Without limit or cursor the whole family history comes back, as before
+    unpaged = await client.get("/api/parent/redemptions")
+    assert len(unpaged.json()) == 10
+    assert "x-next-cursor" not in unpaged.headers
+    assert (await client.get("/api/parent/redemptions", params={"child_id": "redeem-stranger"})).json() == []
+    assert (await client.get("/api/parent/redemptions", params={"status": "lost"})).status_code == 422
+    assert (await client.get("/api/parent/redemptions", params={"cursor": "nonsense"})).status_code == 400
+    # Browsers only let the frontend read the cursor if CORS exposes it
+    cors = await client.get("/api/parent/redemptions", params={"limit": 1}, headers={"Origin": "http://localhost:5173"})
+    assert "x-next-cursor" in cors.headers["access-control-expose-headers"].lower()
@@ -0,0 +1,205 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from backend.models import (
+    StudentPerformanceStats, UserModuleProgress, Class, ClassStudent, ClassDailyStats, TeacherDailyStats, Transaction,
+    DailyLedgerSummary,
+)
+from backend.rollups import (
+    record_module_completion, rebuild_student_performance_stats, refresh_class_daily_stats,
+    record_ledger_entry, rebuild_daily_ledger_summary, stale_ledger_summary_users,
+    ledger_totals, earnings_since,
+)
+
+
+async def get_stats(session: AsyncSession, user_id: str):
+    result = await session.execute(
+        select(StudentPerformanceStats).where(StudentPerformanceStats.user_id == user_id)
+    )
+    stats = result.scalar_one()
+    await session.refresh(stats)
+    return stats
+
+
+@pytest.mark.asyncio
+async def test_record_module_completion_accumulates(session: AsyncSession):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    await record_module_completion(session, "student1", 90, now - timedelta(days=1))
+    await record_module_completion(session, "student1", 40, now)
+    await session.commit()
+
+    stats = await get_stats(session, "student1")
+    assert stats.completed_count == 2
+    assert stats.score_sum == 130
+    assert stats.last_completed_at == now
+    assert stats.needs_support is True
+
+
+@pytest.mark.asyncio
+async def test_record_module_completion_rescore_applies_delta(session: AsyncSession):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    await record_module_completion(session, "student2", 60, now)
+    await record_module_completion(session, "student2", 80, now, was_completed=True, previous_score=60)
+    await session.commit()
+
+    stats = await get_stats(session, "student2")
+    assert stats.completed_count == 1
+    assert stats.score_sum == 80
+    assert stats.needs_support is False
+
+
+@pytest.mark.asyncio
+async def test_rebuild_student_performance_stats_matches_progress(session: AsyncSession):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    session.add_all([
+        UserModuleProgress(user_id="student3", module_id="m1", is_completed=True, score=100, completed_at=now),
+        UserModuleProgress(user_id="student3", module_id="m2", is_completed=True, score=None, completed_at=now),
+        UserModuleProgress(user_id="student3", module_id="m3", is_completed=False, score=20),
+    ])
+    await session.commit()
+
+    assert await rebuild_student_performance_stats(session) == 1
+    await session.commit()
+
+    stats = await get_stats(session, "student3")
+    assert stats.completed_count == 2
+    assert stats.score_sum == 100
+    assert stats.needs_support is True
+
+
+async def get_class_days(session: AsyncSession, class_id: str):
+    result = await session.execute(
+        select(ClassDailyStats).where(ClassDailyStats.class_id == class_id).order_by(ClassDailyStats.day)
+    )
+    rows = result.scalars().all()
+    for row in rows:
+        await session.refresh(row)
+    return [(row.day, row.completions, row.score_sum, row.active_students) for row in rows]
+
+
+@pytest.mark.asyncio
+async def test_record_module_completion_updates_class_daily_stats(session: AsyncSession):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    session.add_all([
+        ClassStudent(class_id="daily-class", student_id="daily1"),
+        ClassStudent(class_id="daily-class", student_id="daily2"),
+    ])
+    for user_id, module_id, score in [("daily1", "m1", 90), ("daily1", "m2", 70), ("daily2", "m1", 50)]:
+        session.add(UserModuleProgress(user_id=user_id, module_id=module_id, is_completed=True, score=score, completed_at=now))
+        await record_module_completion(session, user_id, score, now)
+    await session.commit()
+
+    assert await get_class_days(session, "daily-class") == [(now.date(), 3, 210, 2)]
+
+
+@pytest.mark.asyncio
+async def test_teacher_daily_stats_count_each_student_once(session: AsyncSession):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    session.add_all([
+        Class(id="maths", name="Maths", teacher_id="rollup-teacher"),
+        Class(id="science", name="Science", teacher_id="rollup-teacher"),
+        ClassStudent(class_id="maths", student_id="both1"),
+        ClassStudent(class_id="science", student_id="both1"),
+        ClassStudent(class_id="science", student_id="science1"),
+    ])
+    for user_id, score in [("both1", 90), ("science1", 60)]:
+        session.add(UserModuleProgress(user_id=user_id, module_id="m1", is_completed=True, score=score, completed_at=now))
+        await record_module_completion(session, user_id, score, now)
+    await session.commit()
+
+    assert await get_class_days(session, "science") == [(now.date(), 2, 150, 2)]
+    assert await get_class_days(session, "maths") == [(now.date(), 1, 90, 1)]
+    rows = (await session.execute(
+        select(TeacherDailyStats.day, TeacherDailyStats.completions, TeacherDailyStats.score_sum, TeacherDailyStats.active_students)
+        .where(TeacherDailyStats.teacher_id == "rollup-teacher")
+    )).all()
+    assert [tuple(row) for row in rows] == [(now.date(), 2, 150, 2)]
+
+
+@pytest.mark.asyncio
+async def test_refresh_class_daily_stats_matches_progress(session: AsyncSession):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    yesterday = now - timedelta(days=1)
+    session.add_all([
+        ClassStudent(class_id="refresh-class", student_id="refresh1"),
+        ClassStudent(class_id="refresh-class", student_id="refresh2"),
+        UserModuleProgress(user_id="refresh1", module_id="m1", is_completed=True, score=80, completed_at=yesterday),
+        UserModuleProgress(user_id="refresh1", module_id="m2", is_completed=True, score=60, completed_at=now),
+        UserModuleProgress(user_id="refresh2", module_id="m1", is_completed=True, score=100, completed_at=now),
+        UserModuleProgress(user_id="refresh2", module_id="m2", is_completed=False),
+    ])
+    await session.flush()
+
+    assert await refresh_class_daily_stats(session, yesterday.date()) == 2
+    await session.commit()
+    assert await get_class_days(session, "refresh-class") == [
+        (yesterday.date(), 1, 80, 1),
+        (now.date(), 2, 160, 2),
+    ]
+
+    # Refreshing only recent days leaves older rows untouched
+    assert await refresh_class_daily_stats(session, now.date()) == 1
+    await session.commit()
+    assert len(await get_class_days(session, "refresh-class")) == 2
+
+
+@pytest.mark.asyncio
+async def test_ledger_summary_rebuild_matches_incremental_upserts(session: AsyncSession):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = [
+        ("earn", "chores", 10, now),
+        ("earn", "chores", 5, now),
+        ("earn", None, 4, now),
+        ("spend", "treats", 7, now),
+        ("earn", "chores", 3, now - timedelta(days=10)),
+    ]
+    for kind, category, amount, at in rows:
+        session.add(Transaction(
+            user_id="earner", type=kind, category=category, amount=amount, description="x", created_at=at
+        ))
+        await record_ledger_entry(session, "earner", kind, category, amount, at.date())
+    await session.commit()
+
+    async def snapshot():
+        result = await session.execute(
+            select(
+                DailyLedgerSummary.day, DailyLedgerSummary.type, DailyLedgerSummary.category,
+                DailyLedgerSummary.amount_sum, DailyLedgerSummary.count,
+            ).order_by(DailyLedgerSummary.day, DailyLedgerSummary.type, DailyLedgerSummary.category)
+        )
+        return result.all()
+
+    incremental = await snapshot()
+    assert await rebuild_daily_ledger_summary(session) == 4
+    await session.commit()
+    assert await snapshot() == incremental == [
+        ((now - timedelta(days=10)).date(), "earn", "chores", 3, 1),
+        (now.date(), "earn", "", 4, 1),
+        (now.date(), "earn", "chores", 15, 2),
+        (now.date(), "spend", "treats", 7, 1),
+    ]
+    assert await earnings_since(session, "earner", now.date(), (now - timedelta(days=29)).date()) == [19, 22]
+    assert await ledger_totals(session, "earner", since=now.date()) == {"earn": 19, "spend": 7, "save": 0}
+    assert await ledger_totals(session, "earner") == {"earn": 22, "spend": 7, "save": 0}
+
+
+@pytest.mark.asyncio
+async def test_stale_ledger_summary_users_are_found_and_repaired(session: AsyncSession):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for user_id in ("in-sync", "missing-row", "extra-row"):
+        session.add(Transaction(user_id=user_id, type="earn", amount=5, description="x", created_at=now))
+        await record_ledger_entry(session, user_id, "earn", None, 5, now.date())
+    # A transaction written without its summary row, and a summary row without transactions
+    session.add(Transaction(user_id="missing-row", type="spend", amount=2, description="x", created_at=now))
+    await record_ledger_entry(session, "extra-row", "save", "goal", 9, now.date())
+    await session.commit()
+
+    stale = await stale_ledger_summary_users(session)
+    assert stale == ["extra-row", "missing-row"]
+
+    await rebuild_daily_ledger_summary(session, stale)
+    await session.commit()
+    assert await stale_ledger_summary_users(session) == []
+    assert await ledger_totals(session, "missing-row") == {"earn": 5, "spend": 2, "save": 0}
+    assert await ledger_totals(session, "extra-row") == {"earn": 5, "spend": 0, "save": 0}
@@ -0,0 +1,74 @@
+import pytest
+from datetime import date
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from backend.models import ChildProfile, ClassDailyStats, StudentPerformanceStats, Transaction, User
+from backend.seed_data import generate_dataset
+
+SMALL = dict(
+    families=6, children_per_family=2, teachers=2, classes_per_teacher=2, modules=2,
+    months=3, transactions_per_month=15, end=date(2025, 6, 1),
+)
+
+
+@pytest.fixture
+async def make_engine(tmp_path):
+    """Throwaway on-disk databases (the generator runs migrations)."""
+    engines = []
+
+    def _make(name: str):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / name}")
+        engines.append(engine)
+        return engine
+
+    yield _make
+    for engine in engines:
+        await engine.dispose()
+
+
+async def transaction_rows(engine):
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(Transaction.id, Transaction.user_id, Transaction.type, Transaction.amount, Transaction.created_at)
+            .order_by(Transaction.id)
+        )
+        return result.all()
+
+
+@pytest.mark.asyncio
+async def test_generated_dataset_is_deterministic(make_engine):
+    first, second, other = make_engine("a.db"), make_engine("b.db"), make_engine("c.db")
+    counts = await generate_dataset(seed=3, bind=first, **SMALL)
+    assert await generate_dataset(seed=3, bind=second, **SMALL) == counts
+    await generate_dataset(seed=4, bind=other, **SMALL)
+
+    rows = await transaction_rows(first)
+    assert rows and rows == await transaction_rows(second)
+    assert rows != await transaction_rows(other)
+    assert counts["transactions"] == len(rows)
+
+
+@pytest.mark.asyncio
+async def test_generated_balances_match_the_ledger(make_engine):
+    engine = make_engine("ledger.db")
+    counts = await generate_dataset(seed=5, bind=engine, **SMALL)
+
+    signed = case((Transaction.type == "earn", Transaction.amount), else_=-Transaction.amount)
+    ledger = select(Transaction.user_id, func.sum(signed).label("total")).group_by(Transaction.user_id).subquery()
+    async with engine.connect() as conn:
+        mismatched = (await conn.execute(
+            select(func.count())
+            .select_from(ChildProfile)
+            .outerjoin(ledger, ledger.c.user_id == ChildProfile.user_id)
+            .where(ChildProfile.coins != func.coalesce(ledger.c.total, 0))
+        )).scalar_one()
+        negative = (await conn.execute(select(func.count()).where(ChildProfile.coins < 0))).scalar_one()
+        users = (await conn.execute(select(func.count()).select_from(User))).scalar_one()
+        rollups = (await conn.execute(select(func.count()).select_from(StudentPerformanceStats))).scalar_one()
+        daily = (await conn.execute(select(func.count()).select_from(ClassDailyStats))).scalar_one()
+
+    assert mismatched == 0
+    assert negative == 0
+    assert users == counts["users"] == SMALL["families"] + counts["child_profiles"] + SMALL["teachers"]
+    # The teacher rollups are rebuilt from the generated progress
+    assert rollups > 0 and daily > 0
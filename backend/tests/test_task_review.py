@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models import User, ChildProfile, Task, Transaction
+from backend.query_stats import query_count
+from backend.reconcile import reconcile
+from backend.rollups import ledger_totals, stale_ledger_summary_users
+
+
+async def seed_tasks(session: AsyncSession, parent_id: str):
+    for child_id, owner in (("review-kid1", parent_id), ("review-kid2", parent_id), ("review-stranger", "other-parent")):
+        session.add(User(id=child_id, email=f"{child_id}@example.com", hashed_password="x", name=child_id, role="younger_child"))
+        session.add(ChildProfile(user_id=child_id, age=9, coins=0, parent_id=owner))
+    for i in range(30):
+        child_id = ("review-kid1", "review-kid2")[i % 2]
+        session.add(Task(id=f"review-task{i}", title=f"Chore {i}", assigned_by=parent_id, assigned_to=child_id, coins_reward=1 + i % 3, status="completed"))
+    session.add(Task(id="review-pending", title="Homework", assigned_by=parent_id, assigned_to="review-kid1", coins_reward=5, status="pending"))
+    session.add(Task(id="review-theirs", title="Lawn", assigned_by="other-parent", assigned_to="review-stranger", coins_reward=5, status="completed"))
+    await session.commit()
+
+
+async def coins_of(session: AsyncSession, child_id: str) -> int:
+    result = await session.execute(
+        select(ChildProfile.coins).where(ChildProfile.user_id == child_id).execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_bulk_approve_pays_each_child_once(auth_client: dict, session: AsyncSession):
+    client = auth_client["client"]
+    await seed_tasks(session, auth_client["user_id"])
+    task_ids = [f"review-task{i}" for i in range(30)]
+
+    response = await client.post("/api/parent/tasks/review", json={
+        "action": "approve", "task_ids": task_ids + ["review-pending", "review-theirs", "review-task0"],
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["approved"], data["rejected"], data["coins_awarded"]) == (30, 0, 60)
+    results = {r["task_id"]: r for r in data["results"]}
+    assert len(data["results"]) == 32
+    assert (results["review-task1"]["success"], results["review-task1"]["coins_awarded"]) == (True, 2)
+    assert (results["review-pending"]["success"], results["review-pending"]["status"]) == (False, "pending")
+    assert results["review-theirs"]["success"] is False
+    # One ownership query, one status UPDATE, one insert, one coin UPDATE, one rollup, plus auth
+    assert query_count(response.headers) <= 8
+
+    assert await coins_of(session, "review-kid1") == 30
+    assert await coins_of(session, "review-kid2") == 30
+    assert await ledger_totals(session, "review-kid1") == {"earn": 30, "spend": 0, "save": 0}
+    assert await stale_ledger_summary_users(session) == []
+    assert (await reconcile(session)).mismatched == 0
+
+    # Approving again pays nothing
+    again = (await client.post("/api/parent/tasks/review", json={"action": "approve", "task_ids": task_ids[:5]})).json()
+    assert again["approved"] == 0
+    assert {r["status"] for r in again["results"]} == {"approved"}
+    earned = (await session.execute(select(func.count()).select_from(Transaction))).scalar_one()
+    assert earned == 30
+
+
+@pytest.mark.asyncio
+async def test_bulk_reject(auth_client: dict, auth_child_client: dict, session: AsyncSession):
+    client = auth_client["client"]
+    parent = {"Authorization": f"Bearer {auth_client['token']}"}
+    await seed_tasks(session, auth_client["user_id"])
+
+    response = await client.post("/api/parent/tasks/review", headers=parent, json={
+        "action": "reject", "task_ids": ["review-pending", "review-task0", "review-theirs"],
+    })
+    data = response.json()
+    assert (data["approved"], data["rejected"], data["coins_awarded"]) == (0, 2, 0)
+    assert [r["success"] for r in data["results"]] == [True, True, False]
+    task = (await session.execute(
+        select(Task).where(Task.id == "review-pending").execution_options(populate_existing=True)
+    )).scalar_one()
+    assert task.status == "rejected"
+    assert await coins_of(session, "review-kid1") == 0
+
+    invalid = await client.post("/api/parent/tasks/review", headers=parent, json={"action": "pay", "task_ids": ["x"]})
+    assert invalid.status_code == 422
+    child = {"Authorization": f"Bearer {auth_child_client['token']}"}
+    child_response = await client.post("/api/parent/tasks/review", headers=child, json={"action": "approve", "task_ids": ["review-task1"]})
+    assert child_response.status_code == 403
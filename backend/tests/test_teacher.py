@@ -1,7 +1,23 @@
 import pytest
+from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from backend.models import User, TeacherProfile, Class
+from backend.models import User, TeacherProfile, Class, ClassStudent, Module, ModuleSection, QuizQuestion, QuizOption, UserModuleProgress
+from backend.rollups import rebuild_student_performance_stats, refresh_class_daily_stats
+from backend.routers import teacher
+
+
+async def add_class_with_students(session: AsyncSession, teacher_profile_id: str, module_id: str, class_id: str, scores: list):
+    """Create a class whose students have each completed one module with the given score."""
+    session.add(Class(id=class_id, name=class_id, teacher_id=teacher_profile_id))
+    for i, score in enumerate(scores):
+        student_id = f"{class_id}-student{i}"
+        session.add(User(id=student_id, email=f"{student_id}@example.com", hashed_password="x", name=student_id, role="younger_child"))
+        session.add(ClassStudent(class_id=class_id, student_id=student_id))
+        session.add(UserModuleProgress(user_id=student_id, module_id=module_id, is_completed=True, score=score, completed_at=datetime.now(timezone.utc)))
+    await session.flush()
+    await rebuild_student_performance_stats(session)
+    await session.commit()
 
 @pytest.mark.asyncio
 async def test_get_teacher_dashboard_success(auth_teacher_client: dict, session: AsyncSession):
@@ -17,6 +33,45 @@ async def test_get_teacher_dashboard_success(auth_teacher_client: dict, session:
     assert "classes" in data
     assert "analytics" in data
 
+@pytest.mark.asyncio
+async def test_get_teacher_dashboard_class_stats(auth_teacher_client: dict, session: AsyncSession):
+    client = auth_teacher_client["client"]
+    teacher_id = auth_teacher_client["user_id"]
+    profile = (await session.execute(select(TeacherProfile).where(TeacherProfile.user_id == teacher_id))).scalar_one()
+    module = Module(title="Saving", description="Saving basics", created_by=teacher_id)
+    session.add(module)
+    await session.commit()
+    await add_class_with_students(session, profile.id, module.id, "class-a", [90, 60, 50])
+    response = await client.get("/api/teacher/dashboard")
+    assert response.status_code == 200
+    data = response.json()
+    class_a = next(c for c in data["classes"] if c["id"] == "class-a")
+    assert class_a["student_count"] == 3
+    assert class_a["avg_performance"] == 66.7
+    assert class_a["students_needing_support"] == 2
+    assert data["stats"]["total_students"] == 3
+
+@pytest.mark.asyncio
+async def test_get_teacher_dashboard_query_count_independent_of_class_size(auth_teacher_client: dict, session: AsyncSession, query_log: list):
+    client = auth_teacher_client["client"]
+    teacher_id = auth_teacher_client["user_id"]
+    profile = (await session.execute(select(TeacherProfile).where(TeacherProfile.user_id == teacher_id))).scalar_one()
+    module = Module(title="Budgeting", description="Budget basics", created_by=teacher_id)
+    session.add(module)
+    await session.commit()
+    await add_class_with_students(session, profile.id, module.id, "small", [80])
+
+    query_log.clear()
+    response = await client.get("/api/teacher/dashboard")
+    assert response.status_code == 200
+    small_class_queries = len(query_log)
+
+    await add_class_with_students(session, profile.id, module.id, "large", [70 + i for i in range(30)])
+    query_log.clear()
+    response = await client.get("/api/teacher/dashboard")
+    assert response.status_code == 200
+    assert len(query_log) == small_class_queries
+
 @pytest.mark.asyncio
 async def test_create_class_success(auth_teacher_client: dict, session: AsyncSession):
     client = auth_teacher_client["client"]
@@ -86,3 +141,159 @@ async def test_get_class_details_forbidden(auth_client: dict):
     client = auth_client["client"]
     response = await client.get("/api/teacher/classes/classX")
     assert response.status_code == 403
+
+async def add_module_with_quiz(session: AsyncSession, teacher_id: str, module_id: str, questions: int = 3):
+    """Create a module with one lesson section and a quiz of `questions` two-option questions."""
+    session.add(Module(id=module_id, title=module_id, description="Module", created_by=teacher_id))
+    session.add(ModuleSection(id=f"{module_id}-lesson", module_id=module_id, title="Lesson", type="lesson", content="Read", order_index=1))
+    session.add(ModuleSection(id=f"{module_id}-quiz", module_id=module_id, title="Module Quiz", type="quiz", order_index=2))
+    for i in range(questions):
+        question_id = f"{module_id}-q{i}"
+        session.add(QuizQuestion(id=question_id, section_id=f"{module_id}-quiz", question_text=f"Question {i}", order_index=i + 1))
+        session.add(QuizOption(question_id=question_id, option_text="Yes", is_correct=True, order_index=1))
+        session.add(QuizOption(question_id=question_id, option_text="No", is_correct=False, order_index=2))
+    await session.commit()
+
+@pytest.mark.asyncio
+async def test_get_teacher_modules_stats_and_quiz(auth_teacher_client: dict, session: AsyncSession):
+    client = auth_teacher_client["client"]
+    teacher_id = auth_teacher_client["user_id"]
+    await add_module_with_quiz(session, teacher_id, "module-a", questions=2)
+    session.add_all([
+        UserModuleProgress(user_id="s1", module_id="module-a", is_completed=True, score=90),
+        UserModuleProgress(user_id="s2", module_id="module-a", is_completed=True, score=70),
+        UserModuleProgress(user_id="s3", module_id="module-a", is_completed=False),
+        UserModuleProgress(user_id="s4", module_id="module-a", is_completed=False),
+    ])
+    await session.commit()
+    response = await client.get("/api/teacher/modules")
+    assert response.status_code == 200
+    module = response.json()[0]
+    assert module["completion_rate"] == 50.0
+    assert module["avg_score"] == 80.0
+    assert [s["title"] for s in module["sections"]] == ["Lesson"]
+    assert [q["question"] for q in module["quiz"]] == ["Question 0", "Question 1"]
+    assert module["quiz"][0]["options"] == [{"text": "Yes", "isCorrect": True}, {"text": "No", "isCorrect": False}]
+
+@pytest.mark.asyncio
+async def test_get_teacher_modules_query_count_independent_of_module_count(auth_teacher_client: dict, session: AsyncSession, query_log: list):
+    client = auth_teacher_client["client"]
+    teacher_id = auth_teacher_client["user_id"]
+    await add_module_with_quiz(session, teacher_id, "module-0")
+    query_log.clear()
+    response = await client.get("/api/teacher/modules")
+    assert response.status_code == 200
+    single_module_queries = len(query_log)
+
+    for i in range(1, 10):
+        await add_module_with_quiz(session, teacher_id, f"module-{i}", questions=5)
+    query_log.clear()
+    response = await client.get("/api/teacher/modules")
+    assert response.status_code == 200
+    assert len(response.json()) == 10
+    assert len(query_log) == single_module_queries
+
+@pytest.mark.asyncio
+async def test_get_teacher_modules_pagination(auth_teacher_client: dict, session: AsyncSession):
+    client = auth_teacher_client["client"]
+    teacher_id = auth_teacher_client["user_id"]
+    for i in range(5):
+        await add_module_with_quiz(session, teacher_id, f"page-module-{i}", questions=1)
+    all_ids = [m["id"] for m in (await client.get("/api/teacher/modules")).json()]
+    response = await client.get("/api/teacher/modules?limit=2&offset=2")
+    assert response.status_code == 200
+    assert [m["id"] for m in response.json()] == all_ids[2:4]
+
+@pytest.mark.asyncio
+async def test_assign_module_to_class_is_idempotent(auth_teacher_client: dict, session: AsyncSession, monkeypatch):
+    # Room for one progress row per INSERT, so every student is a chunk of its own
+    monkeypatch.setattr(teacher, "MAX_BIND_PARAMETERS", 20)
+    client = auth_teacher_client["client"]
+    teacher_id = auth_teacher_client["user_id"]
+    profile = (await session.execute(select(TeacherProfile).where(TeacherProfile.user_id == teacher_id))).scalar_one()
+    await add_module_with_quiz(session, teacher_id, "done-module", questions=1)
+    await add_module_with_quiz(session, teacher_id, "assign-module", questions=1)
+    await add_class_with_students(session, profile.id, "done-module", "assign-class", [80, 90, 70])
+    # One student already has the module in progress
+    session.add(UserModuleProgress(user_id="assign-class-student0", module_id="assign-module", status="in_progress"))
+    await session.commit()
+
+    response = await client.post("/api/teacher/modules/assign-module/assign", json={"class_id": "assign-class"})
+    assert response.status_code == 200
+    assert response.json()["students_assigned"] == 2
+    assert response.json()["total_students"] == 3
+
+    response = await client.post("/api/teacher/modules/assign-module/assign", json={"class_id": "assign-class"})
+    assert response.status_code == 200
+    assert response.json()["students_assigned"] == 0
+
+    rows = (await session.execute(select(UserModuleProgress).where(UserModuleProgress.module_id == "assign-module"))).scalars().all()
+    assert len(rows) == 3
+    assert {r.status for r in rows if r.user_id == "assign-class-student0"} == {"in_progress"}
+
+@pytest.mark.asyncio
+async def test_assign_module_to_multiple_classes(auth_teacher_client: dict, session: AsyncSession):
+    client = auth_teacher_client["client"]
+    teacher_id = auth_teacher_client["user_id"]
+    profile = (await session.execute(select(TeacherProfile).where(TeacherProfile.user_id == teacher_id))).scalar_one()
+    await add_module_with_quiz(session, teacher_id, "multi-module", questions=1)
+    await add_class_with_students(session, profile.id, "multi-module", "multi-a", [])
+    await add_class_with_students(session, profile.id, "multi-module", "multi-b", [])
+    for i in range(3):
+        student_id = f"multi-student{i}"
+        session.add(User(id=student_id, email=f"{student_id}@example.com", hashed_password="x", name=student_id, role="younger_child"))
+        session.add(ClassStudent(class_id="multi-a", student_id=student_id))
+    # multi-student0 is enrolled in both classes
+    session.add(ClassStudent(class_id="multi-b", student_id="multi-student0"))
+    await session.commit()
+
+    response = await client.post("/api/teacher/modules/multi-module/assign", json={"class_ids": ["multi-a", "multi-b"]})
+    assert response.status_code == 200
+    assert response.json()["students_assigned"] == 3
+    assert response.json()["class_ids"] == ["multi-a", "multi-b"]
+
+    response = await client.post("/api/teacher/modules/multi-module/assign", json={"class_ids": ["multi-a", "not-mine"]})
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_get_performance_analytics_uses_daily_rollup(auth_teacher_client: dict, session: AsyncSession, query_log: list):
+    client = auth_teacher_client["client"]
+    teacher_id = auth_teacher_client["user_id"]
+    profile = (await session.execute(select(TeacherProfile).where(TeacherProfile.user_id == teacher_id))).scalar_one()
+    await add_module_with_quiz(session, teacher_id, "analytics-module", questions=1)
+    await add_class_with_students(session, profile.id, "analytics-module", "analytics-class", [90, 60, 70, 100])
+    # One completion falls outside the week window
+    old_progress = (await session.execute(
+        select(UserModuleProgress).where(UserModuleProgress.user_id == "analytics-class-student3")
+    )).scalar_one()
+    old_progress.completed_at = datetime.now(timezone.utc) - timedelta(days=20)
+    await session.flush()
+    await refresh_class_daily_stats(session, (datetime.now(timezone.utc) - timedelta(days=30)).date())
+    await session.commit()
+
+    query_log.clear()
+    response = await client.get("/api/teacher/analytics/performance?timeframe=week")
+    assert response.status_code == 200
+    data = response.json()
+    class_stats = data["class_performance"][0]
+    assert class_stats["student_count"] == 4
+    assert class_stats["completions"] == 3
+    assert class_stats["avg_performance"] == 73.3
+    assert data["daily_series"] == class_stats["daily"]
+    assert [(p["completions"], p["active_students"]) for p in data["daily_series"]] == [(3, 3)]
+    assert len(query_log) <= 6
+
+    response = await client.get("/api/teacher/analytics/performance?timeframe=month")
+    class_stats = response.json()["class_performance"][0]
+    assert class_stats["completions"] == 4
+    assert class_stats["avg_performance"] == 80.0
+    assert len(class_stats["daily"]) == 2
+
+    # A student in two classes counts in each class, but once across them
+    session.add(Class(id="analytics-class-2", name="Second", teacher_id=profile.id))
+    session.add(ClassStudent(class_id="analytics-class-2", student_id="analytics-class-student0"))
+    await refresh_class_daily_stats(session, (datetime.now(timezone.utc) - timedelta(days=30)).date())
+    await session.commit()
+    data = (await client.get("/api/teacher/analytics/performance?timeframe=week")).json()
+    assert sum(c["completions"] for c in data["class_performance"]) == 4
+    assert [(p["completions"], p["active_students"], p["avg_score"]) for p in data["daily_series"]] == [(3, 3, 73.3)]
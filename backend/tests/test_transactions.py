@@ -1,7 +1,7 @@
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from backend.models import User, Transaction, ChildProfile
+from backend.models import User, Transaction, ChildProfile, DailyLedgerSummary
 from datetime import datetime, timedelta, timezone
 
 @pytest.mark.asyncio
@@ -69,3 +69,57 @@ async def test_create_transaction_forbidden(auth_client: dict):
     txn_data = {"type": "earn", "amount": 10, "description": "Not allowed", "category": "bonus"}
     response = await client.post("/api/users/otheruser/transactions", json=txn_data)
     assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_get_user_transactions_keyset_pages(auth_child_client: dict, session: AsyncSession):
+    client = auth_child_client["client"]
+    child_id = auth_child_client["user_id"]
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    # Pairs share a timestamp, so the id has to break ties
+    session.add_all([
+        Transaction(id=f"txn-{i:02d}", user_id=child_id, type="spend", amount=1, description=f"Item {i}",
+                    created_at=now - timedelta(minutes=i // 2))
+        for i in range(25)
+    ])
+    await session.commit()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+        response = await client.get(f"/api/users/{child_id}/transactions", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_count"] is None
+        seen.extend(t["id"] for t in data["transactions"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == 25
+    assert seen == [f"txn-{i:02d}" for i in sorted(range(25), key=lambda i: (i // 2, -i))]
+
+    response = await client.get(f"/api/users/{child_id}/transactions", params={"include_total": True})
+    assert response.json()["total_count"] == 25
+    response = await client.get(f"/api/users/{child_id}/transactions", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_user_transactions_totals_come_from_rollup(auth_child_client: dict, session: AsyncSession):
+    client = auth_child_client["client"]
+    child_id = auth_child_client["user_id"]
+    today = datetime.now(timezone.utc).date()
+    session.add_all([
+        DailyLedgerSummary(user_id=child_id, day=today, type="earn", category="", amount_sum=5, count=1),
+        DailyLedgerSummary(user_id=child_id, day=today - timedelta(days=6), type="earn", category="", amount_sum=7, count=1),
+        DailyLedgerSummary(user_id=child_id, day=today - timedelta(days=20), type="earn", category="", amount_sum=11, count=1),
+        DailyLedgerSummary(user_id=child_id, day=today - timedelta(days=45), type="earn", category="", amount_sum=100, count=1),
+    ])
+    await session.commit()
+
+    txn_data = {"type": "earn", "amount": 3, "description": "Chores", "category": "bonus"}
+    assert (await client.post(f"/api/users/{child_id}/transactions", json=txn_data)).status_code == 200
+
+    data = (await client.get(f"/api/users/{child_id}/transactions")).json()
+    assert data["weekly_total"] == 15
+    assert data["monthly_total"] == 26
@@ -61,7 +61,8 @@ async def test_get_coins_success(auth_child_client: dict, session: AsyncSession)
     assert response.json() == 50
 
 @pytest.mark.asyncio
-async def test_update_coins_success(auth_child_client: dict, session: AsyncSession):
+async def test_balance_cannot_be_overwritten(auth_child_client: dict, session: AsyncSession):
+    # Balances only move through transactions
     client = auth_child_client["client"]
     child_id = auth_child_client["user_id"]
     profile = await session.execute(select(ChildProfile).where(ChildProfile.user_id == child_id))
@@ -69,10 +70,9 @@ async def test_update_coins_success(auth_child_client: dict, session: AsyncSessi
     profile.coins = 20
     session.add(profile)
     await session.commit()
-    update_data = {"coins": 100}
-    response = await client.post(f"/api/users/{child_id}/coins", json=update_data)
-    assert response.status_code == 200
-    assert response.json() == 100
+    response = await client.post(f"/api/users/{child_id}/coins", json={"coins": 100})
+    assert response.status_code == 405
+    assert (await client.get(f"/api/users/{child_id}/coins")).json() == 20
 
 @pytest.mark.asyncio
 async def test_get_user_profile_forbidden(auth_client: dict):
@@ -277,17 +277,17 @@ class ApiService {
   // ===================
 
   /**
-   * Get user transactions
+   * Get a user's most recent transactions (newest first)
    */
-  async getTransactions(userId: string): Promise<Transaction[]> {
-    const response = await httpClient.get(`/api/users/${userId}/transactions`)
-    return response.data
+  async getTransactions(userId: string, limit = 100): Promise<Transaction[]> {
+    const response = await httpClient.get(`/api/users/${userId}/transactions`, { params: { limit } })
+    return response.data.transactions
   }
 
   /**
    * Create a transaction
    */
-  async createTransaction(userId: string, transactionData: Transaction): Promise<ApiResponse<Transaction>> {
+  async createTransaction(userId: string, transactionData: Transaction): Promise<ApiResponse<{ transaction: Transaction; new_coin_balance: number }>> {
     try {
       const response = await httpClient.post(`/api/users/${userId}/transactions`, transactionData)
       return { data: response.data }
@@ -888,17 +888,6 @@ class ApiService {
     }
   }
 
-  async updateUserCoins(userId: string, coins: number): Promise<ApiResponse<any>> {
-    try {
-      const response = await httpClient.post(`/api/users/${userId}/coins`, { coins })
-      console.log(response.data, "message was sent successfully")
-      return { data: response.data }
-    } catch (error: any) {
-      console.error('❌ [API] Failed to update coins:', error)
-      return { error: error.response?.data?.detail || 'Failed to update coins' }
-    }
-  }
-
   /**
    * Complete an activity
    */
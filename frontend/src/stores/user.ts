@@ -116,12 +116,13 @@ export const useUserStore = defineStore('user', () => {
         created_at: new Date().toISOString()
       }
 
+      // The server moves the balance; take the one it reports back
+      const response = await apiService.createTransaction(profile.value.id, transaction)
+      if (!response.data) throw new Error(response.error)
       transactions.value.push(transaction)
-      await apiService.createTransaction(profile.value.id, transaction)
-      profile.value.coins += amount
+      profile.value.coins = response.data.new_coin_balance
       authStore.user.coins=profile.value.coins
       profile.value.totalCoinsEarned += amount
-      await apiService.updateUserCoins(profile.value.id, profile.value.coins)
 
     } catch (err) {
       error.value = err instanceof Error ? err.message : 'Failed to add coins'
@@ -143,11 +144,11 @@ export const useUserStore = defineStore('user', () => {
         category,
         created_at: new Date().toISOString()
       }
+      const response = await apiService.createTransaction(profile.value.id, transaction)
+      if (!response.data) throw new Error(response.error)
       transactions.value.push(transaction)
-      await apiService.createTransaction(profile.value.id, transaction)
-      profile.value.coins -= amount
+      profile.value.coins = response.data.new_coin_balance
       authStore.user.coins=profile.value.coins
-      await apiService.updateUserCoins(profile.value.id, profile.value.coins)
       return true
     } catch (err) {
       error.value = err instanceof Error ? err.message : 'Failed to spend coins'
@@ -289,13 +290,12 @@ export const useUserStore = defineStore('user', () => {
       const goal = goals.value.find(g => g.id === goalId)
       if (!goal) return false
 
-      profile.value.coins -= amount
+      // Debits the balance and adds to the goal in one request
+      const response = await apiService.contributeToGoal(profile.value.id, goalId, amount)
+      if (!response.data) throw new Error(response.error)
+      profile.value.coins = response.data.new_coin_balance
       authStore.user.coins=profile.value.coins
-      goal.current_amount += amount
-      await apiService.updateGoalAmount(goalId, goal.current_amount)
-
-
-      await apiService.updateUserCoins(profile.value.id, profile.value.coins)
+      goal.current_amount = response.data.goal.current_amount
       const transaction: Transaction = {
         id: Date.now().toString(),
         type: 'save',
@@ -93,7 +93,7 @@ export interface Teacher extends User {
 export interface Transaction {
   id: string
   user_id?: string
-  type: 'earn' | 'spend' | 'save'    // Backend uses pattern validation
+  type: 'earn' | 'spend' | 'save' | 'refund'  // refund: coins given back, e.g. a rejected redemption
   amount: number                      // Must be > 0 in backend
   description: string                 // Required in backend
   category?: string
@@ -109,9 +109,10 @@ export interface Transaction {
 // Transaction List - matches backend TransactionList schema
 export interface TransactionList {
   transactions: Transaction[]
-  total_count: number
+  total_count: number | null          // Only filled in with include_total=true
   weekly_total: number
   monthly_total: number
+  next_cursor: string | null          // Pass back as ?cursor= for the next page
 }
 
 // Goal Interface - aligned with backend GoalRead schema
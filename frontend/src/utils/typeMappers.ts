@@ -232,7 +232,7 @@ export const validateTransaction = (data: any): data is Transaction => {
   return data && 
     typeof data.id === 'string' && 
     typeof data.user_id === 'string' &&
-    ['earn', 'spend', 'save'].includes(data.type) &&
+    ['earn', 'spend', 'save', 'refund'].includes(data.type) &&
     typeof data.amount === 'number' &&
     typeof data.description === 'string'
 }